@@ -1,15 +1,51 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import (Flask, render_template, request, jsonify, redirect, url_for, session, g, Response, abort,
+                   send_file)
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-import joblib
-import pandas as pd
 import sqlite3
 import os
+import re
+import time
+import hmac
+import uuid
+import json
+import math
+import hashlib
+import io
+from functools import wraps
+
+import metrics
+import profiling
+import tracing
+import payloads
+import assets
+import export_shards
+import ranking
+import rank_sweep
+import seat_allocation
+from cutoff_cache import cache as cutoff_cache, filter_place
+from shared_cache import cache as shared_cache
+from rate_limit import admission, admission_controlled, admit_request
+from single_flight import flights
+from record_store import CutoffRecords
+from autocomplete import DEFAULT_LIMIT as AUTOCOMPLETE_LIMIT, MAX_LIMIT as AUTOCOMPLETE_MAX, KINDS as AUTOCOMPLETE_KINDS
+from probability_curves import CURVES_PATH
+from hot_reload import SnapshotManager
+from data_version import read_data_version
+from metrics import (REQUEST_LATENCY, PREDICT_STAGE_LATENCY, MODEL_SCORING_LATENCY, ROWS_SCANNED,
+                     MATCHES_RETURNED, PLACE_LOOKUPS, DB_QUERIES, ERRORS)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here-change-this-in-production'
 
+# Reverse proxies in front of the app (1 on Render). Their X-Forwarded-For gives
+# request.remote_addr the client's address, which the per-IP rate limit needs.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS, x_proto=TRUSTED_PROXY_HOPS)
+
 # Fix database path - use absolute path
 base_dir = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(base_dir, 'database', 'college_data.db')
@@ -21,13 +57,54 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-# Load ML model
-try:
-    model = joblib.load('model.pkl')
-    print("✅ ML model loaded successfully")
-except Exception as e:
-    print(f"❌ Error loading ML model: {e}")
-    model = None
+payloads.init_compression(app)
+assets.init_assets(app)
+export_shards.init_shards(app)
+
+# ML model - loaded on first use (or by warm_up) so that importing the app, and
+# routes such as /login and /register, never pay for joblib/scikit-learn. Matches
+# covered by the precomputed probability curves (probability_curves.py) skip it.
+MODEL_PATH = os.path.join(base_dir, 'model.pkl')
+
+
+def warm_up():
+    """Load heavy modules and the model ahead of the first prediction request."""
+    get_snapshot().warm()
+
+
+def start_reload_watcher():
+    """Pick up new cutoff data, models and curves without a restart (see hot_reload.py)."""
+    snapshots.start_watcher()
+
+# Endpoints whose latency is recorded in the request latency histogram
+TIMED_ENDPOINTS = {'predict', 'chatbot_predict', 'predict_sweep', 'login'}
+
+# Admin access: either a shared token header or a logged-in user listed in ADMIN_USERS
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+ADMIN_USERS = {name.strip() for name in os.environ.get('ADMIN_USERS', '').split(',') if name.strip()}
+
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Prediction responses are revalidated with ETags; set to e.g. "public, max-age=300"
+# to let a reverse proxy serve them without reaching the app
+PREDICT_CACHE_CONTROL = os.environ.get('PREDICT_CACHE_CONTROL', 'private, no-cache')
+
+# "projected" predicts against next year's cutoffs, materialized by forecast_cutoffs.py
+CUTOFF_SOURCES = {'historical', 'projected'}
+FORECAST_TABLE = 'forecast_cutoffs'
+
+# Prediction endpoints that get a Server-Timing header and a trace log entry
+TRACED_ENDPOINTS = {'predict', 'chatbot_predict'}
+
+# predict_colleges stage -> Server-Timing metric it is reported under
+STAGE_TIMINGS = {
+    'table_check': 'db',
+    'place_resolve': None,
+    'query': 'db',
+    'rank_filter': 'rank',
+    'ranking': 'rank',
+    'serialization': 'serialize',
+}
 
 
 # User Model
@@ -44,61 +121,59 @@ def load_user(user_id):
     return User.query.get(int(user_id))
 
 
+def is_admin():
+    token = request.headers.get('X-Admin-Token', '')
+    if ADMIN_TOKEN and token and hmac.compare_digest(token, ADMIN_TOKEN):
+        return True
+    return current_user.is_authenticated and current_user.username in ADMIN_USERS
+
+
+def admin_required(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not is_admin():
+            abort(403)
+        return view(*args, **kwargs)
+
+    return wrapped
+
+
 # Prediction Logic - IMPROVED with better location matching
-def predict_colleges(user_input):
-    db_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'database', 'college_data.db')
+DB_PATH = os.path.join(base_dir, 'database', 'college_data.db')
 
-    if not os.path.exists(db_path):
-        return {'error': 'Database not found'}
 
-    conn = sqlite3.connect(db_path)
+def clear_old_generation(previous, snapshot):
+    # Buckets of the replaced database generation can never be hit again
+    cutoff_cache.clear()
 
-    # Base query - use the correct table name
-    table_name = f"{user_input['college_type'].lower()}_colleges"
 
-    # Debug: Check what table we're querying
-    print(f"Querying table: {table_name}")
-    print(f"User input: {user_input}")
+# The model, curves, place index and autocomplete index predictions read; replaced
+# as a whole when the data or model changes, so in-flight requests keep their snapshot
+snapshots = SnapshotManager(DB_PATH, MODEL_PATH, CURVES_PATH, on_swap=clear_old_generation)
 
-    # First check if table exists
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
-    table_exists = cursor.fetchone()
 
-    if not table_exists:
-        print(f"Table {table_name} does not exist!")
-        conn.close()
-        return {'exact_matches': [], 'near_matches': [], 'weak_matches': []}
+def get_snapshot():
+    return snapshots.get()
 
-    # Build query based on location preference - IMPROVED
-    place = user_input['place'].strip()
-    category = user_input['category']
-    exam_type = user_input['exam_type']
-    state = user_input['state']
 
-    # Normalize place name for comparison
-    place_lower = place.lower()
-
-    # Map common variations to database values
-    place_mapping = {
-        'bangalore': 'Bengaluru',
-        'bengaluru': 'Bengaluru',
-        'mysore': 'Mysore',
-        'mandya': 'Mandya',
-        'belagavi': 'Belagavi',
-        'dharwad': 'Dharwad',
-        'hubballi': 'Hubballi',
-        'davanagere': 'Davanagere',
-        'mangaluru': 'Mangaluru',
-        'hassan': 'Hassan',
-        'all': 'All',
-        '': 'All'
-    }
+def get_place_index(db_path, conn=None):
+    # Built from the place_aliases table written by init_db.py
+    return get_snapshot().place_index(db_path, conn)
+
+
+def get_autocompleter(db_path):
+    # Built from the search_terms table written by init_db.py
+    return get_snapshot().autocompleter(db_path)
 
-    # Get normalized place name
-    normalized_place = place_mapping.get(place_lower, place)
 
-    if normalized_place == 'All' or normalized_place == '':
+def table_exists(conn, table_name):
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def query_colleges(conn, table_name, state, exam_type, category, place, college_type=None):
+    if place == 'All' or place == '':
         query = f"""
         SELECT * FROM {table_name} 
         WHERE state = ? AND exam_type = ? AND category = ?
@@ -109,64 +184,287 @@ def predict_colleges(user_input):
         SELECT * FROM {table_name} 
         WHERE state = ? AND exam_type = ? AND category = ? AND place = ?
         """
-        params = [state, exam_type, category, normalized_place]
+        params = [state, exam_type, category, place]
+
+    # The forecast table holds every college type
+    if college_type is not None:
+        query += "AND college_type = ?\n"
+        params.append(college_type)
 
     print(f"Executing query: {query}")
     print(f"With params: {params}")
+    import pandas as pd
+    return pd.read_sql(query, conn, params=params)
+
+
+def filter_by_rank(college_data, user_rank):
+    # Cutoffs are validated integers (init_db.py quarantines anything else), so this is one mask
+    exact_matches = college_data.take(ranking.in_range(college_data, user_rank)).to_dicts()
+    print(f"Rank {user_rank}: {len(exact_matches)} of {len(college_data)} colleges in range")
+    return exact_matches
+
+
+def stage_span(stage):
+    return tracing.span(stage, timing=STAGE_TIMINGS[stage], histogram=PREDICT_STAGE_LATENCY, stage=stage)
+
+
+def score_matches(matches, user_rank, snapshot=None):
+    """Attach the model's admission probability to each match.
+
+    Matches covered by the precomputed curves are interpolated; only the rest
+    go through the model itself.
+    """
+    snapshot = snapshot or get_snapshot()
+    unscored = matches
+    curves = snapshot.curves
+    if curves is not None and matches:
+        indices = curves.lookup(matches)
+        covered = indices >= 0
+        scored = [college for college, hit in zip(matches, covered) if hit]
+        for college, probability in zip(scored, curves.score(indices[covered], user_rank)):
+            college['admission_probability'] = round(float(probability), 3)
+        unscored = [college for college, hit in zip(matches, covered) if not hit]
+
+    if not unscored:
+        return matches
+    model = snapshot.model
+    if model is None:
+        return matches
+
+    import pandas as pd
+    features = pd.DataFrame([{
+        'user_rank': user_rank,
+        'opening': college['opening_cutoff_rank'],
+        'closing': college['closing_cutoff_rank'],
+        'range_width': college['closing_cutoff_rank'] - college['opening_cutoff_rank'],
+        'rank_vs_open': user_rank - college['opening_cutoff_rank'],
+        'rank_vs_close': user_rank - college['closing_cutoff_rank'],
+        'seats': college.get('seats', 0),
+        'exam_type': college.get('exam_type', 'PGCET'),
+        'category': college.get('category', 'GM'),
+        'place': college.get('place', 'Bangalore')
+    } for college in unscored])
+
+    try:
+        probabilities = model.predict_proba(features)[:, 1]
+    except Exception as e:
+        print(f"Model scoring error: {e}")
+        return matches
+
+    for college, probability in zip(unscored, probabilities):
+        college['admission_probability'] = round(float(probability), 3)
+    return matches
+
+
+def cutoff_table(user_input):
+    """(table, college_type filter) holding the cutoffs a prediction should use."""
+    if user_input.get('cutoffs') == 'projected':
+        return FORECAST_TABLE, user_input['college_type'].upper()
+    return f"{user_input['college_type'].lower()}_colleges", None
+
+
+def cutoff_bucket(conn, db_path, table_name, state, exam_type, category, college_type, warm=False):
+    """All places' cutoff rows for a query, from the in-process cache when possible."""
+    bucket, hit = cutoff_cache.get(
+        db_path, (table_name, state, exam_type, category, college_type),
+        lambda: CutoffRecords.from_frame(
+            query_colleges(conn, table_name, state, exam_type, category, 'All', college_type)),
+        warm=warm)
+    if not hit:
+        DB_QUERIES.inc()
+    return bucket
+
+
+def warm_chatbot_context(data, db_path=None):
+    """Prefetch what the chatbot's final prediction needs, as far as the answers so far allow."""
+    db_path = db_path or DB_PATH
+    import pandas  # noqa: F401
+    snapshot = get_snapshot()
+    snapshot.curves
+
+    missing = [field for field in ('college_type', 'exam_type', 'category') if not data.get(field)]
+    context = {'warmed': False, 'missing': missing}
+    if missing or not os.path.exists(db_path):
+        return context
+
+    table_name, college_type = cutoff_table({'college_type': data['college_type'],
+                                             'cutoffs': data.get('cutoffs', 'historical')})
+    conn = sqlite3.connect(db_path)
+    try:
+        if not table_exists(conn, table_name):
+            return context
+        place_index = snapshot.place_index(db_path, conn)
+        bucket = cutoff_bucket(conn, db_path, table_name, data.get('state', 'Karnataka'), data['exam_type'],
+                               data['category'], college_type, warm=True)
+    finally:
+        conn.close()
+
+    context.update(warmed=True, bucket_rows=len(bucket))
+    if data.get('place'):
+        place, resolution = place_index.resolve(data['place'])
+        context.update(place=place, place_match=resolution)
+        if place is not None:
+            context['place_rows'] = len(filter_place(bucket, place))
+    return context
+
+
+def candidate_probabilities(candidates, user_rank, snapshot):
+    """Admission probability per candidate row (NaN where it can't be scored)."""
+    import numpy as np
+
+    probabilities = np.full(len(candidates), np.nan)
+    covered = np.zeros(len(candidates), dtype=bool)
+    curves = snapshot.curves
+    if curves is not None and len(candidates):
+        indices = curves.lookup_frame(candidates)
+        covered = indices >= 0
+        if covered.any():
+            probabilities[covered] = curves.score(indices[covered], user_rank)
+
+    if not covered.all():
+        rest = candidates.take(~covered).to_dicts()
+        score_matches(rest, user_rank, snapshot)
+        probabilities[~covered] = [college.get('admission_probability', np.nan) for college in rest]
+    return probabilities
+
+
+def rank_matches(college_data, user_rank, options, fingerprint, snapshot):
+    """One page of the in-range colleges, best first, with a cursor for the next page."""
+    cursor = options['cursor']
+    if cursor is not None and cursor['q'] != fingerprint:
+        raise ValueError("Cursor does not belong to this query")
+
+    with stage_span('rank_filter'):
+        candidates = college_data.take(ranking.in_range(college_data, user_rank))
+
+    probabilities = None
+    if options['weights'].get('probability'):
+        with tracing.span('model_scoring', timing='model', histogram=MODEL_SCORING_LATENCY):
+            probabilities = candidate_probabilities(candidates, user_rank, snapshot)
+
+    with stage_span('ranking'):
+        scores = ranking.score_candidates(candidates, user_rank, options['weights'], probabilities)
+        # One extra result tells whether there is a next page
+        best = ranking.top_k(scores, candidates.positions.tolist(), options['limit'] + 1, cursor)
+    page, has_more = best[:options['limit']], len(best) > options['limit']
+
+    matches = []
+    for score, position in page:
+        row = candidates.row_of(position)
+        college = candidates.record(row).to_dict()
+        college['rank_score'] = round(score, 4)
+        if probabilities is not None:
+            probability = probabilities[row]
+            if not math.isnan(probability):
+                college['admission_probability'] = round(float(probability), 3)
+        matches.append(college)
+
+    if probabilities is None and options.get('probability'):
+        with tracing.span('model_scoring', timing='model', histogram=MODEL_SCORING_LATENCY):
+            score_matches(matches, user_rank, snapshot)
+    MATCHES_RETURNED.inc(len(matches))
+
+    next_cursor = None
+    if has_more:
+        next_cursor = ranking.encode_cursor(fingerprint, page[-1][0], page[-1][1])
+    print(f"Ranked {len(candidates)} matches, returning {len(matches)}")
+    return {
+        'exact_matches': matches,
+        'near_matches': [],
+        'weak_matches': [],
+        'total_matches': len(candidates),
+        'next_cursor': next_cursor,
+    }
+
+
+def predict_colleges(user_input, db_path=None):
+    db_path = db_path or DB_PATH
+
+    if not os.path.exists(db_path):
+        return {'error': 'Database not found'}
+
+    conn = sqlite3.connect(db_path)
+    # Everything below reads this snapshot, even if a reload swaps in a new one meanwhile
+    snapshot = get_snapshot()
+
+    # Base query - use the correct table name
+    table_name, college_type = cutoff_table(user_input)
+
+    # Debug: Check what table we're querying
+    print(f"Querying table: {table_name}")
+    print(f"User input: {user_input}")
+
+    # First check if table exists
+    with stage_span('table_check'):
+        found_table = table_exists(conn, table_name)
+    if not found_table:
+        print(f"Table {table_name} does not exist!")
+        conn.close()
+        return {'exact_matches': [], 'near_matches': [], 'weak_matches': []}
+
+    category = user_input['category']
+    exam_type = user_input['exam_type']
+    state = user_input['state']
+
+    # Resolve the place (aliases, case, typos) in memory before any query runs
+    with stage_span('place_resolve'):
+        normalized_place, resolution = snapshot.place_index(db_path, conn).resolve(user_input['place'])
+    PLACE_LOOKUPS.inc(result=resolution)
+
+    if normalized_place is None:
+        print(f"Unknown place: {user_input['place']}")
+        conn.close()
+        return {'exact_matches': [], 'near_matches': [], 'weak_matches': []}
 
     try:
-        college_data = pd.read_sql(query, conn, params=params)
-        print(f"Found {len(college_data)} colleges for query")
+        with stage_span('query'):
+            bucket = cutoff_bucket(conn, db_path, table_name, state, exam_type, category, college_type)
+            college_data = filter_place(bucket, normalized_place)
+        print(f"Found {len(college_data)} colleges for query ({resolution} place match: {normalized_place})")
 
         # Debug: Show first few rows
         if len(college_data) > 0:
             print("Sample colleges found:")
-            print(college_data[['college_name', 'place', 'opening_cutoff_rank', 'closing_cutoff_rank']].head())
-        else:
-            # If no exact match, try case-insensitive search
-            if normalized_place != 'All':
-                print(f"No exact match for {normalized_place}, trying case-insensitive search...")
-                query = f"""
-                SELECT * FROM {table_name} 
-                WHERE state = ? AND exam_type = ? AND category = ? AND LOWER(place) = ?
-                """
-                params = [state, exam_type, category, normalized_place.lower()]
-                college_data = pd.read_sql(query, conn, params=params)
-                print(f"Found {len(college_data)} colleges with case-insensitive search")
+            for college in college_data.take(slice(0, 5)).to_dicts(
+                    ['college_name', 'place', 'opening_cutoff_rank', 'closing_cutoff_rank']):
+                print(f"  {college}")
 
     except Exception as e:
         print(f"Database query error: {e}")
-        college_data = pd.DataFrame()
+        ERRORS.inc(endpoint='predict_colleges')
+        college_data = None
 
     conn.close()
 
-    if college_data.empty:
+    if college_data is None or college_data.empty:
         print("No colleges found in database query")
         return {'exact_matches': [], 'near_matches': [], 'weak_matches': []}
 
-    user_rank = user_input['rank']
-    exact_matches = []
-
-    for _, college in college_data.iterrows():
-        try:
-            opening = int(college['opening_cutoff_rank'])
-            closing = int(college['closing_cutoff_rank'])
-
-            # Debug each college
-            print(f"Checking college: {college.get('college_name', 'Unknown')}")
-            print(f"  Place: {college.get('place', 'Unknown')}")
-            print(f"  Rank range: {opening} - {closing}")
-            print(f"  User rank: {user_rank}")
-
-            if opening <= user_rank <= closing:
-                print(f"  ✓ Match found!")
-                exact_matches.append(college.to_dict())
-            else:
-                print(f"  ✗ No match (rank {user_rank} outside range {opening}-{closing})")
-
-        except (ValueError, TypeError) as e:
-            print(f"Skipping college {college.get('college_name', 'Unknown')} due to error: {e}")
-            continue
+    ROWS_SCANNED.inc(len(college_data))
+    if user_input.get('ranking'):
+        fingerprint = ranking.query_fingerprint({
+            'data_version': read_data_version(db_path),
+            'college_type': user_input['college_type'].lower(),
+            'cutoffs': user_input.get('cutoffs', 'historical'),
+            'exam_type': exam_type,
+            'state': state,
+            'category': category,
+            'place': normalized_place,
+            'rank': user_input['rank'],
+            'weights': user_input['ranking']['weights'],
+        })
+        return rank_matches(college_data, user_input['rank'],
+                            dict(user_input['ranking'], probability=user_input.get('probability')),
+                            fingerprint, snapshot)
+
+    with stage_span('rank_filter'):
+        exact_matches = filter_by_rank(college_data, user_input['rank'])
+    MATCHES_RETURNED.inc(len(exact_matches))
+
+    # Scoring is opt-in: it is the costliest stage and the prediction page doesn't show it
+    if user_input.get('probability'):
+        with tracing.span('model_scoring', timing='model', histogram=MODEL_SCORING_LATENCY):
+            score_matches(exact_matches, user_input['rank'], snapshot)
 
     print(f"Total exact matches found: {len(exact_matches)}")
     return {
@@ -176,6 +474,184 @@ def predict_colleges(user_input):
     }
 
 
+def sweep_colleges(user_input, rank_from, rank_to, db_path=None):
+    """How a query's matches change from rank_from to rank_to (see rank_sweep.timeline)."""
+    db_path = db_path or DB_PATH
+    if not os.path.exists(db_path):
+        return {'error': 'Database not found'}
+
+    snapshot = get_snapshot()
+    table_name, college_type = cutoff_table(user_input)
+    conn = sqlite3.connect(db_path)
+    try:
+        if not table_exists(conn, table_name):
+            return rank_sweep.empty_timeline(rank_from, rank_to)
+        place, resolution = snapshot.place_index(db_path, conn).resolve(user_input['place'])
+        PLACE_LOOKUPS.inc(result=resolution)
+        if place is None:
+            return rank_sweep.empty_timeline(rank_from, rank_to)
+        bucket = cutoff_bucket(conn, db_path, table_name, user_input['state'], user_input['exam_type'],
+                               user_input['category'], college_type)
+    finally:
+        conn.close()
+
+    result = rank_sweep.timeline(filter_place(bucket, place), rank_from, rank_to)
+    result['place'] = place
+    print(f"Sweep {rank_from}-{rank_to}: {result['rows']['count']} colleges, {len(result['steps'])} changes")
+    return result
+
+
+def serialize_results(results, response_format='full', fields=None):
+    with stage_span('serialization'):
+        return jsonify(payloads.encode_results(results, response_format, fields))
+
+
+def prediction_key(user_input, response_format, fields):
+    """Digest of everything a prediction response depends on, and the data version in it.
+
+    It is the response's ETag when the data is versioned.
+    """
+    data_version = read_data_version(DB_PATH)
+    snapshot = get_snapshot()
+    place, _ = snapshot.place_index().resolve(user_input['place'])
+    key = {
+        'data_version': data_version,
+        # What the current snapshot scores with, which may lag the files during a reload
+        'model_version': snapshot.versions['model_version'],
+        'curves_version': snapshot.versions['curves_version'],
+        'exam_type': user_input['exam_type'],
+        'state': user_input['state'],
+        'place': place,
+        'rank': user_input['rank'],
+        'category': user_input['category'],
+        'college_type': user_input['college_type'].lower(),
+        'cutoffs': user_input.get('cutoffs', 'historical'),
+        'ranking': user_input.get('ranking'),
+        'probability': user_input.get('probability', False),
+        'format': response_format,
+        'fields': fields,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:32], data_version
+
+
+def compute_prediction(user_input, response_format, fields):
+    """(JSON body, is an error result) for one prediction."""
+    results = predict_colleges(user_input)
+    return serialize_results(results, response_format, fields).get_data(), 'error' in results
+
+
+def respond_with_prediction(user_input, data):
+    try:
+        response_format, fields = parse_response_options(data)
+        user_input['ranking'] = ranking.parse_ranking(data)
+        user_input['probability'] = parse_flag(data.get('probability'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if user_input['cutoffs'] not in CUTOFF_SOURCES:
+        return jsonify({'error': f"Unknown cutoffs: {user_input['cutoffs']}"}), 400
+
+    key, data_version = prediction_key(user_input, response_format, fields)
+    return respond_cached(key, data_version, lambda: compute_prediction(user_input, response_format, fields))
+
+
+def sweep_key(user_input, rank_from, rank_to):
+    """prediction_key() for a rank sweep; sweeps don't use the model."""
+    data_version = read_data_version(DB_PATH)
+    place, _ = get_snapshot().place_index().resolve(user_input['place'])
+    key = {
+        'endpoint': 'predict_sweep',
+        'data_version': data_version,
+        'exam_type': user_input['exam_type'],
+        'state': user_input['state'],
+        'place': place,
+        'rank_from': rank_from,
+        'rank_to': rank_to,
+        'category': user_input['category'],
+        'college_type': user_input['college_type'].lower(),
+        'cutoffs': user_input.get('cutoffs', 'historical'),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:32], data_version
+
+
+def compute_sweep(user_input, rank_from, rank_to):
+    results = sweep_colleges(user_input, rank_from, rank_to)
+    return jsonify(results).get_data(), 'error' in results
+
+
+def respond_cached(key, data_version, compute):
+    """JSON response for `compute()` -> (body, is an error), revalidated and shared by its key.
+
+    With a data version the key is the response's ETag and its shared cache key.
+    """
+    etag = key if data_version is not None else None
+    if etag and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        rejection = admit_request()
+        if rejection is not None:
+            return rejection
+        # The ETag identifies the response body, so it doubles as the cross-worker cache key
+        cached = shared_cache.get(etag, data_version) if etag else None
+        if cached is not None:
+            response = Response(cached, mimetype='application/json')
+        else:
+            # Identical requests already running in this worker are waited on, not repeated
+            try:
+                (body, failed), shared = flights.do(key, compute)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            response = Response(body, mimetype='application/json')
+            if failed:
+                return response
+            if etag and not shared:
+                shared_cache.set(etag, data_version, body)
+
+    if etag:
+        # Weak: the body bytes differ with the negotiated Content-Encoding
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = PREDICT_CACHE_CONTROL
+    return response
+
+
+def request_data():
+    if request.method == 'GET':
+        return request.args.to_dict()
+    return request.get_json(silent=True)
+
+
+def parse_flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in ('1', 'true', 'yes')
+
+
+def parse_response_options(data):
+    response_format = data.get('format', 'full')
+    if response_format not in payloads.RESPONSE_FORMATS:
+        raise ValueError(f"Unknown response format: {response_format}")
+    return response_format, payloads.parse_fields(data.get('fields'))
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    request_id = request.headers.get('X-Request-ID', '')
+    g.request_id = request_id if REQUEST_ID_PATTERN.match(request_id) else uuid.uuid4().hex
+
+
+@app.after_request
+def record_request_metrics(response):
+    if request.endpoint in TIMED_ENDPOINTS and 'request_start' in g:
+        REQUEST_LATENCY.observe(time.perf_counter() - g.request_start, endpoint=request.endpoint)
+    metrics.registry.flush()
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    return response
+
+
+profiling.init_profiling(app, is_admin)
+tracing.init_tracing(app, TRACED_ENDPOINTS)
+
+
 # Routes
 @app.route('/')
 def index():
@@ -245,11 +721,12 @@ def prediction():
     return render_template('prediction.html')
 
 
-@app.route('/predict', methods=['POST'])
+@app.route('/predict', methods=['GET', 'POST'])
 @login_required
+@admission_controlled
 def predict():
     try:
-        data = request.get_json()
+        data = request_data()
         if not data:
             return jsonify({'error': 'No data provided'}), 400
 
@@ -259,18 +736,19 @@ def predict():
             'place': data.get('place', 'All'),
             'rank': int(data.get('rank', 0)),
             'category': data.get('category', 'GM'),
-            'college_type': data.get('college_type', 'MCA')
+            'college_type': data.get('college_type', 'MCA'),
+            'cutoffs': data.get('cutoffs', 'historical')
         }
 
         # Validate required fields
         if user_input['rank'] <= 0:
             return jsonify({'error': 'Please enter a valid rank'}), 400
 
-        results = predict_colleges(user_input)
-        return jsonify(results)
+        return respond_with_prediction(user_input, data)
 
     except Exception as e:
         print(f"Prediction error: {e}")
+        ERRORS.inc(endpoint='predict')
         return jsonify({'error': f'Prediction failed: {str(e)}'}), 500
 
 
@@ -280,28 +758,108 @@ def results():
     return render_template('results.html')
 
 
-@app.route('/chatbot_predict', methods=['POST'])
+@app.route('/chatbot_predict', methods=['GET', 'POST'])
 @login_required
+@admission_controlled
 def chatbot_predict():
     try:
-        data = request.get_json()
+        data = request_data()
         user_input = {
             'exam_type': data.get('exam_type', 'PGCET'),
             'state': data.get('state', 'Karnataka'),
             'place': data.get('place', 'All'),
             'rank': int(data.get('rank', 0)),
             'category': data.get('category', 'GM'),
-            'college_type': data.get('college_type', 'MCA')
+            'college_type': data.get('college_type', 'MCA'),
+            'cutoffs': data.get('cutoffs', 'historical')
         }
 
-        results = predict_colleges(user_input)
-        return jsonify(results)
+        return respond_with_prediction(user_input, data)
 
     except Exception as e:
         print(f"Chatbot prediction error: {e}")
+        ERRORS.inc(endpoint='chatbot_predict')
         return jsonify({'error': 'Prediction failed'}), 500
 
 
+@app.route('/predict_sweep', methods=['GET', 'POST'])
+@login_required
+@admission_controlled
+def predict_sweep():
+    # Every rank in a range at once, so a what-if slider needs no further requests
+    try:
+        data = request_data()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+
+        user_input = {
+            'exam_type': data.get('exam_type', 'PGCET'),
+            'state': data.get('state', 'Karnataka'),
+            'place': data.get('place', 'All'),
+            'category': data.get('category', 'GM'),
+            'college_type': data.get('college_type', 'MCA'),
+            'cutoffs': data.get('cutoffs', 'historical')
+        }
+        try:
+            rank_from, rank_to = int(data.get('rank_from', 0)), int(data.get('rank_to', 0))
+        except (TypeError, ValueError):
+            rank_from = rank_to = 0
+        if rank_from <= 0 or rank_to < rank_from:
+            return jsonify({'error': 'Please enter a valid rank range'}), 400
+        if user_input['cutoffs'] not in CUTOFF_SOURCES:
+            return jsonify({'error': f"Unknown cutoffs: {user_input['cutoffs']}"}), 400
+
+        key, data_version = sweep_key(user_input, rank_from, rank_to)
+        return respond_cached(key, data_version, lambda: compute_sweep(user_input, rank_from, rank_to))
+
+    except Exception as e:
+        print(f"Sweep error: {e}")
+        ERRORS.inc(endpoint='predict_sweep')
+        return jsonify({'error': 'Sweep failed'}), 500
+
+
+@app.route('/chatbot_context', methods=['GET', 'POST'])
+@login_required
+@admission_controlled(scope='warm')
+def chatbot_context():
+    # Called by the chatbot as each answer comes in, so the final prediction hits warm caches
+    try:
+        return jsonify(warm_chatbot_context(request_data() or {}))
+    except Exception as e:
+        print(f"Chatbot context error: {e}")
+        ERRORS.inc(endpoint='chatbot_context')
+        return jsonify({'warmed': False, 'error': 'Warm-up failed'}), 500
+
+
+@app.route('/autocomplete')
+@login_required
+def autocomplete():
+    # Typeahead for places and college names, answered from memory without touching SQLite
+    query = request.args.get('q', '')
+    kind = request.args.get('kind') or None
+    if kind is not None and kind not in AUTOCOMPLETE_KINDS:
+        return jsonify({'error': f"kind must be one of: {', '.join(AUTOCOMPLETE_KINDS)}"}), 400
+    try:
+        limit = int(request.args.get('limit') or AUTOCOMPLETE_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX))
+
+    try:
+        suggestions = get_autocompleter(DB_PATH).search(query, kind, limit)
+    except Exception as e:
+        print(f"Autocomplete error: {e}")
+        ERRORS.inc(endpoint='autocomplete')
+        return jsonify({'error': 'Autocomplete failed'}), 500
+
+    response = jsonify({
+        'query': query,
+        'suggestions': [{'label': label, 'kind': found_kind} for label, found_kind in suggestions],
+    })
+    response.headers['Cache-Control'] = 'private, max-age=300'
+    return response
+
+
 @app.route('/logout')
 @login_required
 def logout():
@@ -309,6 +867,94 @@ def logout():
     return redirect(url_for('index'))
 
 
+@app.route('/metrics')
+def metrics_endpoint():
+    # Optional bearer token so the endpoint can be exposed beyond the scrape network
+    token = os.environ.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(403)
+    return Response(metrics.registry.render(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
+@app.route('/admin/cache')
+@admin_required
+def admin_cache():
+    return jsonify(dict(shared_cache.report(), admission=admission.status()))
+
+
+@app.route('/admin/reload', methods=['GET', 'POST'])
+@admin_required
+def admin_reload():
+    # POST reloads this worker now and signals the other workers through the trigger file
+    if request.method == 'POST':
+        snapshots.request_reload()
+        entry = snapshots.reload('admin request')
+        if entry is None:
+            return jsonify({'error': 'A reload is already running', 'status': snapshots.status()}), 409
+        if entry['status'] != 'ok':
+            return jsonify({'error': entry['error'], 'status': snapshots.status()}), 500
+    return jsonify(snapshots.status())
+
+
+@app.route('/admin/allocation', methods=['GET', 'POST'])
+@admin_required
+def admin_allocation():
+    # Synthetic cohort by default; POST a CSV file as `applicants` (rank,category,preferences) to use one
+    college_type = request.values.get('college_type', 'mca').lower()
+    if college_type not in seat_allocation.COLLEGE_TYPES:
+        return jsonify({'error': f"Unknown college type: {college_type}"}), 400
+    try:
+        year = int(request.values['year']) if request.values.get('year') else None
+        cohort = int(request.values.get('cohort', seat_allocation.DEFAULT_COHORT))
+        choices = int(request.values.get('choices', seat_allocation.DEFAULT_CHOICES))
+        seed = int(request.values.get('seed', 42))
+    except ValueError:
+        return jsonify({'error': 'year, cohort, choices and seed must be integers'}), 400
+    if not 0 < cohort <= seat_allocation.MAX_COHORT or choices <= 0:
+        return jsonify({'error': f"cohort must be 1-{seat_allocation.MAX_COHORT} and choices positive"}), 400
+
+    applicants = None
+    upload = request.files.get('applicants')
+    if upload is not None:
+        try:
+            applicants = seat_allocation.read_applicants(io.TextIOWrapper(upload.stream, encoding='utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({'error': f"Invalid applicants file: {e}"}), 400
+        if len(applicants) > seat_allocation.MAX_COHORT:
+            return jsonify({'error': f"At most {seat_allocation.MAX_COHORT} applicants"}), 400
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        report = seat_allocation.simulate(conn, college_type, request.values.get('exam_type', 'PGCET'),
+                                          request.values.get('state', 'Karnataka'), year, applicants,
+                                          cohort, choices, seed)
+    except sqlite3.Error as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+    if report is None:
+        return jsonify({'error': 'No seats found for this query'}), 404
+    return jsonify(seat_allocation.public_report(report))
+
+
+@app.route('/admin/profiles')
+@admin_required
+def admin_profiles():
+    profiles = profiling.load_profiles()
+    if request.args.get('format') == 'json':
+        return jsonify(profiles)
+    return render_template('admin_profiles.html', profiles=profiles, focus_function=profiling.FOCUS_FUNCTION)
+
+
+@app.route('/admin/profiles/<profile_id>.prof')
+@admin_required
+def admin_profile_download(profile_id):
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        abort(404)
+    return send_file(path, as_attachment=True)
+
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -337,6 +983,7 @@ if __name__ == '__main__':
 
     print("🚀 Starting College Predictor Application...")
     print(f"📊 Debug mode: {debug_mode}")
+    start_reload_watcher()
 
     if debug_mode:
         app.run(debug=True, host='0.0.0.0', port=5000)
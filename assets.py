@@ -0,0 +1,183 @@
+# assets.py - Bundled, minified, content-hashed static assets
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+from flask import request, send_from_directory, url_for
+from markupsafe import Markup, escape
+
+from payloads import choose_encoding
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# Bundle name -> source files (relative to static/), concatenated in order
+BUNDLES = {
+    'main.css': ['css/main.css'],
+    'auth.css': ['css/auth.css'],
+    'dashboard.css': ['css/dashboard.css'],
+    'dashboard-chatbot.css': ['css/dashboard.css', 'css/chatbot.css'],
+    'prediction.css': ['css/prediction.css'],
+    'app.js': ['js/app.js'],
+    'auth.js': ['js/auth.js'],
+    'chatbot.js': ['js/chatbot.js'],
+    'prediction.js': ['js/prediction.js'],
+}
+
+# Hashed files never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+HASH_LENGTH = 10
+
+
+# Build
+
+
+def minify_css(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """Conservative JS minification: drop indentation, blank lines and whole-line comments.
+
+    Anything smarter needs a real tokenizer (regex literals, template strings),
+    so statements themselves are left untouched.
+    """
+    lines = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('//'):
+            continue
+        lines.append(stripped)
+    return '\n'.join(lines) + '\n'
+
+
+def build_bundle(name, sources):
+    minify = minify_css if name.endswith('.css') else minify_js
+    parts = []
+    for source in sources:
+        with open(os.path.join(STATIC_DIR, source), encoding='utf-8') as f:
+            parts.append(minify(f.read()))
+    content = '\n'.join(parts).encode('utf-8')
+
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    stem, ext = os.path.splitext(name)
+    filename = f"{stem}.{digest}{ext}"
+    path = os.path.join(DIST_DIR, filename)
+
+    with open(path, 'wb') as f:
+        f.write(content)
+    with open(f"{path}.gz", 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(f"{path}.br", 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+
+    original = sum(os.path.getsize(os.path.join(STATIC_DIR, source)) for source in sources)
+    return filename, original, len(content)
+
+
+def build_assets():
+    os.makedirs(DIST_DIR, exist_ok=True)
+    for stale in os.listdir(DIST_DIR):
+        os.remove(os.path.join(DIST_DIR, stale))
+
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        filename, original, minified = build_bundle(name, sources)
+        manifest[name] = filename
+        print(f"  - {name} -> dist/{filename} ({original} -> {minified} bytes)")
+
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# Serving
+
+_manifest = None
+
+
+def load_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            # Assets not built (development): serve the source files unversioned
+            _manifest = {}
+    return _manifest
+
+
+def asset_urls(name):
+    filename = load_manifest().get(name)
+    if filename is not None:
+        return [url_for('static', filename=f'dist/{filename}')]
+    return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+
+def asset_url(name):
+    return asset_urls(name)[0]
+
+
+def asset_tags(name):
+    if name.endswith('.css'):
+        template = '<link rel="stylesheet" href="{}">'
+    else:
+        template = '<script src="{}"></script>'
+    return Markup('\n'.join(template.format(escape(url)) for url in asset_urls(name)))
+
+
+MIMETYPES = {'.css': 'text/css', '.js': 'application/javascript', '.json': 'application/json'}
+
+
+def send_precompressed(directory, filename, cache_control):
+    """Serve a file, or its .br/.gz sibling when the client accepts that encoding."""
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    suffix = {'br': '.br', 'gzip': '.gz'}.get(encoding)
+    if suffix and not os.path.exists(os.path.join(directory, filename + suffix)):
+        encoding, suffix = None, None
+
+    if encoding is None:
+        response = send_from_directory(directory, filename, max_age=31536000)
+    else:
+        response = send_from_directory(directory, filename + suffix, max_age=31536000)
+        # Keep the original type; the encoding is a transport detail
+        response.mimetype = MIMETYPES.get(os.path.splitext(filename)[1], 'application/octet-stream')
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_assets(app):
+    app.jinja_env.globals.update(asset_url=asset_url, asset_tags=asset_tags)
+
+    @app.route('/static/dist/<path:filename>')
+    def dist_asset(filename):
+        return send_precompressed(DIST_DIR, filename, IMMUTABLE_CACHE_CONTROL)
+
+
+if __name__ == '__main__':
+    print("📦 Building static assets...")
+    built = build_assets()
+    print(f"✅ Built {len(built)} bundles into {DIST_DIR}")
+    sys.exit(0)
@@ -0,0 +1,115 @@
+# autocomplete.py - Prefix search over places and college names (sorted keys + bisect)
+from bisect import bisect_left
+
+from place_index import COLLEGE_TABLES, build_alias_rows, place_key
+
+SEARCH_TERMS_TABLE = 'search_terms'
+KINDS = ('place', 'college')
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 50
+# Keys examined per lookup at most, so a one-letter prefix stays cheap on large datasets
+MAX_SCAN = 2000
+
+
+def fetch_search_terms(conn, tables=COLLEGE_TABLES):
+    """(term, label, kind, weight) rows: every place, its aliases and every college name.
+
+    Weight is the number of cutoff rows behind a label, used to rank suggestions.
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    places, colleges = {}, {}
+    for table_name in tables:
+        if table_name not in existing:
+            continue
+        for place, count in conn.execute(f"SELECT place, COUNT(*) FROM {table_name} GROUP BY place"):
+            if place is not None and str(place).strip():
+                label = str(place).strip()
+                places[label] = places.get(label, 0) + count
+        for name, count in conn.execute(f"SELECT college_name, COUNT(*) FROM {table_name} GROUP BY college_name"):
+            if name is not None and str(name).strip():
+                label = ' '.join(str(name).split())
+                colleges[label] = colleges.get(label, 0) + count
+
+    # Every spelling of a place (Bangalore, Bengalooru, ...) suggests the canonical one
+    rows = [(alias, place, 'place', places[place]) for alias, place in build_alias_rows(places)]
+    rows.extend((place_key(label), label, 'college', weight) for label, weight in colleges.items())
+    return rows
+
+
+def write_search_terms(conn, tables=COLLEGE_TABLES):
+    """Materialize the autocomplete terms at ingest time; returns the number of terms."""
+    rows = fetch_search_terms(conn, tables)
+    conn.execute(f'DROP TABLE IF EXISTS {SEARCH_TERMS_TABLE}')
+    conn.execute(f'''
+        CREATE TABLE {SEARCH_TERMS_TABLE} (
+            term TEXT NOT NULL,
+            label TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            weight INTEGER NOT NULL
+        )
+    ''')
+    conn.executemany(f'INSERT INTO {SEARCH_TERMS_TABLE} (term, label, kind, weight) VALUES (?, ?, ?, ?)', rows)
+    return len(rows)
+
+
+class Autocompleter:
+    """Sorted array of search keys; a prefix lookup is a bisect plus a short forward scan.
+
+    College names are also keyed from each later word, so "engin" finds
+    "RV College of Engineering".
+    """
+
+    def __init__(self, term_rows):
+        self.entries = []
+        entry_ids = {}
+        keyed = set()
+        for term, label, kind, weight in term_rows:
+            entry = entry_ids.get((label, kind))
+            if entry is None:
+                entry = entry_ids[(label, kind)] = len(self.entries)
+                self.entries.append((label, kind, weight, place_key(label)))
+            words = term.split()
+            starts = range(len(words)) if kind == 'college' else range(1)
+            for start in starts:
+                keyed.add((' '.join(words[start:]), entry))
+
+        pairs = sorted(keyed)
+        self.keys = [key for key, _ in pairs]
+        self.key_entries = [entry for _, entry in pairs]
+
+    @classmethod
+    def from_db(cls, conn):
+        try:
+            rows = conn.execute(f'SELECT term, label, kind, weight FROM {SEARCH_TERMS_TABLE}').fetchall()
+        except Exception:
+            # Database predates the search terms table; derive them from the cutoff tables
+            rows = fetch_search_terms(conn)
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, prefix, kind=None, limit=DEFAULT_LIMIT):
+        """Best `limit` suggestions as (label, kind): labels starting with the prefix first,
+        then by weight."""
+        key = place_key(prefix or '')
+        if not key:
+            candidates = [entry for entry, (_, entry_kind, _, _) in enumerate(self.entries)
+                          if kind is None or entry_kind == kind]
+        else:
+            candidates = set()
+            i = bisect_left(self.keys, key)
+            end = min(len(self.keys), i + MAX_SCAN)
+            while i < end and self.keys[i].startswith(key):
+                entry = self.key_entries[i]
+                if kind is None or self.entries[entry][1] == kind:
+                    candidates.add(entry)
+                i += 1
+
+        def rank(entry):
+            label, _, weight, label_key = self.entries[entry]
+            return (not label_key.startswith(key), -weight, label)
+
+        best = sorted(candidates, key=rank)[:limit]
+        return [(self.entries[entry][0], self.entries[entry][1]) for entry in best]
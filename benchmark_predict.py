@@ -0,0 +1,337 @@
+# benchmark_predict.py - Scaled micro-benchmarks for predict_colleges on synthetic data
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import app as predictor
+
+# Same column layout as the college tables created by database/init_db.py
+COLUMNS = [
+    ('serial_no', 'INTEGER'),
+    ('college_id', 'TEXT'),
+    ('college_name', 'TEXT'),
+    ('college_type', 'TEXT'),
+    ('state', 'TEXT'),
+    ('place', 'TEXT'),
+    ('exam_type', 'TEXT'),
+    ('category', 'TEXT'),
+    ('opening_cutoff_rank', 'INTEGER'),
+    ('closing_cutoff_rank', 'INTEGER'),
+    ('seats', 'INTEGER'),
+    ('year', 'INTEGER'),
+    ('website', 'TEXT'),
+    ('background_images', 'TEXT'),
+]
+
+COLLEGE_TYPES = ['MCA', 'MBA', 'MTECH']
+CATEGORIES = ['GM', 'OBC', 'SC', 'ST']
+YEARS = [2023, 2024, 2025]
+PLACES = ['Bengaluru', 'Mysore', 'Mandya', 'Belagavi', 'Dharwad', 'Hubballi',
+          'Davanagere', 'Mangaluru', 'Hassan', 'Tumakuru']
+
+# name -> (place sent by the client, rank)
+SCENARIOS = {
+    'single_place': ('Bengaluru', 2000),
+    'all_places': ('All', 2000),
+    'alias_place': ('bangalore', 2000),
+    'case_folded_place': ('tumakuru', 2000),
+    'misspelled_place': ('Bengaluuru', 2000),
+    'unknown_place': ('Atlantis', 2000),
+    'no_match_rank': ('All', 10 ** 9),
+}
+
+# query_cold loads the bucket from SQLite into an empty cutoff cache, query_warm serves
+# it from the cache, as repeat predictions do; both include the in-memory place filter
+STAGES = ['table_check', 'place_resolve', 'query_cold', 'query_warm', 'rank_filter', 'serialization']
+
+CHUNK_SIZE = 50000
+
+
+def generate_synthetic_cutoffs(db_path, rows, seed=42):
+    """Write `rows` synthetic cutoff rows into each college table of a fresh database."""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    rows_per_college = len(CATEGORIES) * len(YEARS)
+    n_colleges = max(1, rows // rows_per_college)
+
+    for college_type in COLLEGE_TYPES:
+        table_name = f"{college_type.lower()}_colleges"
+        column_sql = ',\n'.join(f"{name} {sql_type}" for name, sql_type in COLUMNS)
+        cursor.execute(f'DROP TABLE IF EXISTS {table_name}')
+        cursor.execute(f'''
+            CREATE TABLE {table_name} (
+                {column_sql},
+                PRIMARY KEY (college_id, category, year)
+            )
+        ''')
+
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        insert_sql = f'INSERT INTO {table_name} VALUES ({placeholders})'
+
+        serial_no = 0
+        batch = []
+        for college in range(n_colleges):
+            college_id = f"{college_type[0]}{college:07d}"
+            place = PLACES[int(rng.integers(len(PLACES)))]
+            base_open = int(rng.integers(1, 20000))
+            for year in YEARS:
+                for category in CATEGORIES:
+                    if serial_no >= rows:
+                        break
+                    serial_no += 1
+                    opening = base_open + int(rng.integers(0, 500))
+                    closing = opening + int(rng.integers(100, 5000))
+                    batch.append((
+                        serial_no, college_id, f"Synthetic College {college_id}", college_type,
+                        'Karnataka', place, 'PGCET', category, opening, closing,
+                        int(rng.integers(1, 120)), year, f"https://{college_id.lower()}.example.edu", None
+                    ))
+                    if len(batch) >= CHUNK_SIZE:
+                        cursor.executemany(insert_sql, batch)
+                        batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+
+    conn.commit()
+    conn.close()
+
+
+def make_user_input(place, rank, college_type='MCA', category='GM'):
+    return {
+        'exam_type': 'PGCET',
+        'state': 'Karnataka',
+        'place': place,
+        'rank': rank,
+        'category': category,
+        'college_type': college_type
+    }
+
+
+def time_stages(db_path, user_input):
+    """Run each predict_colleges stage once and return per-stage seconds."""
+    timings = dict.fromkeys(STAGES, 0.0)
+    table_name = f"{user_input['college_type'].lower()}_colleges"
+
+    conn = sqlite3.connect(db_path)
+    try:
+        start = time.perf_counter()
+        predictor.table_exists(conn, table_name)
+        timings['table_check'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        place, _ = predictor.get_place_index(db_path, conn).resolve(user_input['place'])
+        timings['place_resolve'] = time.perf_counter() - start
+
+        if place is None:
+            return timings, 0, 0
+
+        # Same path as predict_colleges: the whole bucket through the cutoff cache, then place
+        bucket_args = (conn, db_path, table_name, user_input['state'], user_input['exam_type'],
+                      user_input['category'], None)
+        predictor.cutoff_cache.clear()
+        for stage in ('query_cold', 'query_warm'):
+            start = time.perf_counter()
+            college_data = predictor.filter_place(predictor.cutoff_bucket(*bucket_args), place)
+            timings[stage] = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    start = time.perf_counter()
+    matches = predictor.filter_by_rank(college_data, user_input['rank'])
+    timings['rank_filter'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    json.dumps({'exact_matches': matches, 'near_matches': [], 'weak_matches': []})
+    timings['serialization'] = time.perf_counter() - start
+
+    return timings, len(college_data), len(matches)
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'min': samples[0],
+        'median': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        'max': samples[-1],
+    }
+
+
+def run_scenario(db_path, user_input, repeats):
+    stage_samples = {stage: [] for stage in STAGES}
+    totals = []
+    rows_scanned = matches = 0
+
+    cold_totals = []
+    for _ in range(repeats):
+        timings, rows_scanned, matches = time_stages(db_path, user_input)
+        for stage, seconds in timings.items():
+            stage_samples[stage].append(seconds)
+        # A request either loads the bucket or finds it cached, never both
+        totals.append(sum(timings.values()) - timings['query_cold'])
+        cold_totals.append(sum(timings.values()) - timings['query_warm'])
+
+    return {
+        'rows_scanned': rows_scanned,
+        'matches': matches,
+        'stages': {stage: summarize(samples) for stage, samples in stage_samples.items()},
+        'total': summarize(totals),
+        'total_cold': summarize(cold_totals),
+    }
+
+
+# Engines
+
+
+def predict_colleges_engine(db_path, user_input):
+    return predictor.predict_colleges(user_input, db_path=db_path)['exact_matches']
+
+
+def sql_range_engine(db_path, user_input):
+    """Same matches as predict_colleges, with the rank filter pushed into SQLite."""
+    table_name = f"{user_input['college_type'].lower()}_colleges"
+    query = f"SELECT * FROM {table_name} WHERE state = ? AND exam_type = ? AND category = ?"
+    params = [user_input['state'], user_input['exam_type'], user_input['category']]
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        place, _ = predictor.get_place_index(db_path, conn).resolve(user_input['place'])
+        if place is None:
+            return []
+        if place != 'All':
+            query += " AND place = ?"
+            params.append(place)
+
+        query += " AND opening_cutoff_rank <= ? AND closing_cutoff_rank >= ?"
+        params += [user_input['rank'], user_input['rank']]
+        return [dict(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+
+# predict_colleges itself is the golden engine; every other engine must agree with it.
+GOLDEN_ENGINE = 'predict_colleges'
+ENGINES = {
+    'predict_colleges': predict_colleges_engine,
+    'sql_range': sql_range_engine,
+}
+
+
+# Added by predict_colleges' model scoring, not part of the cutoff row
+SCORE_FIELDS = {'admission_probability'}
+
+
+def match_key(match):
+    return (match['college_id'], match['category'], match['year'])
+
+
+def row_fields(matches):
+    """Matches as their cutoff rows, sorted, for comparing engines."""
+    return sorted(({k: v for k, v in match.items() if k not in SCORE_FIELDS} for match in matches),
+                  key=match_key)
+
+
+def check_golden(db_path, scenarios):
+    report = {}
+    for scenario, user_input in scenarios.items():
+        golden = row_fields(ENGINES[GOLDEN_ENGINE](db_path, user_input))
+        for engine_name, engine in ENGINES.items():
+            if engine_name == GOLDEN_ENGINE:
+                continue
+            result = row_fields(engine(db_path, user_input))
+            report.setdefault(engine_name, {})[scenario] = {
+                'matches': len(result),
+                'golden_matches': len(golden),
+                'ok': result == golden,
+            }
+    return report
+
+
+def run_benchmarks(sizes, repeats, college_type, category, workdir=None, check=True):
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'results': [],
+        'golden': {},
+    }
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp_dir:
+        for size in sizes:
+            db_path = os.path.join(tmp_dir, f'synthetic_{size}.db')
+            print(f"🔧 Generating {size} synthetic rows per table...", file=sys.stderr)
+            start = time.perf_counter()
+            generate_synthetic_cutoffs(db_path, size)
+            print(f"   done in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+            scenarios = {
+                name: make_user_input(place, rank, college_type, category)
+                for name, (place, rank) in SCENARIOS.items()
+            }
+
+            # predict_colleges prints a line per scanned row; keep that cost in the
+            # timings but out of the report.
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                for name, user_input in scenarios.items():
+                    print(f"⏱️  {size} rows / {name}", file=sys.stderr)
+                    result = run_scenario(db_path, user_input, repeats)
+                    result.update({'rows': size, 'scenario': name, 'place': user_input['place']})
+                    report['results'].append(result)
+
+                if check:
+                    report['golden'][str(size)] = check_golden(db_path, scenarios)
+
+    report['golden_ok'] = all(
+        outcome['ok']
+        for per_size in report['golden'].values()
+        for per_engine in per_size.values()
+        for outcome in per_engine.values()
+    )
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark predict_colleges on synthetic cutoff data')
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='Comma-separated row counts per college table')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--college-type', default='MCA', choices=COLLEGE_TYPES)
+    parser.add_argument('--category', default='GM', choices=CATEGORIES)
+    parser.add_argument('--workdir', default=None, help='Directory for the temporary synthetic databases')
+    parser.add_argument('--output', default='-', help='Where to write the JSON report (default: stdout)')
+    parser.add_argument('--no-check', action='store_true', help='Skip the golden-output check')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    report = run_benchmarks(sizes, args.repeats, args.college_type, args.category,
+                            workdir=args.workdir, check=not args.no_check)
+
+    output = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"📊 Benchmark report written to {args.output}", file=sys.stderr)
+
+    if not report['golden_ok']:
+        print("❌ Golden-output check failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,10 +22,34 @@ pip install -r requirements.txt
 echo "Initializing database..."
 python database/init_db.py
 
+# Forecast next year's cutoffs
+echo "Forecasting cutoffs..."
+python forecast_cutoffs.py
+
+# Export static prediction shards for client-side resolution
+echo "Exporting prediction shards..."
+python export_shards.py
+
 # Train model
 echo "Training ML model..."
 python model_training.py
 
+# Backtest the model; a model below the EVAL_MIN_AUC/EVAL_MAX_BRIER gate fails the build
+echo "Evaluating ML model..."
+python model_evaluation.py || exit 1
+
+# Precompute admission probability curves from the model
+echo "Building probability curves..."
+python probability_curves.py
+
+# Build static assets
+echo "Building static assets..."
+python assets.py
+
+# Check cold start
+echo "Checking app cold start..."
+python startup_check.py || exit 1
+
 echo "Deployment setup completed!"
 echo "To run the application: python app.py"
 echo "Access at: http://localhost:5000"
\ No newline at end of file
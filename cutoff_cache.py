@@ -0,0 +1,79 @@
+# cutoff_cache.py - In-process cache of cutoff buckets for predict_colleges
+import os
+import threading
+from collections import OrderedDict
+
+from data_version import read_data_version
+from metrics import CUTOFF_CACHE_REQUESTS
+
+# A bucket is every cutoff row for one (table, state, exam, category, college type),
+# held as CutoffRecords; place filters are applied in memory, so one bucket serves all places
+MAX_BUCKETS = int(os.environ.get('CUTOFF_CACHE_SIZE', '256'))
+
+
+class CutoffCache:
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()
+        # db_path -> the generation its cached buckets belong to
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def generation(db_path):
+        """Changes whenever init_db.py loads new data.
+
+        The users table shares the database file, so its mtime is only used for
+        databases built before data versions were stamped.
+        """
+        version = read_data_version(db_path)
+        if version is not None:
+            return version
+        try:
+            return os.stat(db_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, db_path, bucket_key, load, warm=False):
+        """Return (bucket, hit); `load()` reads the bucket from SQLite on a miss."""
+        generation = self.generation(db_path)
+        key = (db_path, generation) + tuple(bucket_key)
+        with self.lock:
+            if self.generations.get(db_path) != generation:
+                # Buckets of the replaced generation can never be hit again
+                for stale in [k for k in self.buckets if k[0] == db_path]:
+                    del self.buckets[stale]
+                self.generations[db_path] = generation
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                self.buckets.move_to_end(key)
+        if bucket is not None:
+            CUTOFF_CACHE_REQUESTS.inc(result='hit')
+            return bucket, True
+
+        bucket = load()
+        CUTOFF_CACHE_REQUESTS.inc(result='warm' if warm else 'miss')
+        with self.lock:
+            # Not kept if the data changed while it was loading
+            if self.generations.get(db_path) == generation:
+                self.buckets[key] = bucket
+                self.buckets.move_to_end(key)
+                while len(self.buckets) > self.max_buckets:
+                    self.buckets.popitem(last=False)
+        return bucket, False
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+def filter_place(bucket, place):
+    if place == 'All' or place == '':
+        return bucket
+    return bucket.where('place', place)
+
+
+cache = CutoffCache()
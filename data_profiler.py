@@ -0,0 +1,215 @@
+# data_profiler.py - Single-pass data-quality profile of the cutoff tables
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+DB_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'database', 'college_data.db')
+
+COLLEGE_TABLES = ['mca_colleges', 'mba_colleges', 'mtech_colleges']
+EXPECTED_CATEGORIES = {'GM', 'OBC', 'SC', 'ST'}
+
+TOP_PLACES = 10
+
+NUMERIC = "typeof({column}) IN ('integer', 'real')"
+
+# One scan per table: SQLite aggregates per (place, category, year) group and every
+# statistic in the report is folded together from those few groups in Python
+PROFILE_QUERY = f"""
+    SELECT place, category, year, COUNT(*),
+           MIN(CASE WHEN {NUMERIC.format(column='opening_cutoff_rank')} THEN opening_cutoff_rank END),
+           MAX(CASE WHEN {NUMERIC.format(column='opening_cutoff_rank')} THEN opening_cutoff_rank END),
+           TOTAL(CASE WHEN {NUMERIC.format(column='opening_cutoff_rank')} THEN opening_cutoff_rank END),
+           SUM({NUMERIC.format(column='opening_cutoff_rank')}),
+           SUM(opening_cutoff_rank IS NOT NULL AND NOT {NUMERIC.format(column='opening_cutoff_rank')}),
+           MIN(CASE WHEN {NUMERIC.format(column='closing_cutoff_rank')} THEN closing_cutoff_rank END),
+           MAX(CASE WHEN {NUMERIC.format(column='closing_cutoff_rank')} THEN closing_cutoff_rank END),
+           TOTAL(CASE WHEN {NUMERIC.format(column='closing_cutoff_rank')} THEN closing_cutoff_rank END),
+           SUM({NUMERIC.format(column='closing_cutoff_rank')}),
+           SUM(closing_cutoff_rank IS NOT NULL AND NOT {NUMERIC.format(column='closing_cutoff_rank')}),
+           SUM({NUMERIC.format(column='opening_cutoff_rank')} AND {NUMERIC.format(column='closing_cutoff_rank')}
+               AND opening_cutoff_rank > closing_cutoff_rank),
+           SUM(({NUMERIC.format(column='opening_cutoff_rank')} AND opening_cutoff_rank < 0)
+               OR ({NUMERIC.format(column='closing_cutoff_rank')} AND closing_cutoff_rank < 0)),
+           SUM({NUMERIC.format(column='seats')} AND seats <= 0)
+    FROM {{table_name}}
+    GROUP BY place, category, year
+"""
+
+RANK_COLUMNS = ('opening_cutoff_rank', 'closing_cutoff_rank')
+
+
+class TableProfile:
+    """Statistics for one table, folded together from its per-group aggregates."""
+
+    def __init__(self):
+        self.total_records = 0
+        self.null_places = 0
+        self.places = Counter()
+        self.gm_places = Counter()
+        self.categories = Counter()
+        self.years = Counter()
+        self.ranks = {name: {'min': None, 'max': None, 'sum': 0.0, 'count': 0, 'non_numeric': 0}
+                      for name in RANK_COLUMNS}
+        self.invalid_ranges = 0
+        self.negative_ranks = 0
+        self.zero_seats = 0
+
+    def add_group(self, row):
+        place, category, year, count = row[:4]
+        self.total_records += count
+
+        if place is None or not str(place).strip():
+            self.null_places += count
+        else:
+            self.places[place] += count
+            if category == 'GM':
+                self.gm_places[place] += count
+        self.categories[category] += count
+        self.years[year] += count
+
+        for i, name in enumerate(RANK_COLUMNS):
+            low, high, total, numeric, non_numeric = row[4 + 5 * i:9 + 5 * i]
+            stats = self.ranks[name]
+            stats['non_numeric'] += non_numeric or 0
+            if not numeric:
+                continue
+            stats['min'] = low if stats['min'] is None else min(stats['min'], low)
+            stats['max'] = high if stats['max'] is None else max(stats['max'], high)
+            stats['sum'] += total
+            stats['count'] += numeric
+
+        invalid_ranges, negative_ranks, zero_seats = row[14:17]
+        self.invalid_ranges += invalid_ranges or 0
+        self.negative_ranks += negative_ranks or 0
+        self.zero_seats += zero_seats or 0
+
+    def place_variations(self):
+        variations = {}
+        for place in self.places:
+            variations.setdefault(str(place).lower().strip(), []).append(place)
+        return {base: sorted(names) for base, names in variations.items() if len(names) > 1}
+
+    def to_dict(self):
+        ranks = {}
+        for name, stats in self.ranks.items():
+            ranks[name] = {
+                'min': stats['min'],
+                'max': stats['max'],
+                'avg': stats['sum'] / stats['count'] if stats['count'] else None,
+                'non_numeric': stats['non_numeric'],
+            }
+        return {
+            'total_records': self.total_records,
+            'null_places': self.null_places,
+            'distinct_places': len(self.places),
+            'places': dict(sorted((str(k), v) for k, v in self.places.items())),
+            'place_variations': self.place_variations(),
+            'top_gm_places': dict((str(k), v) for k, v in self.gm_places.most_common(TOP_PLACES)),
+            'distinct_categories': len(self.categories),
+            'categories': dict(sorted((str(k), v) for k, v in self.categories.items())),
+            'years': dict(sorted((str(k), v) for k, v in self.years.items())),
+            'ranks': ranks,
+            'invalid_ranges': self.invalid_ranges,
+            'negative_ranks': self.negative_ranks,
+            'zero_seats': self.zero_seats,
+        }
+
+
+def profile_table(db_path, table_name):
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        exists = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                              (table_name,)).fetchone()
+        if not exists:
+            return table_name, {'exists': False}
+
+        columns = [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info({table_name})")]
+        profile = TableProfile()
+        for row in conn.execute(PROFILE_QUERY.format(table_name=table_name)):
+            profile.add_group(row)
+    finally:
+        conn.close()
+
+    result = {'exists': True, 'columns': columns}
+    result.update(profile.to_dict())
+    result['elapsed_seconds'] = round(time.perf_counter() - start, 4)
+    return table_name, result
+
+
+def table_issues(table_name, profile):
+    if not profile.get('exists'):
+        return [f"{table_name}: table does not exist"]
+
+    issues = []
+    checks = [
+        ('null_places', 'records have a NULL/empty place'),
+        ('invalid_ranges', 'records have opening rank > closing rank'),
+        ('negative_ranks', 'records have negative ranks'),
+        ('zero_seats', 'records have zero or negative seats'),
+    ]
+    for key, message in checks:
+        if profile[key]:
+            issues.append(f"{table_name}: {profile[key]} {message}")
+    for name, stats in profile['ranks'].items():
+        if stats['non_numeric']:
+            issues.append(f"{table_name}: {stats['non_numeric']} records have a non-numeric {name}")
+    for base, names in profile['place_variations'].items():
+        issues.append(f"{table_name}: multiple variations for place '{base}': {names}")
+    unexpected = sorted(set(profile['categories']) - EXPECTED_CATEGORIES)
+    if unexpected:
+        issues.append(f"{table_name}: unexpected categories {unexpected}")
+    return issues
+
+
+def profile_database(db_path=DB_PATH, tables=COLLEGE_TABLES, workers=None):
+    """Profile every table in parallel (one process per table) and build the report."""
+    start = time.perf_counter()
+    workers = workers or min(len(tables), os.cpu_count() or 1)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(profile_table, [db_path] * len(tables), tables))
+    else:
+        results = [profile_table(db_path, table_name) for table_name in tables]
+
+    profiles = dict(results)
+    issues = [issue for table_name in tables for issue in table_issues(table_name, profiles[table_name])]
+    return {
+        'database': db_path,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'elapsed_seconds': round(time.perf_counter() - start, 4),
+        'tables': profiles,
+        'issues': issues,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-pass data-quality report for the cutoff tables')
+    parser.add_argument('--db', default=DB_PATH, help='SQLite database to profile')
+    parser.add_argument('--output', help='Write the JSON report to this file (default: stdout)')
+    parser.add_argument('--workers', type=int, default=None, help='Tables profiled in parallel')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found at: {args.db}", file=sys.stderr)
+        return 1
+
+    report = profile_database(args.db, workers=args.workers)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Profiled {len(report['tables'])} tables in {report['elapsed_seconds']}s, "
+              f"{len(report['issues'])} issues -> {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
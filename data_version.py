@@ -0,0 +1,94 @@
+# data_version.py - Version stamp for the cutoff dataset (written by init_db.py and forecast_cutoffs.py)
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+VERSION_KEY = 'data_version'
+# Besides the <type>_colleges tables
+DERIVED_TABLES = {'forecast_cutoffs', 'place_aliases', 'search_terms'}
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def data_tables(conn):
+    """The tables predictions read: cutoffs, forecasts and the place/search indexes."""
+    names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    return sorted(name for name in names if name.endswith('_colleges') or name in DERIVED_TABLES)
+
+
+def compute_data_version(conn):
+    """Content hash of the data as loaded, so identical data keeps its version.
+
+    Hashing the tables rather than the source files means a change to how
+    init_db.py validates, dedupes or indexes the rows changes the version too.
+    """
+    digest = hashlib.sha256()
+    for table in data_tables(conn):
+        schema = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                              (table,)).fetchone()[0]
+        digest.update(schema.encode())
+        for row in conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid'):
+            digest.update(repr(row).encode())
+    return digest.hexdigest()[:16]
+
+
+def stamp_data_version(conn, source_files=None):
+    """Stamp the version of the tables as they are now; call after every write to them."""
+    version = compute_data_version(conn)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    meta = [
+        (VERSION_KEY, version),
+        ('stamped_at', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())),
+    ]
+    if source_files is not None:
+        meta.append(('sources', json.dumps(sorted(os.path.basename(str(p)) for p in source_files))))
+    conn.executemany('INSERT OR REPLACE INTO data_meta (key, value) VALUES (?, ?)', meta)
+    return version
+
+
+def read_data_version(db_path):
+    """The stamped data version, or None for databases built before stamping.
+
+    Cached per database file and re-read only when the file changes.
+    """
+    try:
+        mtime = os.stat(db_path).st_mtime_ns
+    except OSError:
+        return None
+
+    cached = _cache.get(db_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    version = None
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute('SELECT value FROM data_meta WHERE key = ?', (VERSION_KEY,)).fetchone()
+            version = row[0] if row else None
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        version = None
+
+    with _cache_lock:
+        _cache[db_path] = (mtime, version)
+    return version
+
+
+def artifact_version(path):
+    """Cheap fingerprint of a build artifact such as model.pkl."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
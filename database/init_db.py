@@ -5,6 +5,13 @@ import os
 from pathlib import Path
 import sys
 
+# Shared helpers live at the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from place_index import write_place_aliases
+from autocomplete import write_search_terms
+from data_version import stamp_data_version
+from validation import validate_cutoffs, write_quarantine, reason_counts
+
 
 def init_database():
     print("🔧 Initializing College Predictor Database...")
@@ -124,6 +131,14 @@ def init_database():
 
                 # Create table for each college type
                 table_name = f"{college_type}_colleges"
+
+                # Validate every row up front; failures go to the quarantine table with reasons
+                df, rejected = validate_cutoffs(df)
+                quarantined = write_quarantine(conn, table_name, rejected)
+                if quarantined:
+                    print(f"⚠️  Quarantined {quarantined} invalid rows: {reason_counts(rejected)}")
+                else:
+                    print("✅ All rows passed validation")
                 print(f"Creating/checking table: {table_name}")
 
                 cursor.execute(f'''
@@ -159,6 +174,9 @@ def init_database():
                     # Insert data into temp table
                     df.to_sql(f'{table_name}_temp', conn, if_exists='replace', index=False)
 
+                    # Replace the table's contents so no rows from earlier loads bypass validation
+                    cursor.execute(f'DELETE FROM {table_name}')
+
                     # Copy data from temp to main table
                     cursor.execute(f'INSERT OR REPLACE INTO {table_name} SELECT * FROM {table_name}_temp')
 
@@ -215,6 +233,22 @@ def init_database():
                 )
             ''')
 
+    # Build the place alias index used by predict_colleges
+    print("\n📍 Building place alias index...")
+    alias_count = write_place_aliases(conn)
+    print(f"✅ Indexed {alias_count} place aliases")
+
+    # Build the autocomplete terms served by /autocomplete
+    print("\n🔎 Building autocomplete terms...")
+    term_count = write_search_terms(conn)
+    print(f"✅ Indexed {term_count} search terms")
+
+    # Stamp the data version used for prediction ETags and cache invalidation
+    source_files = [datasets_dir / file_name for file_name in datasets.values()
+                    if (datasets_dir / file_name).exists()]
+    data_version = stamp_data_version(conn, source_files)
+    print(f"🏷️  Data version: {data_version}")
+
     # Verify tables were created
     print("\n📊 Verifying database structure...")
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
@@ -2,7 +2,8 @@
 import sqlite3
 import pandas as pd
 import os
-import json
+
+from data_profiler import COLLEGE_TABLES, profile_database
 
 
 def debug_database():
@@ -25,178 +26,77 @@ def debug_database():
     for table in tables:
         print(f"  - {table[0]}")
     print("=" * 80)
+    conn.close()
 
-    # Define the tables to check
-    college_tables = ['mca_colleges', 'mba_colleges', 'mtech_colleges']
+    # Every statistic below comes from one pass per table, tables profiled in parallel
+    report = profile_database(db_path, COLLEGE_TABLES)
+    print(f"⏱️  Profiled {len(COLLEGE_TABLES)} tables in {report['elapsed_seconds']}s")
 
-    for table_name in college_tables:
+    for table_name in COLLEGE_TABLES:
+        profile = report['tables'][table_name]
         print(f"\n🔍 Checking table: {table_name}")
         print("-" * 60)
 
-        try:
-            # Check if table exists
-            cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
-            if not cursor.fetchone():
-                print(f"❌ Table {table_name} does not exist!")
-                continue
-
-            # Get table structure
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = cursor.fetchall()
-            print(f"📝 Table columns ({len(columns)} columns):")
-            for col in columns:
-                print(f"  - {col[1]} ({col[2]})")
-
-            # Get count of records
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            total_records = cursor.fetchone()[0]
-            print(f"📊 Total records: {total_records}")
-
-            # Check for NULL or empty place values
-            print(f"\n🔎 Checking for NULL/empty place values:")
-            cursor.execute(f"""
-                SELECT COUNT(*) 
-                FROM {table_name} 
-                WHERE place IS NULL OR place = '' OR TRIM(place) = ''
-            """)
-            null_places = cursor.fetchone()[0]
-            print(f"  - Records with NULL/empty place: {null_places}")
-
-            # Get all distinct places
-            print(f"\n📍 Distinct places in {table_name}:")
-            cursor.execute(f"""
-                SELECT DISTINCT place, COUNT(*) as college_count
-                FROM {table_name}
-                WHERE place IS NOT NULL AND place != '' AND TRIM(place) != ''
-                GROUP BY place
-                ORDER BY place
-            """)
-
-            places_data = cursor.fetchall()
-            print(f"  - Total distinct places: {len(places_data)}")
-
-            if len(places_data) > 0:
-                # Print places in a formatted way
-                print("\n  Places (with college count):")
-                for place, count in places_data:
-                    print(f"    - '{place}' ({count} colleges)")
-
-                # Find common place name variations
-                print(f"\n🔍 Analyzing place name patterns:")
-                place_variations = {}
-                for place, count in places_data:
-                    place_lower = str(place).lower().strip()
-                    if place_lower not in place_variations:
-                        place_variations[place_lower] = []
-                    place_variations[place_lower].append(place)
-
-                # Report variations
-                variations_found = False
-                for base_name, variations in place_variations.items():
-                    if len(variations) > 1:
-                        print(f"    ⚠️  Multiple variations for '{base_name}': {variations}")
-                        variations_found = True
-
-                if not variations_found:
-                    print("    ✅ No place name variations found")
-
-            # Check specific problematic queries
-            print(f"\n🔬 Testing specific queries for {table_name}:")
-
-            # Test 1: Bengaluru variations
-            test_queries = [
-                ("Bengaluru", f"SELECT COUNT(*) FROM {table_name} WHERE place = 'Bengaluru'"),
-                ("Bangalore", f"SELECT COUNT(*) FROM {table_name} WHERE place = 'Bangalore'"),
-                ("Bangalore (case-insensitive)", f"SELECT COUNT(*) FROM {table_name} WHERE LOWER(place) = 'bengaluru'"),
-                ("Bangalore (like)",
-                 f"SELECT COUNT(*) FROM {table_name} WHERE place LIKE '%Bengaluru%' OR place LIKE '%Bangalore%'")
-            ]
-
-            for test_name, query in test_queries:
-                try:
-                    cursor.execute(query)
-                    count = cursor.fetchone()[0]
-                    print(f"  - {test_name}: {count} colleges")
-                except Exception as e:
-                    print(f"  - {test_name}: Error - {e}")
-
-            # Test 2: Check category distribution
-            print(f"\n📊 Category distribution in {table_name}:")
-            cursor.execute(f"""
-                SELECT category, COUNT(*) as count
-                FROM {table_name}
-                GROUP BY category
-                ORDER BY category
-            """)
-            categories = cursor.fetchall()
-            for category, count in categories:
-                print(f"  - {category}: {count} colleges")
-
-            # Test 3: Sample data with specific rank range
-            print(f"\n🔍 Sample colleges (GM category, rank range 300-500):")
-            cursor.execute(f"""
-                SELECT college_name, place, opening_cutoff_rank, closing_cutoff_rank, category
-                FROM {table_name}
-                WHERE category = 'GM'
-                  AND opening_cutoff_rank <= 500
-                  AND closing_cutoff_rank >= 300
-                ORDER BY opening_cutoff_rank
-                LIMIT 5
-            """)
+        if not profile['exists']:
+            print(f"❌ Table {table_name} does not exist!")
+            continue
 
-            sample_colleges = cursor.fetchall()
-            if sample_colleges:
-                for college in sample_colleges:
-                    print(f"    - {college[0]} ({college[1]}): {college[2]}-{college[3]} ({college[4]})")
-            else:
-                print("    No colleges found in rank range 300-500")
-
-                # Show what ranks are available
-                cursor.execute(f"""
-                    SELECT MIN(opening_cutoff_rank), MAX(closing_cutoff_rank), AVG(opening_cutoff_rank), AVG(closing_cutoff_rank)
-                    FROM {table_name}
-                    WHERE category = 'GM'
-                """)
-                min_open, max_close, avg_open, avg_close = cursor.fetchone()
-                print(f"    Rank range available: {min_open} to {max_close}")
-                print(f"    Average range: {avg_open:.0f} to {avg_close:.0f}")
-
-            # Test 4: Check specific place queries
-            print(f"\n🔍 College counts by place (GM category):")
-            top_places_query = f"""
-                SELECT place, COUNT(*) as count
-                FROM {table_name}
-                WHERE category = 'GM'
-                GROUP BY place
-                ORDER BY count DESC
-                LIMIT 10
-            """
+        print(f"📝 Table columns ({len(profile['columns'])} columns):")
+        for name, column_type in profile['columns']:
+            print(f"  - {name} ({column_type})")
 
-            try:
-                df_places = pd.read_sql(top_places_query, conn)
-                if len(df_places) > 0:
-                    print(df_places.to_string(index=False))
-                else:
-                    print("    No data found")
-            except Exception as e:
-                print(f"    Error: {e}")
-
-            # Test 5: Year distribution
-            print(f"\n📅 Year distribution in {table_name}:")
-            cursor.execute(f"""
-                SELECT year, COUNT(*) as count
-                FROM {table_name}
-                GROUP BY year
-                ORDER BY year
-            """)
-            years = cursor.fetchall()
-            for year, count in years:
-                print(f"  - {year}: {count} colleges")
+        print(f"📊 Total records: {profile['total_records']}")
 
-        except Exception as e:
-            print(f"❌ Error analyzing {table_name}: {e}")
-            import traceback
-            traceback.print_exc()
+        print(f"\n🔎 Checking for NULL/empty place values:")
+        print(f"  - Records with NULL/empty place: {profile['null_places']}")
+
+        places = profile['places']
+        print(f"\n📍 Distinct places in {table_name}:")
+        print(f"  - Total distinct places: {profile['distinct_places']}")
+        if places:
+            print("\n  Places (with college count):")
+            for place, count in places.items():
+                print(f"    - '{place}' ({count} colleges)")
+
+            print(f"\n🔍 Analyzing place name patterns:")
+            if profile['place_variations']:
+                for base_name, variations in profile['place_variations'].items():
+                    print(f"    ⚠️  Multiple variations for '{base_name}': {variations}")
+            else:
+                print("    ✅ No place name variations found")
+
+        print(f"\n🔬 Place lookups for {table_name}:")
+        place_tests = [
+            ("Bengaluru", lambda place: place == 'Bengaluru'),
+            ("Bangalore", lambda place: place == 'Bangalore'),
+            ("Bangalore (case-insensitive)", lambda place: place.lower() == 'bengaluru'),
+            ("Bangalore (like)", lambda place: 'bengaluru' in place.lower() or 'bangalore' in place.lower()),
+        ]
+        for test_name, matches in place_tests:
+            count = sum(count for place, count in places.items() if matches(place))
+            print(f"  - {test_name}: {count} colleges")
+
+        print(f"\n📊 Category distribution in {table_name}:")
+        for category, count in profile['categories'].items():
+            print(f"  - {category}: {count} colleges")
+
+        ranks = profile['ranks']
+        opening, closing = ranks['opening_cutoff_rank'], ranks['closing_cutoff_rank']
+        print(f"\n🔍 Cutoff ranks:")
+        print(f"    Rank range available: {opening['min']} to {closing['max']}")
+        if opening['avg'] is not None and closing['avg'] is not None:
+            print(f"    Average range: {opening['avg']:.0f} to {closing['avg']:.0f}")
+
+        print(f"\n🔍 College counts by place (GM category):")
+        if profile['top_gm_places']:
+            for place, count in profile['top_gm_places'].items():
+                print(f"    {place}: {count}")
+        else:
+            print("    No data found")
+
+        print(f"\n📅 Year distribution in {table_name}:")
+        for year, count in profile['years'].items():
+            print(f"  - {year}: {count} colleges")
 
         print("=" * 80)
 
@@ -204,113 +104,24 @@ def debug_database():
     print("\n🔧 ADDITIONAL DATABASE ANALYSIS")
     print("=" * 80)
 
-    # Check data consistency across tables
-    print("\n📊 Comparing data across all college tables:")
-    for table in college_tables:
-        try:
-            # Check if table exists
-            cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='{table}'")
-            if cursor.fetchone()[0] == 0:
-                continue
-
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            count = cursor.fetchone()[0]
-
-            cursor.execute(f"SELECT COUNT(DISTINCT place) FROM {table} WHERE place IS NOT NULL")
-            place_count = cursor.fetchone()[0]
-
-            cursor.execute(f"SELECT COUNT(DISTINCT category) FROM {table}")
-            category_count = cursor.fetchone()[0]
-
-            print(f"  {table}:")
-            print(f"    - Total records: {count}")
-            print(f"    - Distinct places: {place_count}")
-            print(f"    - Distinct categories: {category_count}")
-
-        except Exception as e:
-            print(f"  {table}: Error - {e}")
-
-    # Check for common issues
     print("\n🔍 Checking for common data issues:")
-
-    # 1. Check for invalid rank ranges (opening > closing)
-    for table in college_tables:
-        try:
-            cursor.execute(f"""
-                SELECT COUNT(*) 
-                FROM {table} 
-                WHERE opening_cutoff_rank > closing_cutoff_rank
-            """)
-            invalid_ranges = cursor.fetchone()[0]
-            if invalid_ranges > 0:
-                print(f"  ⚠️  {table}: {invalid_ranges} records have opening rank > closing rank")
-        except:
-            pass
-
-    # 2. Check for negative ranks
-    for table in college_tables:
-        try:
-            cursor.execute(f"""
-                SELECT COUNT(*) 
-                FROM {table} 
-                WHERE opening_cutoff_rank < 0 OR closing_cutoff_rank < 0
-            """)
-            negative_ranks = cursor.fetchone()[0]
-            if negative_ranks > 0:
-                print(f"  ⚠️  {table}: {negative_ranks} records have negative ranks")
-        except:
-            pass
-
-    # 3. Check for zero seats
-    for table in college_tables:
-        try:
-            cursor.execute(f"""
-                SELECT COUNT(*) 
-                FROM {table} 
-                WHERE seats <= 0
-            """)
-            zero_seats = cursor.fetchone()[0]
-            if zero_seats > 0:
-                print(f"  ⚠️  {table}: {zero_seats} records have zero or negative seats")
-        except:
-            pass
+    if report['issues']:
+        for issue in report['issues']:
+            print(f"  ⚠️  {issue}")
+    else:
+        print("  ✅ No issues found")
 
     # Create summary report
     print("\n📋 SUMMARY REPORT")
     print("=" * 80)
 
-    summary = []
-    for table in college_tables:
-        try:
-            cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='{table}'")
-            if cursor.fetchone()[0] == 0:
-                summary.append(f"{table}: Table does not exist")
-                continue
-
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            total = cursor.fetchone()[0]
-
-            cursor.execute(f"SELECT COUNT(DISTINCT place) FROM {table}")
-            places = cursor.fetchone()[0]
-
-            cursor.execute(f"SELECT COUNT(DISTINCT category) FROM {table}")
-            categories = cursor.fetchone()[0]
-
-            cursor.execute(f"""
-                SELECT COUNT(*) 
-                FROM {table} 
-                WHERE place IS NULL OR place = '' OR TRIM(place) = ''
-            """)
-            null_places = cursor.fetchone()[0]
-
-            summary.append(
-                f"{table}: {total} records, {places} places, {categories} categories, {null_places} null places")
-
-        except Exception as e:
-            summary.append(f"{table}: Error - {e}")
-
-    for item in summary:
-        print(f"  - {item}")
+    for table_name in COLLEGE_TABLES:
+        profile = report['tables'][table_name]
+        if not profile['exists']:
+            print(f"  - {table_name}: Table does not exist")
+            continue
+        print(f"  - {table_name}: {profile['total_records']} records, {profile['distinct_places']} places, "
+              f"{profile['distinct_categories']} categories, {profile['null_places']} null places")
 
     print("\n💡 RECOMMENDATIONS:")
     print("  1. Ensure place names are consistent (e.g., use 'Bengaluru' instead of 'Bangalore')")
@@ -318,8 +129,8 @@ def debug_database():
     print("  3. Verify rank ranges are valid (opening <= closing)")
     print("  4. Check category names match expected values (GM, OBC, SC, ST)")
     print("  5. Ensure all required tables exist and have data")
+    print("  6. For a machine-readable report run: python data_profiler.py --output report.json")
 
-    conn.close()
     print("\n✅ Debug complete!")
 
 
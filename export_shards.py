@@ -0,0 +1,186 @@
+# export_shards.py - Static prediction shards resolved in the browser instead of by /predict
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+
+from flask import abort, jsonify
+
+import rank_sweep
+from assets import IMMUTABLE_CACHE_CONTROL, STATIC_DIR, send_precompressed
+from data_version import read_data_version
+from payloads import to_columnar
+from place_index import COLLEGE_TABLES, build_alias_rows, fetch_distinct_places
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DB_PATH = os.path.join(BASE_DIR, 'database', 'college_data.db')
+SHARDS_DIR = os.path.join(STATIC_DIR, 'shards')
+MANIFEST_NAME = 'manifest.json'
+
+# Everything the prediction page renders; admission probability needs the model, so it is
+# only available from /predict
+SHARD_FIELDS = ['college_id', 'college_name', 'place', 'state', 'opening_cutoff_rank',
+                'closing_cutoff_rank', 'seats', 'year', 'website']
+
+SHARD_FORMAT = 1
+
+
+# Build
+
+
+def shard_key(table_name, state, exam_type, category):
+    """Bucket key the browser builds from the form: "<table>|<state>|<exam>|<category>"."""
+    return '|'.join([table_name, str(state), str(exam_type), str(category)])
+
+
+def shard_filename(key):
+    return re.sub(r'[^a-z0-9]+', '-', key.lower()).strip('-') + '.json'
+
+
+def rank_segments(rows):
+    """Sorted rank breakpoints and the rows in range for each segment between them.
+
+    Matches only change where some row's range opens or closes, so a rank
+    resolves to `segments[bisect_right(breakpoints, rank)]`.
+    """
+    return rank_sweep.segments([row['opening_cutoff_rank'] for row in rows],
+                               [row['closing_cutoff_rank'] for row in rows])
+
+
+def build_shard(rows):
+    # Rows stay in table order, which is the order /predict returns its matches in
+    shard = to_columnar(rows, SHARD_FIELDS)
+    shard['breakpoints'], shard['segments'] = rank_segments(rows)
+    shard['format'] = SHARD_FORMAT
+    return shard
+
+
+def write_json(path, payload):
+    content = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(content)
+    with open(f"{path}.gz", 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(f"{path}.br", 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+    return len(content)
+
+
+def fetch_buckets(conn, table_name):
+    """Bucket key -> rows, for every (state, exam, category) in a cutoff table."""
+    conn.row_factory = sqlite3.Row
+    buckets = {}
+    try:
+        rows = conn.execute(f'SELECT {", ".join(SHARD_FIELDS)}, exam_type, category FROM {table_name} '
+                            f'ORDER BY rowid').fetchall()
+    finally:
+        conn.row_factory = None
+    for row in rows:
+        key = shard_key(table_name, row['state'], row['exam_type'], row['category'])
+        buckets.setdefault(key, []).append({field: row[field] for field in SHARD_FIELDS})
+    return buckets
+
+
+def export_shards(db_path=DB_PATH, shards_dir=SHARDS_DIR, tables=COLLEGE_TABLES):
+    """Write one shard per bucket under shards/<data version>/ plus the manifest; returns it."""
+    conn = sqlite3.connect(db_path)
+    try:
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        buckets = {}
+        for table_name in tables:
+            if table_name in existing:
+                buckets.update(fetch_buckets(conn, table_name))
+        places = build_alias_rows(fetch_distinct_places(conn, tables))
+    finally:
+        conn.close()
+
+    data_version = read_data_version(db_path)
+    if data_version is None:
+        raise RuntimeError("Database has no data version; run database/init_db.py first")
+
+    # Old versions are removed only after the new manifest is in place
+    os.makedirs(os.path.join(shards_dir, data_version), exist_ok=True)
+    shards = {}
+    for key, rows in sorted(buckets.items()):
+        filename = shard_filename(key)
+        size = write_json(os.path.join(shards_dir, data_version, filename), build_shard(rows))
+        shards[key] = f"{data_version}/{filename}"
+        print(f"  - {key}: {len(rows)} rows -> {filename} ({size} bytes)")
+
+    manifest = {
+        'data_version': data_version,
+        'format': SHARD_FORMAT,
+        'shards': shards,
+        # Exact and alias spellings only; anything fuzzier is left to /predict
+        'places': dict(places),
+    }
+    temp_path = os.path.join(shards_dir, f'{MANIFEST_NAME}.tmp')
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'), sort_keys=True)
+    os.replace(temp_path, os.path.join(shards_dir, MANIFEST_NAME))
+
+    for stale in os.listdir(shards_dir):
+        if stale not in (data_version, MANIFEST_NAME) and os.path.isdir(os.path.join(shards_dir, stale)):
+            shutil.rmtree(os.path.join(shards_dir, stale))
+    return manifest
+
+
+# Serving
+
+_manifest_cache = {}
+
+
+def load_manifest(shards_dir=SHARDS_DIR):
+    path = os.path.join(shards_dir, MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _manifest_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(path) as f:
+                cached = _manifest_cache[path] = (mtime, json.load(f))
+        except (OSError, ValueError):
+            return None
+    return cached[1]
+
+
+def init_shards(app, db_path=DB_PATH):
+    @app.route('/static/shards/manifest.json')
+    def shard_manifest():
+        # Only advertise shards built from the data /predict is serving, so a stale
+        # export sends the browser back to /predict instead of to old cutoffs
+        manifest = load_manifest()
+        if manifest is None or manifest['data_version'] != read_data_version(db_path):
+            abort(404)
+        response = jsonify(manifest)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    @app.route('/static/shards/<path:filename>')
+    def shard_file(filename):
+        # Shard paths carry the data version, so they never change once written
+        return send_precompressed(SHARDS_DIR, filename, IMMUTABLE_CACHE_CONTROL)
+
+
+if __name__ == '__main__':
+    print("🧩 Exporting prediction shards...")
+    try:
+        exported = export_shards(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
+    except Exception as e:
+        print(f"❌ Error exporting shards: {e}")
+        sys.exit(1)
+    print(f"✅ Exported {len(exported['shards'])} shards for data version {exported['data_version']}")
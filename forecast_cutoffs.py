@@ -0,0 +1,190 @@
+# forecast_cutoffs.py - Offline cutoff-trend forecasts (run after database/init_db.py)
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_version import stamp_data_version
+
+DB_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'database', 'college_data.db')
+
+COLLEGE_TYPES = ['mca', 'mba', 'mtech']
+FORECAST_TABLE = 'forecast_cutoffs'
+GROUP_KEYS = ['college_id', 'category']
+
+# Columns carried over from the latest historical row of each group
+CARRIED_COLUMNS = ['college_name', 'state', 'place', 'exam_type', 'seats', 'website', 'background_images']
+
+# ~80% two-sided band
+Z_SCORE = 1.2816
+# Band never narrower than this fraction of the forecast (two points fit a line exactly)
+MIN_RELATIVE_BAND = 0.05
+
+
+def fit_trends(df, target_year):
+    """Vectorized per-(college_id, category) least-squares trend of the cutoffs over year.
+
+    Returns one row per group with projected opening/closing ranks and bands.
+    """
+    df = df.copy()
+    df['year'] = pd.to_numeric(df['year'], errors='coerce')
+    for column in ('opening_cutoff_rank', 'closing_cutoff_rank'):
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    df = df.dropna(subset=['year', 'opening_cutoff_rank', 'closing_cutoff_rank'])
+    # Repeated source rows would overstate how much history backs a trend
+    df = df.drop_duplicates(subset=GROUP_KEYS + ['year', 'opening_cutoff_rank', 'closing_cutoff_rank'])
+    if df.empty:
+        return pd.DataFrame()
+
+    grouped = df.groupby(GROUP_KEYS, sort=False)
+    stats = grouped.agg(n=('year', 'size'), mean_x=('year', 'mean'), last_year=('year', 'max'))
+
+    df = df.join(stats[['mean_x']], on=GROUP_KEYS)
+    dx = df['year'] - df['mean_x']
+    df['dx2'] = dx * dx
+
+    result = stats.copy()
+    result['sxx'] = df.groupby(GROUP_KEYS, sort=False)['dx2'].sum()
+
+    for column, name in (('opening_cutoff_rank', 'opening'), ('closing_cutoff_rank', 'closing')):
+        df[f'{name}_mean'] = df.groupby(GROUP_KEYS, sort=False)[column].transform('mean')
+        df[f'{name}_dxy'] = dx * (df[column] - df[f'{name}_mean'])
+        sxy = df.groupby(GROUP_KEYS, sort=False)[f'{name}_dxy'].sum()
+        mean_y = df.groupby(GROUP_KEYS, sort=False)[column].mean()
+
+        sxx = result['sxx'].to_numpy()
+        slope = np.divide(sxy.to_numpy(), sxx, out=np.zeros_like(sxx, dtype=float), where=sxx > 0)
+        intercept = mean_y.to_numpy() - slope * result['mean_x'].to_numpy()
+
+        # Residual standard error per group
+        fitted = (df.join(pd.DataFrame({f'{name}_slope': slope, f'{name}_intercept': intercept},
+                                       index=result.index), on=GROUP_KEYS))
+        residual = fitted[column] - (fitted[f'{name}_intercept'] + fitted[f'{name}_slope'] * fitted['year'])
+        sse = (residual ** 2).groupby([fitted[key] for key in GROUP_KEYS], sort=False).sum()
+        sse = sse.reindex(result.index).to_numpy()
+        n = result['n'].to_numpy()
+        dof = np.maximum(n - 2, 1)
+        sigma = np.sqrt(sse / dof)
+
+        forecast = intercept + slope * target_year
+        leverage = 1 + 1 / n + np.divide((target_year - result['mean_x'].to_numpy()) ** 2, sxx,
+                                         out=np.zeros_like(sxx, dtype=float), where=sxx > 0)
+        half_width = np.maximum(Z_SCORE * sigma * np.sqrt(leverage), MIN_RELATIVE_BAND * np.abs(forecast))
+
+        result[f'projected_{name}'] = forecast
+        result[f'{name}_low'] = forecast - half_width
+        result[f'{name}_high'] = forecast + half_width
+        result[f'{name}_slope'] = slope
+
+    rank_columns = ['projected_opening', 'opening_low', 'opening_high',
+                    'projected_closing', 'closing_low', 'closing_high']
+    result[rank_columns] = np.maximum(np.rint(result[rank_columns].to_numpy()), 1).astype(np.int64)
+    # A projected range must stay a valid range
+    result['projected_closing'] = np.maximum(result['projected_closing'], result['projected_opening'])
+
+    latest = df.sort_values('year').groupby(GROUP_KEYS, sort=False).tail(1).set_index(GROUP_KEYS)
+    result = result.join(latest[CARRIED_COLUMNS])
+    return result.reset_index()
+
+
+def build_forecasts(conn, target_year=None):
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    frames = []
+
+    for college_type in COLLEGE_TYPES:
+        table_name = f"{college_type}_colleges"
+        if table_name not in tables:
+            print(f"⚠️  Table {table_name} not found, skipping")
+            continue
+
+        df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+        if df.empty:
+            continue
+        year = target_year or int(pd.to_numeric(df['year'], errors='coerce').max()) + 1
+
+        trends = fit_trends(df, year)
+        if trends.empty:
+            continue
+        trends['college_type'] = college_type.upper()
+        trends['year'] = year
+        frames.append(trends)
+        print(f"📈 {table_name}: {len(trends)} forecasts for {year}")
+
+    if not frames:
+        return 0
+
+    forecasts = pd.concat(frames, ignore_index=True)
+    forecasts = forecasts.rename(columns={
+        'projected_opening': 'opening_cutoff_rank',
+        'projected_closing': 'closing_cutoff_rank',
+        'n': 'years_used',
+    })
+    columns = ['college_id', 'college_name', 'college_type', 'state', 'place', 'exam_type', 'category',
+               'opening_cutoff_rank', 'closing_cutoff_rank', 'seats', 'year', 'website', 'background_images',
+               'opening_low', 'opening_high', 'closing_low', 'closing_high',
+               'opening_slope', 'closing_slope', 'years_used']
+
+    conn.execute(f'DROP TABLE IF EXISTS {FORECAST_TABLE}')
+    conn.execute(f'''
+        CREATE TABLE {FORECAST_TABLE} (
+            college_id TEXT,
+            college_name TEXT,
+            college_type TEXT,
+            state TEXT,
+            place TEXT,
+            exam_type TEXT,
+            category TEXT,
+            opening_cutoff_rank INTEGER,
+            closing_cutoff_rank INTEGER,
+            seats INTEGER,
+            year INTEGER,
+            website TEXT,
+            background_images TEXT,
+            opening_low INTEGER,
+            opening_high INTEGER,
+            closing_low INTEGER,
+            closing_high INTEGER,
+            opening_slope REAL,
+            closing_slope REAL,
+            years_used INTEGER,
+            PRIMARY KEY (college_type, college_id, category)
+        )
+    ''')
+    # Same lookup shape as predict_colleges' historical query
+    conn.execute(f'''
+        CREATE INDEX idx_{FORECAST_TABLE}_lookup
+        ON {FORECAST_TABLE} (college_type, state, exam_type, category, place)
+    ''')
+
+    placeholders = ', '.join('?' for _ in columns)
+    records = forecasts[columns].astype(object).where(forecasts[columns].notna(), None)
+    conn.executemany(f"INSERT INTO {FORECAST_TABLE} ({', '.join(columns)}) VALUES ({placeholders})",
+                     records.itertuples(index=False, name=None))
+    conn.commit()
+    return len(forecasts)
+
+
+def main():
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Please run init_db.py first.")
+        return 1
+
+    target_year = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print("🔮 Building cutoff forecasts...")
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        count = build_forecasts(conn, target_year)
+        # Projected predictions, their ETags and cached buckets follow the data version
+        data_version = stamp_data_version(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"✅ Wrote {count} rows to {FORECAST_TABLE}")
+    print(f"🏷️  Data version: {data_version}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
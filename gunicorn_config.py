@@ -1,5 +1,6 @@
 # gunicorn_config.py
 import multiprocessing
+import os
 
 # Bind to the port specified by the PORT environment variable
 bind = "0.0.0.0:" + str(int(os.environ.get("PORT", 5000)))
@@ -7,8 +8,11 @@ bind = "0.0.0.0:" + str(int(os.environ.get("PORT", 5000)))
 # Number of workers
 workers = multiprocessing.cpu_count() * 2 + 1
 
-# Worker class
-worker_class = 'sync'
+# Worker class. With GUNICORN_THREADS > 1 each worker serves requests on a
+# thread pool, and identical predictions arriving together share one computation
+# (single_flight.py) instead of each taking a worker.
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+worker_class = 'gthread' if threads > 1 else 'sync'
 
 # Timeout
 timeout = 120
@@ -19,4 +23,34 @@ keepalive = 5
 # Logging
 accesslog = '-'
 errorlog = '-'
-loglevel = 'info'
\ No newline at end of file
+loglevel = 'info'
+
+# Metrics: each worker writes its snapshot into this directory so /metrics
+# reports host-wide totals. Start every server run from a clean directory.
+raw_env = ["METRICS_MULTIPROC_DIR=" + os.environ.get("METRICS_MULTIPROC_DIR", "/tmp/college_predictor_metrics")]
+
+
+def on_starting(server):
+    from metrics import clear_multiproc_dir
+    clear_multiproc_dir(os.environ.get("METRICS_MULTIPROC_DIR", "/tmp/college_predictor_metrics"))
+    # Cached predictions stay valid across restarts; per-worker stats do not
+    from shared_cache import clear_worker_stats
+    clear_worker_stats()
+
+
+# Load pandas and the ML model in each worker before it accepts requests, so
+# the first prediction doesn't pay for it. Set PRELOAD_MODEL=false to defer
+# loading to the first prediction instead. Each worker also watches for new
+# cutoff data and models and swaps them in without a restart.
+def post_worker_init(worker):
+    from app import start_reload_watcher, warm_up
+    start_reload_watcher()
+    if os.environ.get("PRELOAD_MODEL", "true").lower() == "true":
+        warm_up()
+
+
+# Write the worker's last metrics before it goes, so /metrics served by the
+# remaining workers still counts them
+def worker_exit(server, worker):
+    from metrics import registry
+    registry.flush_at_exit()
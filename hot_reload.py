@@ -0,0 +1,225 @@
+# hot_reload.py - Swap in new cutoff indexes and models without restarting workers
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+
+from autocomplete import Autocompleter
+from data_version import read_data_version, artifact_version
+from place_index import PlaceIndex
+from probability_curves import load_curves
+
+# How often each worker checks the data version and model files; 0 disables the watcher
+RELOAD_POLL_SECONDS = float(os.environ.get('RELOAD_POLL_SECONDS', '5'))
+# Touched by /admin/reload so every worker on the host reloads, not only the one that got the request
+RELOAD_TRIGGER_PATH = os.environ.get('RELOAD_TRIGGER_PATH',
+                                     os.path.join(tempfile.gettempdir(), 'college_predictor_reload'))
+
+HISTORY_SIZE = 20
+
+
+def trigger_version(path=RELOAD_TRIGGER_PATH):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def source_versions(db_path, model_path, curves_path):
+    """What a snapshot built now would be built from."""
+    return {
+        'data_version': read_data_version(db_path),
+        'model_version': artifact_version(model_path),
+        'curves_version': artifact_version(curves_path),
+        'trigger': trigger_version(),
+    }
+
+
+class Snapshot:
+    """The model, probability curves and in-memory indexes predictions read.
+
+    A snapshot never changes once published. Parts load lazily on first use;
+    background reloads load them all before the swap.
+    """
+
+    def __init__(self, db_path, model_path, curves_path):
+        self.db_path = db_path
+        self.model_path = model_path
+        self.curves_path = curves_path
+        self.versions = source_versions(db_path, model_path, curves_path)
+        self.created_at = time.time()
+        self.lock = threading.Lock()
+        self.parts = {}
+
+    def part(self, name, load):
+        if name not in self.parts:
+            with self.lock:
+                if name not in self.parts:
+                    self.parts[name] = load()
+        return self.parts[name]
+
+    @property
+    def model(self):
+        return self.part('model', self.load_model)
+
+    @property
+    def curves(self):
+        def load():
+            curves = load_curves(self.curves_path, model_path=self.model_path)
+            if curves is not None:
+                print(f"✅ Loaded {len(curves)} probability curves")
+            return curves
+        return self.part('curves', load)
+
+    def load_model(self):
+        try:
+            import joblib
+            model = joblib.load(self.model_path)
+            print("✅ ML model loaded successfully")
+            return model
+        except Exception as e:
+            print(f"❌ Error loading ML model: {e}")
+            return None
+
+    def from_db(self, cls, db_path, conn=None):
+        def load():
+            own_conn = conn is None
+            connection = sqlite3.connect(db_path) if own_conn else conn
+            try:
+                return cls.from_db(connection)
+            finally:
+                if own_conn:
+                    connection.close()
+        return self.part((cls.__name__, db_path), load)
+
+    def place_index(self, db_path=None, conn=None):
+        return self.from_db(PlaceIndex, db_path or self.db_path, conn)
+
+    def autocompleter(self, db_path=None):
+        return self.from_db(Autocompleter, db_path or self.db_path)
+
+    def warm(self):
+        """Load what the first prediction would otherwise load."""
+        import pandas  # noqa: F401
+        # With curves the model is only needed for rows they don't cover
+        if self.curves is None:
+            self.model
+        self.place_index()
+
+    def load_all(self):
+        self.warm()
+        self.autocompleter()
+        if os.path.exists(self.model_path) and self.curves is None and self.model is None:
+            raise RuntimeError(f"Could not load {self.model_path}")
+
+
+class SnapshotManager:
+    """Holds the current snapshot; reloads build a new one and swap a single reference.
+
+    Requests take the current snapshot once and keep using it, so a swap never
+    changes the model or indexes under an in-flight prediction.
+    """
+
+    def __init__(self, db_path, model_path, curves_path, on_swap=None):
+        self.db_path = db_path
+        self.model_path = model_path
+        self.curves_path = curves_path
+        self.on_swap = on_swap
+        self.current = None
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.failed_versions = None
+        self.watcher = None
+
+    def build(self):
+        return Snapshot(self.db_path, self.model_path, self.curves_path)
+
+    def get(self):
+        snapshot = self.current
+        if snapshot is None:
+            with self.lock:
+                if self.current is None:
+                    self.current = self.build()
+                snapshot = self.current
+        return snapshot
+
+    def source_versions(self):
+        return source_versions(self.db_path, self.model_path, self.curves_path)
+
+    def changed(self):
+        """Versions on disk that differ from the current snapshot's ({} if up to date)."""
+        current = self.get().versions
+        return {name: version for name, version in self.source_versions().items()
+                if version != current[name]}
+
+    def reload(self, reason, wait=True):
+        """Build and swap in a new snapshot; returns the history entry (None if one is running)."""
+        if not wait:
+            threading.Thread(target=self.reload, args=(reason,), daemon=True).start()
+            return None
+        if not self.reload_lock.acquire(blocking=False):
+            return None
+        try:
+            entry = {'reason': reason, 'started_at': time.time(), 'pid': os.getpid()}
+            start = time.perf_counter()
+            try:
+                snapshot = self.build()
+                snapshot.load_all()
+            except Exception as e:
+                self.failed_versions = self.source_versions()
+                entry.update(status='failed', error=str(e))
+                print(f"❌ Reload failed, keeping the current snapshot: {e}")
+            else:
+                previous, self.current = self.current, snapshot
+                self.failed_versions = None
+                entry.update(status='ok', versions=snapshot.versions)
+                if self.on_swap is not None:
+                    self.on_swap(previous, snapshot)
+                print(f"🔄 Reloaded ({reason}): {snapshot.versions}")
+            entry['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            self.history.append(entry)
+            return entry
+        finally:
+            self.reload_lock.release()
+
+    def check(self):
+        """Reload if the data version, model or curves changed since the current snapshot."""
+        changed = self.changed()
+        if not changed or self.source_versions() == self.failed_versions:
+            return None
+        return self.reload(f"changed: {', '.join(sorted(changed))}")
+
+    def request_reload(self):
+        """Ask every worker on the host to reload on its next check."""
+        with open(RELOAD_TRIGGER_PATH, 'w') as f:
+            f.write(str(time.time()))
+
+    def start_watcher(self, interval=RELOAD_POLL_SECONDS):
+        if interval <= 0 or (self.watcher is not None and self.watcher.is_alive()):
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check()
+                except Exception as e:
+                    print(f"⚠️  Reload check failed: {e}")
+
+        self.watcher = threading.Thread(target=watch, name='reload-watcher', daemon=True)
+        self.watcher.start()
+
+    def status(self):
+        current = self.get()
+        return {
+            'pid': os.getpid(),
+            'current': dict(current.versions, created_at=current.created_at),
+            'on_disk': self.source_versions(),
+            'reloading': self.reload_lock.locked(),
+            'watcher': self.watcher is not None and self.watcher.is_alive(),
+            'poll_seconds': RELOAD_POLL_SECONDS,
+            'history': list(self.history),
+        }
@@ -0,0 +1,272 @@
+# metrics.py - In-process metrics registry with Prometheus text exposition
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Default latency buckets (seconds), roughly the Prometheus client defaults
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames, labels):
+    if sorted(labels) != sorted(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {sorted(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"'))
+                    for name, value in pairs)
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        return {'|'.join(key): value for key, value in self.values.items()}
+
+    @staticmethod
+    def merge(total, snapshot):
+        for key, value in snapshot.items():
+            total[key] = total.get(key, 0) + value
+        return total
+
+    def render(self, merged):
+        lines = []
+        for key_str in sorted(merged):
+            key = tuple(key_str.split('|')) if self.labelnames else ()
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(merged[key_str])}")
+        return lines
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # key -> [bucket counts..., sum, count]
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self.registry.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        return {'|'.join(key): list(state) for key, state in self.values.items()}
+
+    @staticmethod
+    def merge(total, snapshot):
+        for key, state in snapshot.items():
+            if key in total:
+                total[key] = [a + b for a, b in zip(total[key], state)]
+            else:
+                total[key] = list(state)
+        return total
+
+    def render(self, merged):
+        lines = []
+        for key_str in sorted(merged):
+            key = tuple(key_str.split('|')) if self.labelnames else ()
+            state = merged[key_str]
+            cumulative = 0
+            for bound, count in zip(self.buckets, state[:-2]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds this process' metrics.
+
+    With a multiprocess directory configured every process (gunicorn worker)
+    periodically writes its own snapshot there, and rendering sums the
+    snapshots of all processes so a scrape of any worker sees host-wide totals.
+    """
+
+    def __init__(self, multiproc_dir=None, flush_interval=1.0):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self.last_flush = 0.0
+        # Writes a flush skipped by the rate limit once the interval is up, so an
+        # idle worker's last updates still reach the directory
+        self.flush_timer = None
+        if multiproc_dir:
+            os.makedirs(multiproc_dir, exist_ok=True)
+            atexit.register(self.flush_at_exit)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        with self.lock:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def _snapshot_path(self, pid=None):
+        return os.path.join(self.multiproc_dir, f"metrics_{pid or os.getpid()}.json")
+
+    def flush(self, force=False):
+        """Write this process' snapshot to the multiprocess directory (rate limited)."""
+        if not self.multiproc_dir:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_flush < self.flush_interval:
+            self._schedule_flush(self.flush_interval - (now - self.last_flush))
+            return
+        self.last_flush = now
+
+        path = self._snapshot_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _schedule_flush(self, delay):
+        with self.lock:
+            if self.flush_timer is not None and self.flush_timer.is_alive():
+                return
+            self.flush_timer = threading.Timer(delay, self.flush, kwargs={'force': True})
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+
+    def flush_at_exit(self):
+        """Final flush when a process that has recorded metrics exits."""
+        if self.last_flush:
+            self.flush(force=True)
+
+    def collect(self):
+        """Merged snapshot across all processes sharing the multiprocess directory."""
+        if not self.multiproc_dir:
+            return self.snapshot()
+
+        self.flush(force=True)
+        merged = {name: {} for name in self.metrics}
+        for path in glob.glob(os.path.join(self.multiproc_dir, 'metrics_*.json')):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is not None:
+                    metric.merge(merged[name], values)
+        return merged
+
+    def render(self):
+        merged = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(merged.get(name, {})))
+        return '\n'.join(lines) + '\n'
+
+
+def clear_multiproc_dir(multiproc_dir):
+    """Remove snapshots left by a previous server run."""
+    if not multiproc_dir:
+        return
+    for path in glob.glob(os.path.join(multiproc_dir, 'metrics_*.json*')):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+registry = MetricsRegistry(multiproc_dir=os.environ.get('METRICS_MULTIPROC_DIR'),
+                           flush_interval=float(os.environ.get('METRICS_FLUSH_INTERVAL', '1.0')))
+
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Latency of instrumented HTTP endpoints', ['endpoint'])
+PREDICT_STAGE_LATENCY = registry.histogram(
+    'predict_stage_duration_seconds', 'Latency of the internal stages of predict_colleges', ['stage'])
+MODEL_SCORING_LATENCY = registry.histogram(
+    'model_scoring_duration_seconds', 'Time spent scoring matches with the ML model')
+ROWS_SCANNED = registry.counter(
+    'predict_rows_scanned_total', 'Cutoff rows read from the database by predict_colleges')
+MATCHES_RETURNED = registry.counter(
+    'predict_matches_returned_total', 'Matches returned by predict_colleges')
+PLACE_LOOKUPS = registry.counter(
+    'predict_place_lookups_total', 'Place resolutions by outcome (all, exact, alias, fuzzy, unknown)', ['result'])
+DB_QUERIES = registry.counter(
+    'predict_db_queries_total', 'SQLite queries issued by predict_colleges')
+ERRORS = registry.counter(
+    'app_errors_total', 'Errors raised while serving requests', ['endpoint'])
+CUTOFF_CACHE_REQUESTS = registry.counter(
+    'cutoff_cache_requests_total', 'Cutoff bucket lookups by outcome (hit, miss, warm)', ['result'])
+SHARED_CACHE_REQUESTS = registry.counter(
+    'shared_cache_requests_total', 'Cross-worker prediction cache lookups by outcome (hit, miss, error)', ['result'])
+SHARED_CACHE_EVICTIONS = registry.counter(
+    'shared_cache_evictions_total', 'Entries evicted from the cross-worker prediction cache')
+ADMISSION_REJECTIONS = registry.counter(
+    'admission_rejections_total', 'Requests refused by admission control (user, ip, busy)', ['endpoint', 'reason'])
+SINGLE_FLIGHT_REQUESTS = registry.counter(
+    'single_flight_requests_total', 'Predictions computed (leader) or shared from a concurrent identical one (coalesced)',
+    ['result'])
@@ -0,0 +1,254 @@
+# model_evaluation.py - Backtest the admission model (k-fold and leave-one-year-out) and gate deploys on it
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss, roc_auc_score
+
+import model_training
+from data_version import read_data_version, artifact_version
+
+METRICS_PATH = os.environ.get('MODEL_METRICS_PATH', 'model_metrics.json')
+# Synthetic samples are generated once per database and seed and reused by every fold and run
+EVAL_CACHE_DIR = os.environ.get('EVAL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'college_predictor_eval'))
+EVAL_FOLDS = int(os.environ.get('EVAL_FOLDS', '5'))
+# Folds trained at once (-1: one per core)
+EVAL_JOBS = int(os.environ.get('EVAL_JOBS', '-1'))
+# Deploy gate: every backtest scheme's mean must reach these
+EVAL_MIN_AUC = float(os.environ.get('EVAL_MIN_AUC', '0.9'))
+EVAL_MAX_BRIER = float(os.environ.get('EVAL_MAX_BRIER', '0.1'))
+
+SEED = 42
+# Bump when synthetic_samples() or training_frame() change, so cached samples are rebuilt
+SAMPLES_FORMAT = 2
+SAMPLE_COLUMNS = model_training.FEATURE_COLUMNS + ['label', 'source', 'year', 'series', 'group']
+
+
+def samples_cache_path(db_path, seed, cache_dir=EVAL_CACHE_DIR):
+    version = read_data_version(db_path) or artifact_version(db_path)
+    return os.path.join(cache_dir, f"samples-v{SAMPLES_FORMAT}-{version}-{seed}.pkl")
+
+
+def cutoff_series(records):
+    """Id per cutoff row of its (college, exam, category, college type), the same across years."""
+    keys = np.stack([records.codes['college_id'], records.codes['exam_type'], records.codes['category'],
+                     records.codes['college_type']], axis=1).astype(np.int64)
+    return np.unique(keys, axis=0, return_inverse=True)[1].reshape(-1)
+
+
+def cutoff_groups(series, years):
+    """Id per cutoff row of its series and year.
+
+    Duplicate rows share an id, so a k-fold split never tests on a copy of a training row.
+    """
+    keys = np.stack([series, years], axis=1).astype(np.int64)
+    return np.unique(keys, axis=0, return_inverse=True)[1].reshape(-1)
+
+
+def build_samples(records, seed=SEED):
+    """The training samples model_training.py would generate, plus each one's year, series and group."""
+    frame = model_training.training_frame(model_training.synthetic_samples(records, np.random.default_rng(seed)))
+    source = frame['source'].to_numpy()
+    series = cutoff_series(records)
+    frame['year'] = records['year'][source]
+    frame['series'] = series[source]
+    frame['group'] = cutoff_groups(series, records['year'])[source]
+    return frame[SAMPLE_COLUMNS]
+
+
+def load_samples(db_path, seed=SEED, refresh=False):
+    """(samples, cache path); built from the database on the first run for a data version."""
+    path = samples_cache_path(db_path, seed)
+    if not refresh and os.path.exists(path):
+        print(f"📦 Using cached samples: {path}")
+        return joblib.load(path), path
+
+    conn = sqlite3.connect(db_path)
+    try:
+        records = model_training.load_records(conn)
+    finally:
+        conn.close()
+    if records is None:
+        return None, path
+
+    samples = build_samples(records, seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(samples, path + '.tmp')
+    os.replace(path + '.tmp', path)
+    print(f"💾 Cached {len(samples)} samples: {path}")
+    return samples, path
+
+
+# Folds
+
+
+def kfold_splits(groups, folds, seed=SEED):
+    """(name, test mask) per fold, with whole cutoff groups assigned to folds at random."""
+    unique = np.unique(groups)
+    np.random.default_rng(seed).shuffle(unique)
+    for fold, test_groups in enumerate(np.array_split(unique, folds)):
+        yield f"fold-{fold + 1}", np.isin(groups, test_groups)
+
+
+def year_splits(years):
+    """(name, test mask) per year: train on every other year, test on the held-out one's admissions."""
+    distinct = np.unique(years)
+    if len(distinct) < 2:
+        return
+    for year in distinct:
+        yield f"year-{int(year)}", years == year
+
+
+def fold_metrics(labels, probabilities):
+    probabilities = np.clip(probabilities, 1e-6, 1 - 1e-6)
+    both_classes = len(np.unique(labels)) == 2
+    return {
+        'auc': round(float(roc_auc_score(labels, probabilities)), 4) if both_classes else None,
+        'brier': round(float(brier_score_loss(labels, probabilities)), 4),
+        'log_loss': round(float(log_loss(labels, probabilities, labels=[0, 1])), 4),
+        'accuracy': round(float(accuracy_score(labels, probabilities >= 0.5)), 4),
+    }
+
+
+def shown_cutoffs(test, train):
+    """Held-out samples with their features taken from the cutoffs a student would have been shown.
+
+    The label still comes from the held-out year's actual range, but opening,
+    closing and seats are those of the same series in the latest earlier
+    training year (or the earliest later one when there is none). Samples
+    whose series has no other year are dropped; their count is returned too.
+    """
+    year = test['year'].iloc[0]
+    cutoffs = train.drop_duplicates(['series', 'year']).sort_values('year')
+    earlier = cutoffs[cutoffs['year'] < year].groupby('series').last()
+    later = cutoffs[cutoffs['year'] > year].groupby('series').first()
+    shown = earlier.combine_first(later)[['opening', 'closing', 'seats']]
+
+    matched = test['series'].isin(shown.index)
+    test = test[matched].drop(columns=['opening', 'closing', 'seats']).join(shown, on='series')
+    return model_training.engineer_features(test), int((~matched).sum())
+
+
+_loaded = {}
+
+
+def run_fold(samples_path, scheme, name, train_index, test_index):
+    """Train on one split and score the held-out samples (runs in a joblib worker)."""
+    start = time.perf_counter()
+    # Each worker process reads the cached samples once, whatever the number of folds it runs
+    if samples_path not in _loaded:
+        _loaded.clear()
+        _loaded[samples_path] = joblib.load(samples_path)
+    samples = _loaded[samples_path]
+
+    train, test = samples.iloc[train_index], samples.iloc[test_index]
+    result = {'scheme': scheme, 'fold': name, 'train_samples': len(train)}
+    if scheme == 'leave_one_year_out':
+        test, result['unmatched_test_samples'] = shown_cutoffs(test, train)
+    # Parallelism is across folds, so each forest uses a single core
+    clf = model_training.build_pipeline(len(train), n_jobs=1)
+    clf.fit(train[model_training.FEATURE_COLUMNS], train['label'])
+    probabilities = clf.predict_proba(test[model_training.FEATURE_COLUMNS])[:, 1]
+
+    result['test_samples'] = len(test)
+    result.update(fold_metrics(test['label'].to_numpy(), probabilities))
+    result['seconds'] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def summarize(folds):
+    summary = {}
+    for scheme in dict.fromkeys(fold['scheme'] for fold in folds):
+        results = [fold for fold in folds if fold['scheme'] == scheme]
+        summary[scheme] = {'folds': len(results)}
+        for metric in ('auc', 'brier', 'log_loss', 'accuracy'):
+            values = [fold[metric] for fold in results if fold[metric] is not None]
+            if values:
+                summary[scheme][metric] = {'mean': round(float(np.mean(values)), 4),
+                                           'min': min(values), 'max': max(values)}
+    return summary
+
+
+def check_gate(summary, min_auc=EVAL_MIN_AUC, max_brier=EVAL_MAX_BRIER):
+    failures = []
+    for scheme, metrics in summary.items():
+        auc = metrics.get('auc', {}).get('mean')
+        brier = metrics.get('brier', {}).get('mean')
+        if auc is None or auc < min_auc:
+            failures.append(f"{scheme}: mean AUC {auc} < {min_auc}")
+        if brier is None or brier > max_brier:
+            failures.append(f"{scheme}: mean Brier score {brier} > {max_brier}")
+    return {'min_auc': min_auc, 'max_brier': max_brier, 'passed': not failures, 'failures': failures}
+
+
+def evaluate(db_path=model_training.DB_PATH, folds=EVAL_FOLDS, jobs=EVAL_JOBS, refresh=False):
+    start = time.perf_counter()
+    samples, samples_path = load_samples(db_path, refresh=refresh)
+    if samples is None:
+        return None
+
+    splits = [('kfold', name, mask) for name, mask in kfold_splits(samples['group'].to_numpy(), folds)]
+    splits += [('leave_one_year_out', name, mask) for name, mask in year_splits(samples['year'].to_numpy())]
+    print(f"🧪 Running {len(splits)} folds on {len(samples)} samples (n_jobs={jobs})...")
+
+    results = Parallel(n_jobs=jobs)(
+        delayed(run_fold)(samples_path, scheme, name, np.flatnonzero(~mask), np.flatnonzero(mask))
+        for scheme, name, mask in splits)
+
+    summary = summarize(results)
+    return {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'data_version': read_data_version(db_path),
+        'samples': len(samples),
+        'years': sorted(int(year) for year in samples['year'].unique()),
+        'folds': results,
+        'summary': summary,
+        'gate': check_gate(summary),
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backtest the admission model and write a metrics report')
+    parser.add_argument('--db', default=model_training.DB_PATH)
+    parser.add_argument('--folds', type=int, default=EVAL_FOLDS)
+    parser.add_argument('--jobs', type=int, default=EVAL_JOBS, help='Folds trained in parallel (-1: all cores)')
+    parser.add_argument('--output', default=METRICS_PATH)
+    parser.add_argument('--refresh', action='store_true', help='Rebuild the cached synthetic samples')
+    parser.add_argument('--no-gate', action='store_true', help='Write the report without failing on thresholds')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print("Database not found. Please run init_db.py first.")
+        return 1
+
+    report = evaluate(args.db, args.folds, args.jobs, args.refresh)
+    if report is None:
+        print("No data available for evaluation.")
+        return 1
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for scheme, metrics in report['summary'].items():
+        print(f"📊 {scheme}: " + ', '.join(f"{metric} {values['mean']}" for metric, values in metrics.items()
+                                           if isinstance(values, dict)))
+    print(f"Report written to {args.output} ({report['seconds']}s)")
+
+    if report['gate']['passed']:
+        print("✅ Model evaluation gate passed")
+        return 0
+    for failure in report['gate']['failures']:
+        print(f"❌ {failure}")
+    return 0 if args.no_gate else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,64 +8,64 @@ import joblib
 import sqlite3
 import os
 
+from record_store import CutoffRecords, load_table
 
-def train_model():
-    print("Starting model training...")
 
-    # Check if database exists
-    if not os.path.exists('database/college_data.db'):
-        print("Database not found. Please run init_db.py first.")
-        return
+DB_PATH = 'database/college_data.db'
+COLLEGE_TYPES = ['mtech', 'mba', 'mca']
 
-    # Load data from database
-    conn = sqlite3.connect('database/college_data.db')
+FEATURE_COLUMNS = ['user_rank', 'opening', 'closing', 'range_width',
+                   'rank_vs_open', 'rank_vs_close', 'seats', 'exam_type', 'category', 'place']
+CAT_COLUMNS = ['exam_type', 'category', 'place']
 
+
+def load_records(conn):
+    """Every college table's cutoff rows as one CutoffRecords, or None if there are none."""
     # Check if tables exist
     cursor = conn.cursor()
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
     tables = [table[0] for table in cursor.fetchall()]
     print("Available tables:", tables)
 
-    dfs = []
-    college_types = ['mtech', 'mba', 'mca']
-
-    for college_type in college_types:
+    parts = []
+    for college_type in COLLEGE_TYPES:
         table_name = f"{college_type}_colleges"
         if table_name in tables:
             print(f"Loading data from {table_name}...")
             try:
-                df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+                records = load_table(conn, table_name)
                 # Add college type if not present
-                if 'college_type' not in df.columns:
-                    df['college_type'] = college_type.upper()
-                dfs.append(df)
-                print(f"Loaded {len(df)} records from {table_name}")
+                if 'college_type' not in records:
+                    records = records.with_column('college_type', college_type.upper())
+                parts.append(records)
+                print(f"Loaded {len(records)} records from {table_name}")
             except Exception as e:
                 print(f"Error loading {table_name}: {e}")
         else:
             print(f"Table {table_name} not found")
 
-    if not dfs:
+    if not parts:
         print("No data found in database. Please check your CSV files.")
-        conn.close()
-        return
+        return None
 
-    # Combine all data
-    df = pd.concat(dfs, ignore_index=True)
-    print(f"Total records loaded: {len(df)}")
+    # Combine all data (dictionary-encoded, so strings are shared across rows)
+    records = CutoffRecords.concat(parts)
+    print(f"Total records loaded: {len(records)}")
 
     # Check if we have enough data
-    if len(df) == 0:
+    if len(records) == 0:
         print("No data available for training.")
-        conn.close()
-        return
+        return None
+    return records
 
-    # Create synthetic training data
-    print("Creating synthetic training data...")
-    rows = []
-    rng = np.random.default_rng(42)
 
-    for _, c in df.iterrows():
+def synthetic_samples(records, rng):
+    """Labelled samples per cutoff row: ranks inside its range are admitted, nearby ranks outside are not.
+
+    Each sample keeps the position of the row it came from in `source`.
+    """
+    rows = []
+    for source, c in enumerate(records.records()):
         try:
             open_r = int(c['opening_cutoff_rank'])
             close_r = int(c['closing_cutoff_rank'])
@@ -95,7 +95,8 @@ def train_model():
                     'closing': close_r,
                     'seats': c.get('seats', 0),
                     'label': 1,  # Positive example
-                    'college_id': c.get('college_id', '')
+                    'college_id': c.get('college_id', ''),
+                    'source': source
                 })
 
             for r in np.concatenate([neg_before, neg_after]):
@@ -108,69 +109,102 @@ def train_model():
                     'closing': close_r,
                     'seats': c.get('seats', 0),
                     'label': 0,  # Negative example
-                    'college_id': c.get('college_id', '')
+                    'college_id': c.get('college_id', ''),
+                    'source': source
                 })
         except (ValueError, TypeError) as e:
             print(f"Skipping row due to error: {e}")
             continue
+    return rows
 
-    if not rows:
-        print("No valid training data generated.")
-        conn.close()
-        return
 
-    train_df = pd.DataFrame(rows)
-    print(f"Generated {len(train_df)} training samples")
+def engineer_features(frame):
+    """Rank-vs-cutoff features, from user_rank, opening and closing."""
+    frame['range_width'] = frame['closing'] - frame['opening']
+    frame['rank_vs_open'] = frame['user_rank'] - frame['opening']
+    frame['rank_vs_close'] = frame['user_rank'] - frame['closing']
+    return frame
 
-    # Feature engineering
-    print("Performing feature engineering...")
-    train_df['range_width'] = train_df['closing'] - train_df['opening']
-    train_df['rank_vs_open'] = train_df['user_rank'] - train_df['opening']
-    train_df['rank_vs_close'] = train_df['user_rank'] - train_df['closing']
 
-    # Prepare features and target
-    feature_columns = ['user_rank', 'opening', 'closing', 'range_width',
-                       'rank_vs_open', 'rank_vs_close', 'seats', 'exam_type', 'category', 'place']
+def training_frame(rows):
+    """Samples with the engineered features the model and the app's scoring use."""
+    train_df = engineer_features(pd.DataFrame(rows))
 
     # Check if all required columns exist
-    missing_cols = [col for col in feature_columns if col not in train_df.columns]
+    missing_cols = [col for col in FEATURE_COLUMNS if col not in train_df.columns]
     if missing_cols:
         print(f"Missing columns: {missing_cols}")
         # Create missing columns with default values
         for col in missing_cols:
-            if col in ['exam_type', 'category', 'place']:
+            if col in CAT_COLUMNS:
                 train_df[col] = 'Unknown'
             else:
                 train_df[col] = 0
+    return train_df
 
-    X = train_df[feature_columns]
-    y = train_df['label']
-
-    print(f"Training data shape: {X.shape}")
-    print(f"Positive samples: {sum(y)}")
-    print(f"Negative samples: {len(y) - sum(y)}")
 
+def build_pipeline(n_samples, n_jobs=None):
     # Preprocessing
-    cat_cols = ['exam_type', 'category', 'place']
-    num_cols = [c for c in X.columns if c not in cat_cols]
+    num_cols = [c for c in FEATURE_COLUMNS if c not in CAT_COLUMNS]
 
     preprocessor = ColumnTransformer([
         ('num', 'passthrough', num_cols),
-        ('cat', OneHotEncoder(handle_unknown='ignore'), cat_cols)
+        ('cat', OneHotEncoder(handle_unknown='ignore'), CAT_COLUMNS)
     ])
 
     # Train model with smaller dataset if needed
-    print("Training Random Forest model...")
-    n_estimators = 100 if len(X) > 10000 else 50
+    n_estimators = 100 if n_samples > 10000 else 50
+
+    return make_pipeline(preprocessor,
+                         RandomForestClassifier(n_estimators=n_estimators,
+                                                random_state=42,
+                                                max_depth=10,
+                                                n_jobs=n_jobs))
 
-    clf = make_pipeline(preprocessor,
-                        RandomForestClassifier(n_estimators=n_estimators,
-                                               random_state=42,
-                                               max_depth=10))
+
+def train_model():
+    print("Starting model training...")
+
+    # Check if database exists
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Please run init_db.py first.")
+        return
+
+    # Load data from database
+    conn = sqlite3.connect(DB_PATH)
+    records = load_records(conn)
+    if records is None:
+        conn.close()
+        return
+
+    # Create synthetic training data
+    print("Creating synthetic training data...")
+    rows = synthetic_samples(records, np.random.default_rng(42))
+
+    if not rows:
+        print("No valid training data generated.")
+        conn.close()
+        return
+
+    print(f"Generated {len(rows)} training samples")
+    print("Performing feature engineering...")
+    train_df = training_frame(rows)
+
+    X = train_df[FEATURE_COLUMNS]
+    y = train_df['label']
+
+    print(f"Training data shape: {X.shape}")
+    print(f"Positive samples: {sum(y)}")
+    print(f"Negative samples: {len(y) - sum(y)}")
+
+    print("Training Random Forest model...")
+    clf = build_pipeline(len(X))
     clf.fit(X, y)
 
     # Save model
-    joblib.dump(clf, 'model.pkl')
+    # Write then rename, so running workers reloading the model never see a partial file
+    joblib.dump(clf, 'model.pkl.tmp')
+    os.replace('model.pkl.tmp', 'model.pkl')
     print("Model trained and saved as model.pkl")
 
     # Test prediction with sample data
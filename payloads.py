@@ -0,0 +1,138 @@
+# payloads.py - Compact prediction payloads and response compression
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+MATCH_LISTS = ['exact_matches', 'near_matches', 'weak_matches']
+
+# Fields the prediction page and chatbot actually render
+COMPACT_FIELDS = ['college_id', 'college_name', 'place', 'state', 'opening_cutoff_rank',
+                  'closing_cutoff_rank', 'seats', 'year', 'website', 'admission_probability']
+
+# Per-college fields sent once in columnar payloads instead of once per match
+COLLEGE_FIELDS = ['college_id', 'college_name', 'place', 'state', 'website']
+
+RESPONSE_FORMATS = {'full', 'compact', 'columnar'}
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/css', 'text/plain',
+                      'application/javascript', 'text/javascript')
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def parse_fields(fields):
+    """Accept a list or a comma-separated string of field names."""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    return [str(field).strip() for field in fields if str(field).strip()]
+
+
+def project(matches, fields):
+    return [{field: college.get(field) for field in fields if field in college} for college in matches]
+
+
+def to_columnar(matches, fields):
+    """College metadata once in `colleges`, everything else as parallel arrays."""
+    college_fields = [field for field in COLLEGE_FIELDS if field in fields]
+    row_fields = [field for field in fields if field not in college_fields]
+
+    colleges = []
+    college_index = {}
+    columns = {'college': []}
+    columns.update({field: [] for field in row_fields})
+
+    for college in matches:
+        key = tuple(college.get(field) for field in college_fields)
+        index = college_index.get(key)
+        if index is None:
+            index = college_index[key] = len(colleges)
+            colleges.append(dict(zip(college_fields, key)))
+        columns['college'].append(index)
+        for field in row_fields:
+            columns[field].append(college.get(field))
+
+    return {'count': len(matches), 'colleges': colleges, 'columns': columns}
+
+
+def encode_results(results, response_format='full', fields=None):
+    if 'error' in results or (response_format == 'full' and fields is None):
+        return results
+
+    fields = fields or COMPACT_FIELDS
+    encoded = {key: value for key, value in results.items() if key not in MATCH_LISTS}
+    for key in MATCH_LISTS:
+        matches = results.get(key, [])
+        if response_format == 'columnar':
+            encoded[key] = to_columnar(matches, fields)
+        else:
+            encoded[key] = project(matches, fields)
+    if response_format == 'columnar':
+        encoded['format'] = 'columnar'
+    return encoded
+
+
+def choose_encoding(accept_encoding):
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        parts = item.strip().split(';')
+        name = parts[0].strip().lower()
+        quality = 1.0
+        for param in parts[1:]:
+            param = param.strip()
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name] = quality
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, accept_encoding):
+    if (response.direct_passthrough or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or not response.mimetype or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    if encoding == 'br':
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """Register before any other after_request hook so compression runs last."""
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request.headers.get('Accept-Encoding'))
@@ -0,0 +1,132 @@
+# place_index.py - Place alias index with trigram fuzzy matching
+from collections import defaultdict
+
+COLLEGE_TABLES = ['mca_colleges', 'mba_colleges', 'mtech_colleges']
+
+# Spellings of the same city. Whichever member of a group is present in the
+# database becomes the canonical place for the whole group.
+ALIAS_GROUPS = [
+    ['Bengaluru', 'Bangalore', 'Bengalooru'],
+    ['Mysore', 'Mysuru'],
+    ['Mangaluru', 'Mangalore'],
+    ['Belagavi', 'Belgaum'],
+    ['Hubballi', 'Hubli'],
+    ['Dharwad', 'Dharwar'],
+    ['Davanagere', 'Davangere'],
+    ['Tumakuru', 'Tumkur'],
+    ['Shivamogga', 'Shimoga'],
+    ['Kalaburagi', 'Gulbarga'],
+    ['Ballari', 'Bellary'],
+    ['Vijayapura', 'Bijapur'],
+    ['Chikkamagaluru', 'Chikmagalur'],
+]
+
+# Inputs that mean "no location preference"
+ALL_PLACES = 'All'
+ALL_KEYS = {'', 'all', 'all locations'}
+
+FUZZY_THRESHOLD = 0.45
+
+
+def place_key(place):
+    return ' '.join(str(place).split()).casefold()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def fetch_distinct_places(conn, tables=COLLEGE_TABLES):
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    places = set()
+    for table_name in tables:
+        if table_name not in existing:
+            continue
+        for (place,) in conn.execute(f"SELECT DISTINCT place FROM {table_name}"):
+            if place is not None and str(place).strip():
+                places.add(str(place).strip())
+    return sorted(places)
+
+
+def build_alias_rows(places):
+    """(alias_key, canonical_place) rows for every distinct place and its known aliases."""
+    aliases = {}
+    for place in places:
+        aliases.setdefault(place_key(place), place)
+
+    for group in ALIAS_GROUPS:
+        present = [name for name in group if place_key(name) in aliases]
+        if not present:
+            continue
+        canonical = aliases[place_key(present[0])]
+        for name in group:
+            aliases.setdefault(place_key(name), canonical)
+
+    return sorted(aliases.items())
+
+
+def write_place_aliases(conn, tables=COLLEGE_TABLES):
+    """Materialize the alias table at ingest time; returns the number of aliases."""
+    rows = build_alias_rows(fetch_distinct_places(conn, tables))
+    conn.execute('DROP TABLE IF EXISTS place_aliases')
+    conn.execute('''
+        CREATE TABLE place_aliases (
+            alias TEXT PRIMARY KEY,
+            place TEXT NOT NULL
+        )
+    ''')
+    conn.executemany('INSERT INTO place_aliases (alias, place) VALUES (?, ?)', rows)
+    return len(rows)
+
+
+class PlaceIndex:
+    """Resolves user-supplied place names to the spelling stored in the database."""
+
+    def __init__(self, alias_rows):
+        self.aliases = dict(alias_rows)
+        self.places = sorted(set(self.aliases.values()))
+        self.trigram_index = defaultdict(set)
+        for alias in self.aliases:
+            for gram in trigrams(alias):
+                self.trigram_index[gram].add(alias)
+
+    @classmethod
+    def from_db(cls, conn):
+        try:
+            rows = conn.execute('SELECT alias, place FROM place_aliases').fetchall()
+        except Exception:
+            # Database predates the alias table; derive it from the cutoff tables
+            rows = build_alias_rows(fetch_distinct_places(conn))
+        return cls(rows)
+
+    def fuzzy_match(self, key):
+        grams = trigrams(key)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for alias in self.trigram_index.get(gram, ()):
+                overlap[alias] += 1
+
+        best, best_score = None, 0.0
+        for alias, shared in overlap.items():
+            score = shared / (len(grams) + len(trigrams(alias)) - shared)
+            if score > best_score or (score == best_score and best is not None and alias < best):
+                best, best_score = alias, score
+        if best is None or best_score < FUZZY_THRESHOLD:
+            return None
+        return self.aliases[best]
+
+    def resolve(self, place):
+        """Return (canonical place or None, how it was resolved)."""
+        key = place_key(place or '')
+        if key in ALL_KEYS:
+            return ALL_PLACES, 'all'
+
+        canonical = self.aliases.get(key)
+        if canonical is not None:
+            return canonical, 'exact' if place_key(canonical) == key else 'alias'
+
+        canonical = self.fuzzy_match(key)
+        if canonical is not None:
+            return canonical, 'fuzzy'
+        return None, 'unknown'
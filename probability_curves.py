@@ -0,0 +1,244 @@
+# probability_curves.py - Precomputed admission probability curves (run after model_training.py)
+import os
+import sqlite3
+import sys
+
+from data_version import artifact_version
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DB_PATH = os.path.join(BASE_DIR, 'database', 'college_data.db')
+MODEL_PATH = os.path.join(BASE_DIR, 'model.pkl')
+CURVES_PATH = os.path.join(BASE_DIR, 'probability_curves.npz')
+
+SOURCE_TABLES = ['mca_colleges', 'mba_colleges', 'mtech_colleges', 'forecast_cutoffs']
+
+# Each curve is split into segments with evenly spaced knots, so a lookup is index
+# arithmetic rather than a search: the tail below the opening rank, a one-rank step onto
+# it (the model's output jumps at both cutoffs), a dense band just inside the opening
+# rank, the middle of the range, a dense band just inside the closing rank, a one-rank
+# step off it, and the tail past it.
+SEGMENT_POINTS = (24, 1, 32, 96, 32, 1, 24)
+GRID_POINTS = sum(SEGMENT_POINTS) + 1
+# Width of the dense bands inside each cutoff, where the model saturates
+EDGE_BAND = 100
+# Ranks evaluated beyond each cutoff; training negatives come from up to 200 ranks outside
+MIN_PADDING = 250
+PADDING_FRACTION = 0.25
+# Probabilities are stored as uint16 fractions of this
+SCALE = 65535
+
+KEY_FIELDS = ['exam_type', 'category', 'place', 'opening', 'closing', 'seats']
+
+
+def curve_key(college):
+    """Everything besides the user's rank that the model sees for a college."""
+    return (str(college.get('exam_type', 'PGCET')), str(college.get('category', 'GM')),
+            str(college.get('place', 'Bangalore')), int(college['opening_cutoff_rank']),
+            int(college['closing_cutoff_rank']), int(college.get('seats', 0) or 0))
+
+
+# Build
+
+
+def load_cutoff_rows(conn):
+    import pandas as pd
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    frames = []
+    for table_name in SOURCE_TABLES:
+        if table_name not in tables:
+            continue
+        frames.append(pd.read_sql(f'''
+            SELECT exam_type, category, place, opening_cutoff_rank AS opening,
+                   closing_cutoff_rank AS closing, COALESCE(seats, 0) AS seats
+            FROM {table_name}
+        ''', conn))
+    if not frames:
+        return pd.DataFrame(columns=KEY_FIELDS)
+
+    rows = pd.concat(frames, ignore_index=True)
+    for column in ('opening', 'closing', 'seats'):
+        rows[column] = pd.to_numeric(rows[column], errors='coerce')
+    rows = rows.dropna(subset=['opening', 'closing'])
+    rows = rows.astype({'opening': 'int64', 'closing': 'int64', 'seats': 'int64'})
+    return rows.drop_duplicates(subset=KEY_FIELDS).reset_index(drop=True)
+
+
+def evaluate_curves(model, rows, batch_rows=50000):
+    """Run the model once over a rank grid for every distinct cutoff row."""
+    import numpy as np
+    import pandas as pd
+
+    opening = rows['opening'].to_numpy().astype(float)
+    closing = rows['closing'].to_numpy().astype(float)
+    first, last = np.minimum(opening, closing), np.maximum(opening, closing)
+    width = last - first
+    padding = np.maximum(MIN_PADDING, PADDING_FRACTION * width)
+    band = np.minimum(EDGE_BAND, width / 4)
+    low = np.maximum(1.0, first - padding)
+    edges = np.stack([low, np.maximum(low, first - 1), first, first + band,
+                      last - band, last, last + 1, last + padding], axis=1)
+
+    grid = np.empty((len(rows), GRID_POINTS))
+    offset = 0
+    for segment, points in enumerate(SEGMENT_POINTS):
+        fractions = np.arange(points) / points
+        start, end = edges[:, segment], edges[:, segment + 1]
+        grid[:, offset:offset + points] = start[:, None] + (end - start)[:, None] * fractions[None, :]
+        offset += points
+    grid[:, -1] = edges[:, -1]
+    ranks = np.rint(grid).ravel()
+    repeated = rows.loc[rows.index.repeat(GRID_POINTS)].reset_index(drop=True)
+
+    features = pd.DataFrame({
+        'user_rank': ranks,
+        'opening': repeated['opening'],
+        'closing': repeated['closing'],
+        'range_width': repeated['closing'] - repeated['opening'],
+        'rank_vs_open': ranks - repeated['opening'],
+        'rank_vs_close': ranks - repeated['closing'],
+        'seats': repeated['seats'],
+        'exam_type': repeated['exam_type'],
+        'category': repeated['category'],
+        'place': repeated['place'],
+    })
+
+    probabilities = np.empty(len(features))
+    for start in range(0, len(features), batch_rows):
+        chunk = features.iloc[start:start + batch_rows]
+        probabilities[start:start + len(chunk)] = model.predict_proba(chunk)[:, 1]
+
+    knots = np.rint(np.clip(probabilities, 0, 1) * SCALE).astype(np.uint16)
+    return edges, knots.reshape(len(rows), GRID_POINTS)
+
+
+def build_curves(db_path=DB_PATH, model_path=MODEL_PATH, output=CURVES_PATH):
+    import joblib
+    import numpy as np
+
+    model = joblib.load(model_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = load_cutoff_rows(conn)
+    finally:
+        conn.close()
+    if rows.empty:
+        print("⚠️  No cutoff rows found, no curves written")
+        return 0
+
+    edges, knots = evaluate_curves(model, rows)
+    tmp_path = f"{output}.tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        exam_type=rows['exam_type'].to_numpy(dtype=str),
+        category=rows['category'].to_numpy(dtype=str),
+        place=rows['place'].to_numpy(dtype=str),
+        opening=rows['opening'].to_numpy(),
+        closing=rows['closing'].to_numpy(),
+        seats=rows['seats'].to_numpy(),
+        edges=edges,
+        segment_points=np.array(SEGMENT_POINTS),
+        knots=knots,
+        model_version=np.array(artifact_version(model_path)),
+    )
+    os.replace(tmp_path, output)
+    return len(rows)
+
+
+# Serving
+
+
+class ProbabilityCurves:
+    def __init__(self, arrays):
+        import numpy as np
+
+        self.np = np
+        self.edges = arrays['edges']
+        segment_points = arrays['segment_points'].astype(float)
+        self.steps = np.diff(self.edges, axis=1) / segment_points
+        self.offsets = np.concatenate([[0], np.cumsum(segment_points)[:-1]])
+        self.knots = arrays['knots'].astype(np.float32) / SCALE
+        self.model_version = str(arrays['model_version'])
+        self.index = {
+            key: i for i, key in enumerate(zip(
+                arrays['exam_type'].tolist(), arrays['category'].tolist(), arrays['place'].tolist(),
+                arrays['opening'].tolist(), arrays['closing'].tolist(), arrays['seats'].tolist()))
+        }
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def load(cls, path=CURVES_PATH):
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls({name: arrays[name] for name in arrays.files})
+
+    def lookup(self, colleges):
+        """Curve index per college, or -1 where no curve was built."""
+        indices = []
+        for college in colleges:
+            try:
+                indices.append(self.index.get(curve_key(college), -1))
+            except (KeyError, TypeError, ValueError):
+                indices.append(-1)
+        return self.np.array(indices, dtype=int)
+
+    def lookup_frame(self, frame):
+        """lookup() for a DataFrame or CutoffRecords of cutoff rows, without building a dict per row."""
+        np = self.np
+
+        def strings(name):
+            return [str(value) for value in np.asarray(frame[name]).tolist()]
+
+        def ints(name):
+            return np.nan_to_num(np.asarray(frame[name], dtype=float)).astype(int).tolist()
+
+        keys = zip(strings('exam_type'), strings('category'), strings('place'),
+                   ints('opening_cutoff_rank'), ints('closing_cutoff_rank'), ints('seats'))
+        return self.np.fromiter((self.index.get(key, -1) for key in keys), dtype=int, count=len(frame))
+
+    def score(self, indices, user_rank):
+        """Linearly interpolated probabilities for the given curve indices (all >= 0)."""
+        np = self.np
+        edges = self.edges[indices]
+        # Last segment starting at or below the rank; empty segments are skipped over
+        segment = np.maximum((user_rank >= edges[:, :-1]).sum(axis=1) - 1, 0)
+        rows = np.arange(len(indices))
+        steps = self.steps[indices, segment]
+        offset = np.divide(user_rank - edges[rows, segment], steps,
+                           out=np.zeros(len(indices)), where=steps > 0)
+        last_knot = self.knots.shape[1] - 1
+        position = np.clip(self.offsets[segment] + offset, 0, last_knot)
+        left = np.minimum(position.astype(int), last_knot - 1)
+        fraction = position - left
+        knots = self.knots[indices]
+        below = knots[rows, left]
+        above = knots[rows, left + 1]
+        return below + (above - below) * fraction
+
+
+def load_curves(path=CURVES_PATH, model_path=MODEL_PATH):
+    """Curves for the current model, or None if missing or built from another model."""
+    if not os.path.exists(path):
+        return None
+    try:
+        curves = ProbabilityCurves.load(path)
+    except Exception as e:
+        print(f"❌ Error loading probability curves: {e}")
+        return None
+    if curves.model_version != artifact_version(model_path):
+        print("⚠️  Probability curves were built from a different model, ignoring them")
+        return None
+    return curves
+
+
+if __name__ == '__main__':
+    if not os.path.exists(DB_PATH) or not os.path.exists(MODEL_PATH):
+        print("Database or model not found. Please run init_db.py and model_training.py first.")
+        sys.exit(1)
+    print("📉 Building admission probability curves...")
+    count = build_curves()
+    print(f"✅ Wrote {count} curves to {CURVES_PATH}")
+    sys.exit(0)
@@ -0,0 +1,206 @@
+# profiling.py - On-demand request profiling (cProfile + wall-clock stack sampling)
+import cProfile
+import glob
+import io
+import json
+import linecache
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/college_predictor_profiles')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '200'))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.001'))
+
+# Admins can force profiling of a single request with this header
+PROFILE_HEADER = 'X-Profile'
+
+# Function whose lines are attributed in the stack samples
+FOCUS_FUNCTION = 'predict_colleges'
+
+TOP_FUNCTIONS = 15
+
+IGNORED_FILES = {__file__, threading.__file__}
+
+
+class StackSampler(threading.Thread):
+    """Samples the stack of one thread at a fixed wall-clock interval."""
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL, focus_function=FOCUS_FUNCTION):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.focus_function = focus_function
+        self.samples = 0
+        self.focus_lines = Counter()
+        self.leaf_lines = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            code = frame.f_code
+            self.leaf_lines[(code.co_filename, frame.f_lineno, code.co_name)] += 1
+            while frame is not None:
+                code = frame.f_code
+                if code.co_name == self.focus_function:
+                    self.focus_lines[(code.co_filename, frame.f_lineno)] += 1
+                    break
+                frame = frame.f_back
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _top_functions(profiler):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, lineno, name), (cc, nc, tt, ct, callers) in stats.stats.items():
+        # On Python 3.12+ cProfile sees every thread, including the sampler itself
+        if filename in IGNORED_FILES:
+            continue
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{lineno}({name})",
+            'calls': nc,
+            'tottime': round(tt, 6),
+            'cumtime': round(ct, 6),
+        })
+    rows.sort(key=lambda row: row['cumtime'], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+def _focus_lines(sampler):
+    total = sum(sampler.focus_lines.values())
+    lines = []
+    for (filename, lineno), count in sampler.focus_lines.most_common():
+        lines.append({
+            'line': lineno,
+            'source': linecache.getline(filename, lineno).strip(),
+            'samples': count,
+            'share': round(count / total, 3),
+        })
+    return lines
+
+
+def _rotate(profile_dir, max_files):
+    summaries = sorted(glob.glob(os.path.join(profile_dir, '*.json')), key=os.path.getmtime)
+    for path in summaries[:max(0, len(summaries) - max_files)]:
+        for stale in (path, path[:-len('.json')] + '.prof'):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def should_profile(is_admin):
+    if request.headers.get(PROFILE_HEADER) and is_admin():
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def start_profile():
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active in this process (e.g. a concurrent
+        # request on a threaded worker); fall back to stack sampling only.
+        profiler = None
+
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    g.profile = (profiler, sampler, time.perf_counter())
+
+
+def finish_profile(response, profile_dir=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+    profiler, sampler, start = g.pop('profile')
+    duration = time.perf_counter() - start
+    if profiler is not None:
+        profiler.disable()
+    sampler.stop()
+
+    os.makedirs(profile_dir, exist_ok=True)
+    # Clients may choose their X-Request-ID, so it can't name the files
+    profile_id = uuid.uuid4().hex
+    summary = {
+        'profile_id': profile_id,
+        'request_id': g.request_id,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration': round(duration, 6),
+        'timestamp': time.time(),
+        'samples': sampler.samples,
+        'top_functions': _top_functions(profiler) if profiler is not None else [],
+        'focus_function': sampler.focus_function,
+        'focus_lines': _focus_lines(sampler),
+        'hot_lines': [
+            {'location': f"{os.path.basename(filename)}:{lineno}({name})", 'samples': count}
+            for (filename, lineno, name), count in sampler.leaf_lines.most_common(TOP_FUNCTIONS)
+        ],
+    }
+
+    if profiler is not None:
+        profiler.dump_stats(os.path.join(profile_dir, f"{profile_id}.prof"))
+    with open(os.path.join(profile_dir, f"{profile_id}.json"), 'w') as f:
+        json.dump(summary, f)
+
+    _rotate(profile_dir, max_files)
+    return response
+
+
+def init_profiling(app, is_admin):
+    """Register the profiling hooks; `is_admin` decides who may force a profile."""
+
+    @app.before_request
+    def maybe_start_profile():
+        if should_profile(is_admin):
+            start_profile()
+
+    @app.after_request
+    def maybe_finish_profile(response):
+        if 'profile' in g:
+            try:
+                finish_profile(response)
+            except Exception as e:
+                print(f"Profiling error: {e}")
+        return response
+
+    @app.teardown_request
+    def abandon_profile(exc):
+        # after_request never ran (unhandled exception); just stop collecting
+        if 'profile' in g:
+            profiler, sampler, start = g.pop('profile')
+            if profiler is not None:
+                profiler.disable()
+            sampler.stop()
+
+
+def load_profiles(profile_dir=PROFILE_DIR, limit=50):
+    """Most recent profile summaries, slowest first."""
+    summaries = []
+    for path in glob.glob(os.path.join(profile_dir, '*.json')):
+        try:
+            with open(path) as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    summaries.sort(key=lambda summary: summary['duration'], reverse=True)
+    return summaries[:limit]
+
+
+def profile_path(profile_id, profile_dir=PROFILE_DIR):
+    path = os.path.join(profile_dir, f"{os.path.basename(profile_id)}.prof")
+    return path if os.path.exists(path) else None
@@ -0,0 +1,97 @@
+# rank_sweep.py - How a query's matches change across a rank range, from one sweep over cutoff events
+from payloads import to_columnar
+from record_store import CLIENT_FIELDS
+
+# Per row of a timeline; like static shards, timelines carry no admission probability
+SWEEP_FIELDS = CLIENT_FIELDS
+
+
+def events(opening, closing):
+    """(rank, entering rows, leaving rows) in rank order, one per rank where the matches change.
+
+    A row's range [opening, closing] contains a rank from its opening rank
+    until one past its closing rank. Those 2N events are sorted once; row
+    numbers within an event come out in ascending (table) order. Inverted
+    ranges (opening > closing) contain no rank and produce no events.
+    """
+    import numpy as np
+
+    opening = np.asarray(opening, dtype=np.int64)
+    closing = np.asarray(closing, dtype=np.int64)
+    size = len(opening)
+    rows = np.flatnonzero(opening <= closing)
+    ranks = np.concatenate([opening[rows], closing[rows] + 1])
+    # Stable, so openings precede closings and rows stay in order
+    order = np.argsort(ranks, kind='stable')
+    ranks = ranks[order].tolist()
+    order = np.concatenate([rows, rows + size])[order].tolist()
+
+    i = 0
+    while i < len(order):
+        rank, entering, leaving = ranks[i], [], []
+        while i < len(order) and ranks[i] == rank:
+            row = order[i]
+            if row < size:
+                entering.append(row)
+            else:
+                leaving.append(row - size)
+            i += 1
+        yield rank, entering, leaving
+
+
+def sweep(opening, closing, rank_from, rank_to):
+    """(rows in range at rank_from, steps) for ranks rank_from..rank_to.
+
+    Each step is a rank in (rank_from, rank_to] where rows enter or leave the
+    matches. Events up to rank_from only build the starting set.
+    """
+    active = set()
+    steps = []
+    for rank, entering, leaving in events(opening, closing):
+        if rank > rank_to:
+            break
+        if rank <= rank_from:
+            active.update(entering)
+            active.difference_update(leaving)
+        else:
+            steps.append({'rank': rank, 'enter': entering, 'leave': leaving})
+    return sorted(active), steps
+
+
+def segments(opening, closing):
+    """Sorted breakpoints and the rows in range from each one up to the next (see export_shards).
+
+    segments[0] is empty: below the first breakpoint no range contains the rank.
+    """
+    active = set()
+    breakpoints, rows = [], [[]]
+    for rank, entering, leaving in events(opening, closing):
+        active.update(entering)
+        active.difference_update(leaving)
+        breakpoints.append(rank)
+        rows.append(sorted(active))
+    return breakpoints, rows
+
+
+def timeline(records, rank_from, rank_to, fields=SWEEP_FIELDS):
+    """The match timeline of CutoffRecords over rank_from..rank_to.
+
+    Only rows whose range overlaps the span are kept; `initial` and the steps'
+    `enter`/`leave` lists index the columnar `rows`.
+    """
+    opening, closing = records['opening_cutoff_rank'], records['closing_cutoff_rank']
+    overlapping = records.take((opening <= rank_to) & (closing >= rank_from))
+    initial, steps = sweep(overlapping['opening_cutoff_rank'], overlapping['closing_cutoff_rank'],
+                           rank_from, rank_to)
+    return {
+        'rank_from': rank_from,
+        'rank_to': rank_to,
+        'rows': to_columnar(overlapping.to_dicts(fields), fields),
+        'initial': initial,
+        'steps': steps,
+    }
+
+
+def empty_timeline(rank_from, rank_to, fields=SWEEP_FIELDS):
+    return {'rank_from': rank_from, 'rank_to': rank_to, 'rows': to_columnar([], fields),
+            'initial': [], 'steps': []}
@@ -0,0 +1,112 @@
+# ranking.py - Top-K ranked prediction results with cursor pagination
+import base64
+import hashlib
+import heapq
+import json
+
+# Signals a ranked result can be ordered by, each scaled to 0..1:
+#   margin      - how far inside the closing rank the user is, relative to the cutoff range
+#   seats       - seats relative to the largest intake among the matches
+#   probability - the model's admission probability
+RANKING_SIGNALS = ('margin', 'seats', 'probability')
+DEFAULT_WEIGHTS = {'margin': 1.0, 'seats': 0.25, 'probability': 1.0}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+
+def parse_weights(rank_by):
+    """"margin=2,probability=1" or just "margin,probability" (weight 1 each)."""
+    if not rank_by:
+        return dict(DEFAULT_WEIGHTS)
+
+    weights = {signal: 0.0 for signal in RANKING_SIGNALS}
+    for item in str(rank_by).split(','):
+        name, _, weight = item.strip().partition('=')
+        if name not in weights:
+            raise ValueError(f"Unknown ranking signal: {name}")
+        try:
+            weights[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name}: {weight}")
+    return weights
+
+
+def parse_ranking(data):
+    """Ranking options from request data, or None for the unranked, unbounded result."""
+    if not any(data.get(key) for key in ('limit', 'cursor', 'rank_by')):
+        return None
+
+    try:
+        limit = int(data.get('limit') or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    cursor = data.get('cursor')
+    return {
+        'limit': limit,
+        'weights': parse_weights(data.get('rank_by')),
+        'cursor': decode_cursor(cursor) if cursor else None,
+    }
+
+
+def query_fingerprint(key):
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def encode_cursor(fingerprint, score, position):
+    payload = json.dumps({'q': fingerprint, 's': score, 'p': position}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        cursor = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {'q': str(cursor['q']), 's': float(cursor['s']), 'p': int(cursor['p'])}
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid cursor")
+
+
+def in_range(candidates, user_rank):
+    """Boolean mask of the rows whose cutoff range contains the user's rank."""
+    import numpy as np
+
+    opening, closing = candidates['opening_cutoff_rank'], candidates['closing_cutoff_rank']
+    return np.asarray((opening <= user_rank) & (user_rank <= closing))
+
+
+def score_candidates(candidates, user_rank, weights, probabilities=None):
+    """Weighted score per candidate row (all rows are expected to be in range)."""
+    import numpy as np
+
+    opening = np.asarray(candidates['opening_cutoff_rank'], dtype=float)
+    closing = np.asarray(candidates['closing_cutoff_rank'], dtype=float)
+    scores = np.zeros(len(candidates))
+
+    if weights.get('margin'):
+        scores += weights['margin'] * (closing - user_rank) / (closing - opening + 1)
+    if weights.get('seats') and 'seats' in candidates:
+        seats = np.asarray(candidates['seats'], dtype=float)
+        most = seats.max() if len(seats) else 0
+        if most > 0:
+            scores += weights['seats'] * seats / most
+    if weights.get('probability') and probabilities is not None:
+        scores += weights['probability'] * np.nan_to_num(probabilities)
+    return scores
+
+
+def top_k(scores, positions, k, cursor=None):
+    """The k best (score, position) pairs, best first, strictly after the cursor.
+
+    Ordered by score descending then position ascending, so pages are stable.
+    A heap of size k is kept over the scan instead of sorting every match.
+    """
+    ranked = zip(scores.tolist(), positions)
+    if cursor is not None:
+        last_score, last_position = cursor['s'], cursor['p']
+        ranked = ((score, position) for score, position in ranked
+                  if score < last_score or (score == last_score and position > last_position))
+    return heapq.nlargest(k, ranked, key=lambda item: (item[0], -item[1]))
@@ -0,0 +1,385 @@
+# rate_limit.py - Host-wide token buckets and an in-flight cap for the prediction endpoints
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from flask import g, jsonify, make_response, request
+from flask_login import current_user
+
+from metrics import ADMISSION_REJECTIONS
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows development): admission control is disabled
+    fcntl = None
+
+# Empty or "off" disables admission control
+RATE_LIMIT_PATH = os.environ.get('RATE_LIMIT_PATH',
+                                 os.path.join(tempfile.gettempdir(), 'college_predictor_ratelimit'))
+# Sustained requests per minute and burst size, per logged-in user and per client IP
+RATE_LIMIT_USER_PER_MIN = float(os.environ.get('RATE_LIMIT_USER_PER_MIN', '30'))
+RATE_LIMIT_USER_BURST = float(os.environ.get('RATE_LIMIT_USER_BURST', '10'))
+RATE_LIMIT_IP_PER_MIN = float(os.environ.get('RATE_LIMIT_IP_PER_MIN', '120'))
+RATE_LIMIT_IP_BURST = float(os.environ.get('RATE_LIMIT_IP_BURST', '30'))
+# Prediction requests running at once across all workers; further requests wait in a
+# short queue and are shed with 503 once it is full or they have waited too long
+MAX_IN_FLIGHT = int(os.environ.get('MAX_IN_FLIGHT', str(max(2, (os.cpu_count() or 1) * 2))))
+MAX_QUEUE = int(os.environ.get('MAX_QUEUE', '8'))
+QUEUE_TIMEOUT = float(os.environ.get('QUEUE_TIMEOUT', '0.5'))
+
+QUEUE_POLL = 0.005
+# Seconds a shed request is told to wait before retrying
+BUSY_RETRY_AFTER = 1
+
+# File layout: header (with host-wide in-flight and queued totals), one
+# (pid, in flight, queued) slot per worker, then an open-addressed table of
+# (key hash, tokens, last update) buckets
+MAGIC = b'CPRATE01'
+HEADER = struct.Struct('<8sII')
+TOTALS = struct.Struct('<qq')
+WORKER = struct.Struct('<qqq')
+BUCKET = struct.Struct('<Qdd')
+WORKER_SLOTS = 128
+BUCKET_SLOTS = 16384
+PROBES = 8
+
+TOTALS_OFFSET = HEADER.size
+WORKERS_OFFSET = TOTALS_OFFSET + TOTALS.size
+BUCKETS_OFFSET = WORKERS_OFFSET + WORKER_SLOTS * WORKER.size
+FILE_SIZE = BUCKETS_OFFSET + BUCKET_SLOTS * BUCKET.size
+
+
+def key_hash(key):
+    # Python's hash() differs per process, so buckets are keyed by a stable digest
+    value = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Rejected(Exception):
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionControl:
+    """Token buckets and in-flight counts shared by every worker through an mmap'd file.
+
+    All state changes happen under an exclusive flock on the file (plus a thread
+    lock, since flock does not exclude threads of one process). Admitting a
+    request takes the lock once and releasing it once more.
+    """
+
+    def __init__(self, path=RATE_LIMIT_PATH, max_in_flight=MAX_IN_FLIGHT, max_queue=MAX_QUEUE,
+                 queue_timeout=QUEUE_TIMEOUT):
+        self.path = path
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.thread_lock = threading.Lock()
+        self.map = None
+        self.fd = None
+        self.pid = None
+        self.slot = None
+
+    @property
+    def enabled(self):
+        return fcntl is not None and bool(self.path) and self.path.lower() != 'off'
+
+    # Shared state
+
+    def open(self):
+        # Reopened after fork: gunicorn workers must not share the master's slot
+        if self.map is not None and self.pid == os.getpid():
+            return
+        with self.thread_lock:
+            if self.map is not None and self.pid == os.getpid():
+                return
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < FILE_SIZE:
+                    os.ftruncate(fd, FILE_SIZE)
+                shared = mmap.mmap(fd, FILE_SIZE)
+                if HEADER.unpack_from(shared, 0) != (MAGIC, WORKER_SLOTS, BUCKET_SLOTS):
+                    shared[:] = bytes(FILE_SIZE)
+                    HEADER.pack_into(shared, 0, MAGIC, WORKER_SLOTS, BUCKET_SLOTS)
+                self.map, self.fd, self.pid = shared, fd, os.getpid()
+                self.slot = self.claim_slot()
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def locked(self):
+        return _FileLock(self)
+
+    def claim_slot(self):
+        """This process' worker slot: a free one, or one left behind by a dead worker."""
+        free = None
+        for slot in range(WORKER_SLOTS):
+            pid, _, _ = WORKER.unpack_from(self.map, WORKERS_OFFSET + slot * WORKER.size)
+            if pid == self.pid:
+                free = slot
+                break
+            if free is None and (pid == 0 or not pid_alive(pid)):
+                free = slot
+        if free is None:
+            raise RuntimeError("No free worker slot in the rate limit file")
+        # Whatever a previous holder of the slot left counted goes with it
+        offset = WORKERS_OFFSET + free * WORKER.size
+        _, in_flight, queued = WORKER.unpack_from(self.map, offset)
+        running, waiting = TOTALS.unpack_from(self.map, TOTALS_OFFSET)
+        TOTALS.pack_into(self.map, TOTALS_OFFSET, max(running - in_flight, 0), max(waiting - queued, 0))
+        WORKER.pack_into(self.map, offset, self.pid, 0, 0)
+        return free
+
+    def adjust(self, in_flight=0, queued=0):
+        # The worker's own counts let reap() take back what a dead worker held
+        offset = WORKERS_OFFSET + self.slot * WORKER.size
+        pid, running, waiting = WORKER.unpack_from(self.map, offset)
+        WORKER.pack_into(self.map, offset, pid, running + in_flight, waiting + queued)
+        running, waiting = TOTALS.unpack_from(self.map, TOTALS_OFFSET)
+        TOTALS.pack_into(self.map, TOTALS_OFFSET, running + in_flight, waiting + queued)
+
+    def totals(self):
+        """(in flight, queued) across all workers."""
+        return TOTALS.unpack_from(self.map, TOTALS_OFFSET)
+
+    def reap(self):
+        """Free the slots and counts of workers that died mid-request; returns the new totals."""
+        running, waiting = self.totals()
+        for slot in range(WORKER_SLOTS):
+            offset = WORKERS_OFFSET + slot * WORKER.size
+            pid, in_flight, queued = WORKER.unpack_from(self.map, offset)
+            if pid not in (0, self.pid) and not pid_alive(pid):
+                WORKER.pack_into(self.map, offset, 0, 0, 0)
+                running, waiting = running - in_flight, waiting - queued
+        TOTALS.pack_into(self.map, TOTALS_OFFSET, max(running, 0), max(waiting, 0))
+        return self.totals()
+
+    def refill(self, key, rate, burst, now):
+        """Key's bucket topped up to now; returns (offset, key hash, tokens).
+
+        The refilled bucket is written back straight away, so a second new key
+        probing the same slots cannot claim the same empty one.
+        """
+        wanted = key_hash(key)
+        start = wanted % BUCKET_SLOTS
+        target = oldest = None
+        for probe in range(PROBES):
+            offset = BUCKETS_OFFSET + ((start + probe) % BUCKET_SLOTS) * BUCKET.size
+            stored, tokens, updated = BUCKET.unpack_from(self.map, offset)
+            if stored == wanted:
+                target = offset
+                tokens = min(burst, tokens + (now - updated) * rate)
+                break
+            if stored == 0 and target is None:
+                target = offset
+            if oldest is None or updated < oldest[1]:
+                oldest = (offset, updated)
+        else:
+            # New key: use an empty slot, or recycle the least recently used one nearby
+            target = target if target is not None else oldest[0]
+            tokens = burst
+        BUCKET.pack_into(self.map, target, wanted, tokens, now)
+        return target, wanted, tokens
+
+    def take(self, limits, now):
+        """Take a token from each (key, per minute, burst, reason) bucket, or none of them.
+
+        Raises Rejected for the first bucket without a token; a request turned
+        away by one limit costs nothing from the others.
+        """
+        buckets = []
+        for key, rate_per_min, burst, reason in limits:
+            if key is None or rate_per_min <= 0:
+                continue
+            rate = rate_per_min / 60.0
+            offset, wanted, tokens = self.refill(key, rate, burst, now)
+            if tokens < 1:
+                raise Rejected(429, reason, max(1, math.ceil((1 - tokens) / rate)))
+            buckets.append((offset, wanted, tokens))
+        for offset, wanted, tokens in buckets:
+            BUCKET.pack_into(self.map, offset, wanted, tokens - 1, now)
+
+    # Requests
+
+    @staticmethod
+    def limits(user_key, ip_key):
+        return ((user_key, RATE_LIMIT_USER_PER_MIN, RATE_LIMIT_USER_BURST, 'user'),
+                (ip_key, RATE_LIMIT_IP_PER_MIN, RATE_LIMIT_IP_BURST, 'ip'))
+
+    def admit(self, user_key, ip_key):
+        """Reserve an in-flight slot for a request or raise Rejected.
+
+        Every admitted request must be followed by release().
+        """
+        self.open()
+        now = time.time()
+        with self.locked():
+            self.take(self.limits(user_key, ip_key), now)
+
+            running, waiting = self.totals()
+            if running < self.max_in_flight:
+                self.adjust(in_flight=1)
+                return
+            # Over the cap: recount without dead workers before queueing
+            running, waiting = self.reap()
+            if running < self.max_in_flight:
+                self.adjust(in_flight=1)
+                return
+            if waiting >= self.max_queue:
+                raise Rejected(503, 'busy', BUSY_RETRY_AFTER)
+            self.adjust(queued=1)
+
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            time.sleep(QUEUE_POLL)
+            with self.locked():
+                running, _ = self.totals()
+                if running < self.max_in_flight:
+                    self.adjust(in_flight=1, queued=-1)
+                    return
+                if time.monotonic() >= deadline:
+                    self.adjust(queued=-1)
+                    raise Rejected(503, 'busy', BUSY_RETRY_AFTER)
+
+    def charge(self, user_key, ip_key):
+        """Take the request's tokens without admitting it (for an already answered request)."""
+        self.open()
+        with self.locked():
+            try:
+                self.take(self.limits(user_key, ip_key), time.time())
+            except Rejected:
+                pass
+
+    def release(self):
+        with self.locked():
+            self.adjust(in_flight=-1)
+
+    def status(self):
+        if not self.enabled:
+            return {'enabled': False}
+        self.open()
+        with self.locked():
+            running, waiting = self.totals()
+        return {'enabled': True, 'in_flight': running, 'queued': waiting,
+                'max_in_flight': self.max_in_flight, 'max_queue': self.max_queue}
+
+
+class _FileLock:
+    def __init__(self, control):
+        self.control = control
+
+    def __enter__(self):
+        self.control.thread_lock.acquire()
+        try:
+            fcntl.flock(self.control.fd, fcntl.LOCK_EX)
+        except BaseException:
+            self.control.thread_lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.flock(self.control.fd, fcntl.LOCK_UN)
+        finally:
+            self.control.thread_lock.release()
+
+
+admission = AdmissionControl()
+
+
+REJECTION_MESSAGES = {
+    'user': 'Too many predictions, please slow down',
+    'ip': 'Too many requests from this address, please slow down',
+    'busy': 'Server is busy, please retry shortly',
+}
+
+
+def request_keys():
+    """The (user, client IP) bucket keys of the current request."""
+    prefix = g.get('admission_scope') or ''
+    user_key = f"{prefix}user:{current_user.get_id()}" if current_user.is_authenticated else None
+    return user_key, f"{prefix}ip:{request.remote_addr}"
+
+
+def admission_controlled(view=None, scope=None):
+    """Apply the per-user/per-IP limits and the in-flight cap to a view (after login_required).
+
+    Conditional requests (If-None-Match) are admitted only when the view calls
+    admit_request(), so an ETag revalidation answered with 304 takes no token
+    or in-flight slot. Any other answer to them is charged its tokens afterwards.
+
+    Views with a `scope` (`@admission_controlled(scope='warm')`) draw on their
+    own buckets, so frequent cheap calls don't use up the predictions' tokens;
+    they still count against the in-flight cap.
+    """
+    if view is None:
+        return lambda view: admission_controlled(view, scope)
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not admission.enabled:
+            return view(*args, **kwargs)
+        g.admission = 'pending'
+        g.admission_scope = f"{scope}:" if scope else None
+        if not request.if_none_match:
+            rejection = admit_request()
+            if rejection is not None:
+                return rejection
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            state = g.pop('admission', None)
+            if state == 'admitted':
+                admission.release()
+        if state == 'pending' and response.status_code != 304:
+            try:
+                admission.charge(*request_keys())
+            except (OSError, RuntimeError) as e:
+                print(f"⚠️  Admission control unavailable: {e}")
+        return response
+
+    return wrapped
+
+
+def admit_request():
+    """Admit the current request if its view is admission controlled and it isn't yet.
+
+    Returns None once admitted, otherwise the 429/503 response to send instead.
+    """
+    if g.get('admission') != 'pending':
+        return None
+    try:
+        admission.admit(*request_keys())
+    except Rejected as e:
+        g.admission = 'rejected'
+        ADMISSION_REJECTIONS.inc(endpoint=request.endpoint, reason=e.reason)
+        response = jsonify({'error': REJECTION_MESSAGES[e.reason]})
+        response.status_code = e.status
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    except (OSError, RuntimeError) as e:
+        # Never turn a broken limiter file into an outage
+        print(f"⚠️  Admission control unavailable: {e}")
+        g.admission = 'failed'
+        return None
+    g.admission = 'admitted'
+    return None
@@ -0,0 +1,315 @@
+# record_store.py - Compact columnar store for cutoff rows (dictionary-encoded strings, int32 numbers)
+import argparse
+import sqlite3
+import sys
+import time
+
+# Same columns as the college tables created by database/init_db.py
+STRING_COLUMNS = ['college_id', 'college_name', 'college_type', 'state', 'place', 'exam_type',
+                  'category', 'website', 'background_images']
+INT_COLUMNS = ['serial_no', 'opening_cutoff_rank', 'closing_cutoff_rank', 'seats', 'year']
+
+# Fields of a row the prediction page and chatbot render
+CLIENT_FIELDS = ['college_id', 'college_name', 'place', 'state', 'opening_cutoff_rank',
+                 'closing_cutoff_rank', 'seats', 'year', 'website']
+
+
+def code_dtype(np, size):
+    """Smallest signed integer type holding codes 0..size-1 and the -1 missing marker."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class CutoffRecord:
+    """Read-only view of one row; values are looked up in the store on access."""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, name):
+        if name not in self._store.columns:
+            raise KeyError(name)
+        return self._store.value(name, self._row)
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def get(self, name, default=None):
+        return self._store.value(name, self._row) if name in self._store.columns else default
+
+    def to_dict(self, fields=None):
+        return {name: self._store.value(name, self._row) for name in (fields or self._store.columns)}
+
+    def __repr__(self):
+        return f"CutoffRecord({self.to_dict(CLIENT_FIELDS)})"
+
+
+class CutoffRecords:
+    """Cutoff rows as parallel arrays.
+
+    String columns hold small integer codes into a per-column vocabulary (a
+    handful of states, exams, categories and places, one entry per college
+    name or website), numeric columns are int32. `positions` are the rows'
+    positions in the original load and survive filtering, so they can key
+    cursors the way a DataFrame index did.
+    """
+
+    def __init__(self, columns, codes, vocab, numbers, positions):
+        self.columns = columns
+        self.codes = codes
+        self.vocab = vocab
+        self.numbers = numbers
+        self.positions = positions
+
+    @classmethod
+    def from_frame(cls, frame):
+        import numpy as np
+        import pandas as pd
+
+        codes, vocab, numbers = {}, {}, {}
+        for name in frame.columns:
+            series = frame[name]
+            if name in INT_COLUMNS or (name not in STRING_COLUMNS and pd.api.types.is_numeric_dtype(series)):
+                values = pd.to_numeric(series, errors='coerce')
+                if values.notna().all() and (values.empty or values.abs().max() < 2 ** 31):
+                    numbers[name] = values.to_numpy(dtype=np.int32)
+                else:
+                    # Missing or out-of-range values keep the DataFrame's float representation
+                    numbers[name] = values.to_numpy(dtype=np.float64)
+            else:
+                column_codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                codes[name] = column_codes.astype(code_dtype(np, len(uniques)))
+                vocab[name] = np.array(list(uniques) + [None], dtype=object)
+        return cls(list(frame.columns), codes, vocab, numbers, np.arange(len(frame), dtype=np.int32))
+
+    @classmethod
+    def from_query(cls, conn, query, params=()):
+        import pandas as pd
+        return cls.from_frame(pd.read_sql(query, conn, params=params))
+
+    @classmethod
+    def concat(cls, parts):
+        """One store from several (e.g. one per college table); vocabularies are merged."""
+        import numpy as np
+
+        parts = [part for part in parts if len(part)] or parts[:1]
+        columns = list(dict.fromkeys(name for part in parts for name in part.columns))
+        codes, vocab, numbers = {}, {}, {}
+        for name in columns:
+            if all(name in part.numbers for part in parts):
+                numbers[name] = np.concatenate([part.numbers[name] for part in parts])
+                continue
+            merged = {}
+            remapped = []
+            for part in parts:
+                values = part.decode(name) if name in part.columns else np.full(len(part), None, dtype=object)
+                remapped.append(np.fromiter((merged.setdefault(value, len(merged)) if value is not None else -1
+                                             for value in values.tolist()), dtype=np.int64, count=len(part)))
+            codes[name] = np.concatenate(remapped).astype(code_dtype(np, len(merged)))
+            vocab[name] = np.array(list(merged) + [None], dtype=object)
+        size = sum(len(part) for part in parts)
+        return cls(columns, codes, vocab, numbers, np.arange(size, dtype=np.int32))
+
+    def with_column(self, name, value):
+        """Copy with a constant string column added (e.g. a table's college type)."""
+        import numpy as np
+
+        codes = dict(self.codes, **{name: np.zeros(len(self), dtype=np.int8)})
+        vocab = dict(self.vocab, **{name: np.array([value, None], dtype=object)})
+        return CutoffRecords(self.columns + [name], codes, vocab, self.numbers, self.positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        """Column as a NumPy array (strings decoded)."""
+        if name in self.numbers:
+            return self.numbers[name]
+        return self.decode(name)
+
+    def decode(self, name):
+        # Code -1 (missing) indexes the trailing None of the vocabulary
+        return self.vocab[name][self.codes[name]]
+
+    def value(self, name, row):
+        if name in self.numbers:
+            return self.numbers[name][row].item()
+        return self.vocab[name][self.codes[name][row]]
+
+    def code(self, name, value):
+        """Code of a string value in a column, or None if it never occurs."""
+        for code, known in enumerate(self.vocab[name][:-1]):
+            if known == value:
+                return code
+        return None
+
+    def take(self, selector):
+        """Rows picked by a boolean mask or index array; vocabularies are shared, not copied."""
+        return CutoffRecords(
+            self.columns,
+            {name: values[selector] for name, values in self.codes.items()},
+            self.vocab,
+            {name: values[selector] for name, values in self.numbers.items()},
+            self.positions[selector],
+        )
+
+    def where(self, name, value):
+        """Rows whose string column equals value, compared as integer codes."""
+        code = self.code(name, value)
+        if code is None:
+            return self.take(self.positions[:0])
+        return self.take(self.codes[name] == code)
+
+    def row_of(self, position):
+        """Row holding an original position (positions stay sorted through take())."""
+        return int(self.positions.searchsorted(position))
+
+    def record(self, row):
+        return CutoffRecord(self, row)
+
+    def records(self):
+        return (CutoffRecord(self, row) for row in range(len(self)))
+
+    def to_dicts(self, fields=None):
+        """Rows as dicts, like DataFrame.to_dict('records'); strings are the shared vocabulary objects."""
+        fields = fields or self.columns
+        columns = [self[name].tolist() for name in fields]
+        return [dict(zip(fields, values)) for values in zip(*columns)]
+
+    def to_frame(self, fields=None):
+        """DataFrame with categorical string columns, for code that needs pandas."""
+        import pandas as pd
+
+        data = {}
+        for name in fields or self.columns:
+            if name in self.numbers:
+                data[name] = self.numbers[name]
+            else:
+                categories = self.vocab[name][:-1]
+                data[name] = pd.Categorical.from_codes(self.codes[name].astype('int64'), categories=categories)
+        return pd.DataFrame(data)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the arrays plus the vocabulary strings."""
+        arrays = sum(values.nbytes for values in self.codes.values())
+        arrays += sum(values.nbytes for values in self.numbers.values()) + self.positions.nbytes
+        strings = sum(values.nbytes + sum(sys.getsizeof(value) for value in values if value is not None)
+                      for values in self.vocab.values())
+        return arrays + strings
+
+
+def load_table(conn, table_name):
+    return CutoffRecords.from_query(conn, f"SELECT * FROM {table_name}")
+
+
+# Memory benchmark
+
+
+def synthetic_frame(rows, seed=42):
+    """`rows` cutoff rows shaped like the real tables (as pandas would load them)."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    colleges = max(1, rows // 12)
+    college = rng.integers(0, colleges, rows)
+    places = np.array(['Bengaluru', 'Mysore', 'Mandya', 'Belagavi', 'Dharwad', 'Hubballi',
+                       'Davanagere', 'Mangaluru', 'Hassan', 'Tumakuru'], dtype=object)
+    opening = rng.integers(1, 40000, rows)
+    # Strings are built per row, the way read_sql materializes them
+    return pd.DataFrame({
+        'serial_no': np.arange(1, rows + 1),
+        'college_id': [f"C{c:07d}" for c in college],
+        'college_name': [f"Synthetic College of Engineering {c:07d}" for c in college],
+        'college_type': ['MCA'] * rows,
+        'state': ['Karnataka'] * rows,
+        'place': [str(place) for place in places[college % len(places)]],
+        'exam_type': ['PGCET'] * rows,
+        'category': [['GM', 'OBC', 'SC', 'ST'][i] for i in rng.integers(0, 4, rows)],
+        'opening_cutoff_rank': opening,
+        'closing_cutoff_rank': opening + rng.integers(100, 5000, rows),
+        'seats': rng.integers(1, 120, rows),
+        'year': rng.choice([2023, 2024, 2025], rows),
+        'website': [f"https://c{c:07d}.example.edu" for c in college],
+        'background_images': [None] * rows,
+    })
+
+
+def memory_benchmark(rows):
+    frame = synthetic_frame(rows)
+    frame_bytes = int(frame.memory_usage(deep=True).sum())
+
+    start = time.perf_counter()
+    records = CutoffRecords.from_frame(frame)
+    encode_seconds = time.perf_counter() - start
+    store_bytes = records.nbytes
+
+    rank = 20000
+    start = time.perf_counter()
+    frame_matches = int(((frame['opening_cutoff_rank'] <= rank) & (rank <= frame['closing_cutoff_rank'])).sum())
+    frame_filter = time.perf_counter() - start
+    start = time.perf_counter()
+    store_matches = int(((records['opening_cutoff_rank'] <= rank) & (rank <= records['closing_cutoff_rank'])).sum())
+    store_filter = time.perf_counter() - start
+    assert frame_matches == store_matches
+
+    start = time.perf_counter()
+    frame_place = int((frame['place'] == 'Mysore').sum())
+    frame_place_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    store_place = len(records.where('place', 'Mysore'))
+    store_place_seconds = time.perf_counter() - start
+    assert frame_place == store_place
+
+    return {
+        'rows': rows,
+        'dataframe_bytes': frame_bytes,
+        'record_store_bytes': store_bytes,
+        'ratio': round(frame_bytes / store_bytes, 1),
+        'encode_seconds': round(encode_seconds, 3),
+        'rank_filter_seconds': {'dataframe': round(frame_filter, 4), 'record_store': round(store_filter, 4)},
+        'place_filter_seconds': {'dataframe': round(frame_place_seconds, 4),
+                                 'record_store': round(store_place_seconds, 4)},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare cutoff row memory: DataFrame vs record store')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', help='Also report the real tables of this database')
+    args = parser.parse_args()
+
+    result = memory_benchmark(args.rows)
+    print(f"📦 {result['rows']:,} rows")
+    print(f"  - DataFrame:    {result['dataframe_bytes'] / 2 ** 20:8.1f} MiB")
+    print(f"  - Record store: {result['record_store_bytes'] / 2 ** 20:8.1f} MiB ({result['ratio']}x smaller, "
+          f"encoded in {result['encode_seconds']}s)")
+    print(f"  - Rank filter:  {result['rank_filter_seconds']}")
+    print(f"  - Place filter: {result['place_filter_seconds']}")
+
+    if args.db:
+        conn = sqlite3.connect(args.db)
+        try:
+            for table_name in ('mca_colleges', 'mba_colleges', 'mtech_colleges'):
+                frame = __import__('pandas').read_sql(f"SELECT * FROM {table_name}", conn)
+                records = CutoffRecords.from_frame(frame)
+                print(f"  - {table_name}: {len(frame)} rows, "
+                      f"{frame.memory_usage(deep=True).sum() / 1024:.0f} KiB -> {records.nbytes / 1024:.0f} KiB")
+        finally:
+            conn.close()
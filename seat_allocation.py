@@ -0,0 +1,330 @@
+# seat_allocation.py - Counselling-round seat allotment simulation (applicant-proposing deferred acceptance)
+import argparse
+import csv
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+
+DB_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'database', 'college_data.db')
+
+COLLEGE_TYPES = ['mca', 'mba', 'mtech']
+# Open-merit seats every applicant competes for before their own category's seats
+GENERAL_CATEGORY = 'GM'
+
+DEFAULT_COHORT = 20000
+DEFAULT_CHOICES = 15
+# Spread of applicants' tastes around a college's popularity (0: everyone ranks colleges alike)
+PREFERENCE_NOISE = 1.0
+MAX_COHORT = 500000
+
+# Report entries for callers in this process only (not serialized)
+INTERNAL_KEYS = ('allotments', 'programs', 'roster')
+
+
+class Program:
+    """The seats of one category at one college, and who currently holds them."""
+
+    __slots__ = ('college_id', 'college_name', 'place', 'category', 'seats', 'opening', 'closing', 'held')
+
+    def __init__(self, college_id, college_name, place, category, seats, opening, closing):
+        self.college_id = college_id
+        self.college_name = college_name
+        self.place = place
+        self.category = category
+        self.seats = seats
+        self.opening = opening
+        self.closing = closing
+        # Max-heap of (-rank, applicant): the worst-ranked holder is on top, ready to be bumped
+        self.held = []
+
+
+class Applicants:
+    """A cohort as parallel lists: merit rank, category and college preferences (most wanted first)."""
+
+    def __init__(self, ranks, categories, preferences):
+        self.ranks = ranks
+        self.categories = categories
+        self.preferences = preferences
+
+    def __len__(self):
+        return len(self.ranks)
+
+
+def load_programs(conn, college_type, exam_type='PGCET', state='Karnataka', year=None):
+    """(programs, year): seat pools per (college, category) from one year's cutoffs, the latest by default."""
+    table_name = f"{college_type.lower()}_colleges"
+    if year is None:
+        year = conn.execute(f"SELECT MAX(year) FROM {table_name} WHERE exam_type = ? AND state = ?",
+                            (exam_type, state)).fetchone()[0]
+    rows = conn.execute(f"""
+        SELECT college_id, college_name, place, category, seats, opening_cutoff_rank, closing_cutoff_rank
+        FROM {table_name}
+        WHERE exam_type = ? AND state = ? AND year = ? AND seats > 0
+        ORDER BY college_id, category
+    """, (exam_type, state, year)).fetchall()
+
+    programs = {}
+    for college_id, college_name, place, category, seats, opening, closing in rows:
+        # Repeated source rows describe the same seats
+        programs.setdefault((college_id, category),
+                            Program(college_id, college_name, place, category, seats, opening, closing))
+    return list(programs.values()), year
+
+
+def college_order(programs):
+    """College ids, most sought-after (lowest general closing rank) first."""
+    closing = {}
+    for program in programs:
+        if program.category == GENERAL_CATEGORY or program.college_id not in closing:
+            closing[program.college_id] = program.closing
+    return sorted(closing, key=lambda college_id: (closing[college_id], college_id))
+
+
+def synthetic_cohort(programs, size=DEFAULT_COHORT, choices=DEFAULT_CHOICES, noise=PREFERENCE_NOISE, seed=42):
+    """Applicants ranked 1..size, with categories in proportion to each category's seats.
+
+    Each applicant lists `choices` colleges ordered by popularity (the log of
+    last year's general closing rank) plus Gumbel noise, so tastes differ but
+    sought-after colleges are listed early by most.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    colleges = college_order(programs)
+    if not colleges or size <= 0:
+        return Applicants([], [], [])
+
+    seats = {}
+    for program in programs:
+        seats[program.category] = seats.get(program.category, 0) + program.seats
+    categories = sorted(seats)
+    shares = np.array([seats[category] for category in categories], dtype=float)
+    drawn = rng.choice(len(categories), size=size, p=shares / shares.sum())
+
+    popularity = -np.log(np.arange(1, len(colleges) + 1, dtype=float))
+    tastes = popularity + noise * rng.gumbel(size=(size, len(colleges)))
+    choices = min(choices, len(colleges))
+    top = np.argpartition(-tastes, choices - 1, axis=1)[:, :choices]
+    order = np.take_along_axis(tastes, top, axis=1).argsort(axis=1)[:, ::-1]
+    preferences = np.take_along_axis(top, order, axis=1)
+
+    return Applicants(list(range(1, size + 1)), [categories[i] for i in drawn.tolist()],
+                      [[colleges[i] for i in row] for row in preferences.tolist()])
+
+
+def read_applicants(stream):
+    """Applicants from CSV with rank, category and preferences (college ids separated by ';')."""
+    ranks, categories, preferences = [], [], []
+    for line, row in enumerate(csv.DictReader(stream), start=2):
+        try:
+            rank = int(row['rank'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Line {line}: rank must be an integer")
+        if rank <= 0:
+            raise ValueError(f"Line {line}: rank must be positive")
+        ranks.append(rank)
+        categories.append((row.get('category') or GENERAL_CATEGORY).strip())
+        preferences.append([college_id.strip() for college_id in (row.get('preferences') or '').split(';')
+                            if college_id.strip()])
+    return Applicants(ranks, categories, preferences)
+
+
+def program_lists(programs, applicants):
+    """Per applicant, the program indices to apply to in order.
+
+    For each listed college an applicant tries the general seats first, then
+    their own category's, so a reserved-category applicant who makes the
+    general cut leaves the reserved seat to the next in line.
+    """
+    index = {(program.college_id, program.category): i for i, program in enumerate(programs)}
+    lists = []
+    for category, colleges in zip(applicants.categories, applicants.preferences):
+        pools = (GENERAL_CATEGORY,) if category == GENERAL_CATEGORY else (GENERAL_CATEGORY, category)
+        lists.append([index[key] for key in ((college_id, pool) for college_id in colleges for pool in pools)
+                      if key in index])
+    return lists
+
+
+def allocate(programs, applicants):
+    """Applicant-proposing deferred acceptance; returns (program index or -1 per applicant, proposals).
+
+    Every program ranks applicants by merit rank (ties by position in the
+    cohort). A free applicant applies to the next program on their list; the
+    program keeps them if it has a free seat or they outrank its worst holder,
+    who is bumped and applies on down their own list. The result is the
+    applicant-optimal stable allotment.
+    """
+    lists = program_lists(programs, applicants)
+    ranks = applicants.ranks
+    seats = [program.seats for program in programs]
+    held = [program.held for program in programs]
+    for heap in held:
+        heap.clear()
+    next_choice = [0] * len(applicants)
+    assigned = [-1] * len(applicants)
+    proposals = 0
+
+    free = deque(range(len(applicants)))
+    while free:
+        applicant = free.popleft()
+        while applicant is not None:
+            choices = lists[applicant]
+            if next_choice[applicant] >= len(choices):
+                break
+            target = choices[next_choice[applicant]]
+            next_choice[applicant] += 1
+            proposals += 1
+
+            heap = held[target]
+            entry = (-ranks[applicant], -applicant)
+            if len(heap) < seats[target]:
+                heapq.heappush(heap, entry)
+                assigned[applicant] = target
+                applicant = None
+            elif entry > heap[0]:
+                # Outranks the worst holder, who is bumped and carries on down their list
+                bumped = -heapq.heapreplace(heap, entry)[1]
+                assigned[applicant], assigned[bumped] = target, -1
+                applicant = bumped
+    return assigned, proposals
+
+
+def program_report(program):
+    admitted = sorted(-rank for rank, _ in program.held)
+    return {
+        'college_id': program.college_id,
+        'category': program.category,
+        'seats': program.seats,
+        'filled': len(admitted),
+        'projected_opening_rank': admitted[0] if admitted else None,
+        'projected_closing_rank': admitted[-1] if admitted else None,
+        'historical_opening_rank': program.opening,
+        'historical_closing_rank': program.closing,
+    }
+
+
+def simulate(conn, college_type, exam_type='PGCET', state='Karnataka', year=None, applicants=None,
+             cohort=DEFAULT_COHORT, choices=DEFAULT_CHOICES, seed=42):
+    """Allot seats to a cohort (synthetic unless given) and report fill and closing ranks per college."""
+    programs, year = load_programs(conn, college_type, exam_type, state, year)
+    if not programs:
+        return None
+
+    start = time.perf_counter()
+    synthetic = applicants is None
+    if synthetic:
+        applicants = synthetic_cohort(programs, cohort, choices, seed=seed)
+    assigned, proposals = allocate(programs, applicants)
+    elapsed = time.perf_counter() - start
+
+    colleges = {college_id: None for college_id in college_order(programs)}
+    for program in programs:
+        college = colleges[program.college_id] = colleges[program.college_id] or {
+            'college_id': program.college_id,
+            'college_name': program.college_name,
+            'place': program.place,
+            'seats': 0,
+            'filled': 0,
+            'categories': [],
+        }
+        report = program_report(program)
+        college['seats'] += report['seats']
+        college['filled'] += report['filled']
+        college['categories'].append(report)
+    for college in colleges.values():
+        college['fill_rate'] = round(college['filled'] / college['seats'], 3) if college['seats'] else None
+
+    allotted = sum(1 for program in assigned if program >= 0)
+    return {
+        'college_type': college_type.upper(),
+        'exam_type': exam_type,
+        'state': state,
+        'year': year,
+        'cohort': 'synthetic' if synthetic else 'uploaded',
+        'applicants': len(applicants),
+        'allotted': allotted,
+        'unallotted': len(applicants) - allotted,
+        'seats': sum(program.seats for program in programs),
+        'proposals': proposals,
+        'seconds': round(elapsed, 3),
+        # Most sought-after colleges first
+        'colleges': list(colleges.values()),
+        'allotments': assigned,
+        'programs': programs,
+        'roster': applicants,
+    }
+
+
+def public_report(report):
+    """The report without the per-applicant allotments and in-memory programs (what gets serialized)."""
+    return {key: value for key, value in report.items() if key not in INTERNAL_KEYS}
+
+
+def write_allotments(report, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['rank', 'category', 'college_id', 'seat_category'])
+    programs, applicants = report['programs'], report['roster']
+    for rank, category, program in zip(applicants.ranks, applicants.categories, report['allotments']):
+        seat = programs[program] if program >= 0 else None
+        writer.writerow([rank, category, seat.college_id if seat else '', seat.category if seat else ''])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate a counselling round of seat allotment')
+    parser.add_argument('college_type', choices=COLLEGE_TYPES)
+    parser.add_argument('--exam', default='PGCET')
+    parser.add_argument('--state', default='Karnataka')
+    parser.add_argument('--year', type=int, help='Cutoff year whose seats are allotted (default: latest)')
+    parser.add_argument('--applicants', help='CSV of rank,category,preferences instead of a synthetic cohort')
+    parser.add_argument('--cohort', type=int, default=DEFAULT_COHORT, help='Synthetic cohort size')
+    parser.add_argument('--choices', type=int, default=DEFAULT_CHOICES, help='Colleges listed per synthetic applicant')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--output', help='Write the JSON report here')
+    parser.add_argument('--allotments', help='Write each applicant\'s allotted seat to this CSV')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print("Database not found. Please run init_db.py first.")
+        return 1
+
+    applicants = None
+    if args.applicants:
+        with open(args.applicants, newline='') as f:
+            applicants = read_applicants(f)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        report = simulate(conn, args.college_type, args.exam, args.state, args.year, applicants,
+                          args.cohort, args.choices, args.seed)
+    finally:
+        conn.close()
+    if report is None:
+        print(f"No seats found for {args.college_type.upper()} {args.exam} in {args.state}")
+        return 1
+
+    print(f"🎓 {report['college_type']} {report['year']}: {report['allotted']:,} of {report['applicants']:,} "
+          f"applicants allotted to {report['seats']:,} seats "
+          f"({report['proposals']:,} applications, {report['seconds']}s)")
+    for college in report['colleges']:
+        closing = {program['category']: program['projected_closing_rank'] for program in college['categories']}
+        print(f"  - {college['college_name']}: {college['filled']}/{college['seats']} filled, "
+              f"closing ranks {closing}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(public_report(report), f, indent=2)
+        print(f"Report written to {args.output}")
+    if args.allotments:
+        with open(args.allotments, 'w', newline='') as f:
+            write_allotments(report, f)
+        print(f"Allotments written to {args.allotments}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+# shared_cache.py - Prediction responses shared by every worker on a host (WAL-mode SQLite file)
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from metrics import SHARED_CACHE_REQUESTS, SHARED_CACHE_EVICTIONS
+
+# Empty or "off" disables the shared tier; each worker then only has its own caches
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH',
+                                   os.path.join(tempfile.gettempdir(), 'college_predictor_cache.db'))
+SHARED_CACHE_MAX_MB = float(os.environ.get('SHARED_CACHE_MAX_MB', '64'))
+# Workers wait at most this long for another worker's write before treating it as a miss
+SHARED_CACHE_TIMEOUT = float(os.environ.get('SHARED_CACHE_TIMEOUT', '0.25'))
+
+# Last-access times are refreshed at most this often per entry, to keep hits read-only
+TOUCH_INTERVAL = 5.0
+# Per-worker stats are written to the cache file at most this often
+STATS_INTERVAL = 1.0
+# Evict down to this fraction of the budget so eviction runs in batches
+EVICT_TARGET = 0.9
+
+STAT_NAMES = ('hits', 'misses', 'sets', 'evictions', 'errors')
+
+
+class SharedCache:
+    """Size-bounded key/value cache in a SQLite file shared by all gunicorn workers.
+
+    Every entry carries the data version it was computed from; reads only match
+    the current version, and the first worker to see a new version purges the rest.
+    Failures never propagate: a broken or busy cache file just counts as a miss.
+    """
+
+    def __init__(self, path=SHARED_CACHE_PATH, max_bytes=int(SHARED_CACHE_MAX_MB * 1024 * 1024),
+                 timeout=SHARED_CACHE_TIMEOUT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        self.stats_flushed = 0.0
+        self.data_version = None
+
+    @property
+    def enabled(self):
+        return bool(self.path) and self.path.lower() != 'off'
+
+    def connect(self):
+        # One connection per thread and per process; gunicorn forks after import
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None and self.local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                data_version TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed);
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                key TEXT PRIMARY KEY,
+                value
+            );
+            INSERT OR IGNORE INTO cache_meta (key, value) VALUES ('total_bytes', 0), ('data_version', NULL);
+            CREATE TABLE IF NOT EXISTS worker_stats (
+                pid INTEGER PRIMARY KEY,
+                hits INTEGER,
+                misses INTEGER,
+                sets INTEGER,
+                evictions INTEGER,
+                errors INTEGER,
+                updated_at REAL
+            );
+        ''')
+        self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    def count(self, stat, amount=1):
+        with self.lock:
+            self.stats[stat] += amount
+
+    def failed(self, operation, error):
+        self.count('errors')
+        SHARED_CACHE_REQUESTS.inc(result='error')
+        print(f"⚠️  Shared cache {operation} failed: {error}")
+
+    def get(self, key, data_version):
+        """Cached bytes for key at this data version, or None."""
+        if not self.enabled or data_version is None:
+            return None
+        try:
+            conn = self.connect()
+            self.check_version(conn, data_version)
+            row = conn.execute('SELECT value, accessed FROM entries WHERE key = ? AND data_version = ?',
+                               (key, data_version)).fetchone()
+            if row is not None and time.time() - row[1] > TOUCH_INTERVAL:
+                conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+        except sqlite3.Error as e:
+            self.failed('read', e)
+            return None
+
+        self.count('hits' if row is not None else 'misses')
+        SHARED_CACHE_REQUESTS.inc(result='hit' if row is not None else 'miss')
+        self.flush_stats()
+        return None if row is None else bytes(row[0])
+
+    def set(self, key, data_version, value):
+        if not self.enabled or data_version is None or len(value) > self.max_bytes:
+            return
+        try:
+            conn = self.connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                old = conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+                conn.execute('INSERT OR REPLACE INTO entries (key, data_version, value, size, accessed) '
+                             'VALUES (?, ?, ?, ?, ?)', (key, data_version, value, len(value), time.time()))
+                total = self.add_bytes(conn, len(value) - (old[0] if old else 0))
+                evicted = self.evict(conn, total) if total > self.max_bytes else 0
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            self.failed('write', e)
+            return
+
+        self.count('sets')
+        if evicted:
+            self.count('evictions', evicted)
+            SHARED_CACHE_EVICTIONS.inc(evicted)
+        self.flush_stats()
+
+    @staticmethod
+    def add_bytes(conn, delta):
+        conn.execute("UPDATE cache_meta SET value = value + ? WHERE key = 'total_bytes'", (delta,))
+        return conn.execute("SELECT value FROM cache_meta WHERE key = 'total_bytes'").fetchone()[0]
+
+    def evict(self, conn, total):
+        """Drop least recently used entries until the cache is under EVICT_TARGET of its budget."""
+        target = self.max_bytes * EVICT_TARGET
+        evicted = 0
+        while total > target:
+            victims = conn.execute('SELECT key, size FROM entries ORDER BY accessed LIMIT 64').fetchall()
+            if not victims:
+                break
+            for key, size in victims:
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                total -= size
+                evicted += 1
+                if total <= target:
+                    break
+        conn.execute("UPDATE cache_meta SET value = ? WHERE key = 'total_bytes'", (max(total, 0),))
+        return evicted
+
+    def check_version(self, conn, data_version):
+        """Purge entries from older data versions the first time any worker sees a new one."""
+        if data_version == self.data_version:
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            stored = conn.execute("SELECT value FROM cache_meta WHERE key = 'data_version'").fetchone()[0]
+            if stored != data_version:
+                conn.execute('DELETE FROM entries WHERE data_version != ?', (data_version,))
+                conn.execute("UPDATE cache_meta SET value = (SELECT COALESCE(SUM(size), 0) FROM entries) "
+                             "WHERE key = 'total_bytes'")
+                conn.execute("UPDATE cache_meta SET value = ? WHERE key = 'data_version'", (data_version,))
+                print(f"🧹 Shared cache purged for data version {data_version}")
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self.data_version = data_version
+
+    def flush_stats(self, force=False):
+        now = time.time()
+        if not force and now - self.stats_flushed < STATS_INTERVAL:
+            return
+        self.stats_flushed = now
+        with self.lock:
+            values = [self.stats[name] for name in STAT_NAMES]
+        try:
+            self.connect().execute(
+                f'INSERT OR REPLACE INTO worker_stats (pid, {", ".join(STAT_NAMES)}, updated_at) '
+                f'VALUES (?, ?, ?, ?, ?, ?, ?)', [os.getpid()] + values + [now])
+        except sqlite3.Error as e:
+            self.failed('stats write', e)
+
+    def report(self):
+        """Size of the cache and every worker's counters, for /admin/cache."""
+        if not self.enabled:
+            return {'enabled': False}
+        self.flush_stats(force=True)
+        conn = self.connect()
+        entries, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        workers = [dict(zip(('pid',) + STAT_NAMES + ('updated_at',), row))
+                   for row in conn.execute(f'SELECT pid, {", ".join(STAT_NAMES)}, updated_at '
+                                           f'FROM worker_stats ORDER BY pid')]
+        for worker in workers:
+            lookups = worker['hits'] + worker['misses']
+            worker['hit_rate'] = round(worker['hits'] / lookups, 3) if lookups else None
+        return {
+            'enabled': True,
+            'path': self.path,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'data_version': self.data_version,
+            'workers': workers,
+        }
+
+    def clear(self):
+        if not self.enabled:
+            return
+        conn = self.connect()
+        conn.execute('DELETE FROM entries')
+        conn.execute("UPDATE cache_meta SET value = 0 WHERE key = 'total_bytes'")
+
+
+def clear_worker_stats(path=SHARED_CACHE_PATH):
+    """Forget the stats of a previous server run's workers (called by gunicorn on start)."""
+    if not path or path.lower() == 'off' or not os.path.exists(path):
+        return
+    try:
+        conn = sqlite3.connect(path, timeout=SHARED_CACHE_TIMEOUT)
+        try:
+            conn.execute('DELETE FROM worker_stats')
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+
+cache = SharedCache()
@@ -0,0 +1,57 @@
+# single_flight.py - Identical concurrent computations share one in-progress call
+import threading
+
+from metrics import SINGLE_FLIGHT_REQUESTS
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs fn once per key at a time; callers arriving while it runs wait for its result.
+
+    Nothing is kept after the call finishes - repeat requests are the shared
+    cache's job. Only threads of one process coalesce, so this pays off with
+    threaded workers (GUNICORN_THREADS > 1).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """(result, shared): shared is True when the result came from another caller's run."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            SINGLE_FLIGHT_REQUESTS.inc(result='coalesced')
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        SINGLE_FLIGHT_REQUESTS.inc(result='leader')
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def __len__(self):
+        return len(self.calls)
+
+
+flights = SingleFlight()
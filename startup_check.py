@@ -0,0 +1,94 @@
+# startup_check.py - Cold-start import report and regression gate for app.py
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules that must stay out of `import app`; they are loaded on first prediction
+DEFERRED_MODULES = ['pandas', 'joblib', 'sklearn', 'numpy']
+
+DEFAULT_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', '1000'))
+
+PROBE = "import json, sys; import app; print(json.dumps(sorted(sys.modules)))"
+
+
+def run_importtime(module_dir):
+    """Import app in a fresh interpreter under -X importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=module_dir, capture_output=True, text=True,
+        # A cold start must not depend on bytecode written by an earlier run
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app failed:\n{result.stderr[-2000:]}")
+
+    return result.stderr, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def parse_importtime(stderr):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return rows
+
+
+def build_report(module_dir, top=15):
+    stderr, loaded_modules = run_importtime(module_dir)
+    rows = parse_importtime(stderr)
+
+    app_row = next((row for row in rows if row[0] == 'app' and row[3] == 0), None)
+    total_ms = app_row[2] / 1000 if app_row else sum(row[1] for row in rows) / 1000
+
+    # Direct imports of app (depth 1) show which dependency owns the cost
+    direct = sorted((row for row in rows if row[3] == 1), key=lambda row: row[2], reverse=True)
+
+    return {
+        'total_ms': round(total_ms, 1),
+        'top_imports': [{'module': name, 'cumulative_ms': round(cum / 1000, 1), 'self_ms': round(own / 1000, 1)}
+                        for name, own, cum, depth in direct[:top]],
+        'deferred_modules_loaded': [name for name in DEFERRED_MODULES if name in loaded_modules],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report and gate the cold-start import time of app.py')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=3, help='Take the fastest of this many cold imports')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args(argv)
+
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    report = min((build_report(module_dir) for _ in range(max(1, args.runs))), key=lambda r: r['total_ms'])
+    report['budget_ms'] = args.budget_ms
+
+    failures = []
+    if report['total_ms'] > args.budget_ms:
+        failures.append(f"import app took {report['total_ms']} ms (budget {args.budget_ms} ms)")
+    if report['deferred_modules_loaded']:
+        failures.append(f"import app eagerly loads {', '.join(report['deferred_modules_loaded'])}")
+    report['ok'] = not failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"🚀 import app: {report['total_ms']} ms (budget {args.budget_ms} ms)")
+        for row in report['top_imports']:
+            print(f"  - {row['module']}: {row['cumulative_ms']} ms")
+
+    for failure in failures:
+        print(f"❌ Cold start regression: {failure}", file=sys.stderr)
+    return 0 if report['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,11 +2,18 @@
 // Global app configuration
 const CONFIG = {
     API_BASE: '',
-    // Updated place names to match database
+    // Ask prediction endpoints for the compact columnar encoding
+    RESPONSE_FORMAT: 'columnar',
+    // Fallback place names when /autocomplete is unavailable
     PLACES: ['All', 'Bengaluru', 'Mandya', 'Mysore', 'Belagavi', 'Dharwad', 'Hubballi', 'Davanagere', 'Mangaluru', 'Hassan'],
     CATEGORIES: ['GM', 'OBC', 'SC', 'ST'],
     COLLEGE_TYPES: ['MCA', 'MBA', 'MTech'],
-    EXAM_TYPES: ['PGCET']
+    EXAM_TYPES: ['PGCET'],
+    // Wait this long after the last keystroke before asking /autocomplete
+    AUTOCOMPLETE_DEBOUNCE_MS: 150,
+    // The what-if slider covers this fraction of the rank either side (at least SWEEP_MIN_SPAN ranks)
+    SWEEP_SPAN: 0.25,
+    SWEEP_MIN_SPAN: 500
 };
 
 // Utility functions
@@ -79,6 +86,67 @@ class Utils {
         `;
     }
 
+    static decodePredictionResults(results) {
+        // Expand columnar payloads (shared college metadata + per-match arrays) back into rows
+        if (!results || results.format !== 'columnar') return results;
+
+        const decoded = { ...results };
+        delete decoded.format;
+        ['exact_matches', 'near_matches', 'weak_matches'].forEach(key => {
+            const block = results[key];
+            if (!block || !block.columns) return;
+            const fields = Object.keys(block.columns).filter(field => field !== 'college');
+            decoded[key] = block.columns.college.map((collegeIndex, i) => {
+                const row = { ...block.colleges[collegeIndex] };
+                fields.forEach(field => { row[field] = block.columns[field][i]; });
+                return row;
+            });
+        });
+        return decoded;
+    }
+
+    static logServerTiming(label, response, clientMs) {
+        // Correlate the browser-side round trip with the server's stage breakdown
+        const serverTiming = {};
+        (response.headers.get('Server-Timing') || '').split(',').forEach(entry => {
+            const [name, ...params] = entry.trim().split(';');
+            const dur = params.find(param => param.trim().startsWith('dur='));
+            if (name && dur) serverTiming[name] = parseFloat(dur.split('=')[1]);
+        });
+
+        console.log(`${label} timing`, {
+            requestId: response.headers.get('X-Request-ID'),
+            clientMs: Math.round(clientMs * 1000) / 1000,
+            server: serverTiming
+        });
+    }
+
+    static debounce(fn, delayMs) {
+        let timer = null;
+        return (...args) => {
+            clearTimeout(timer);
+            timer = setTimeout(() => fn(...args), delayMs);
+        };
+    }
+
+    static async autocomplete(query, kind, limit) {
+        // Suggestion labels from the server's in-memory index, or null if it is unreachable
+        const params = new URLSearchParams({ q: query, kind: kind });
+        if (limit) params.set('limit', limit);
+        try {
+            const response = await fetch(`/autocomplete?${params}`, {
+                headers: {
+                    'Accept': 'application/json',
+                }
+            });
+            if (!response.ok) return null;
+            const data = await response.json();
+            return data.suggestions.map(suggestion => suggestion.label);
+        } catch (error) {
+            return null;
+        }
+    }
+
     static createParticles() {
         const particlesContainer = document.querySelector('.particles');
         if (!particlesContainer) return;
@@ -136,6 +204,100 @@ class StorageManager {
     }
 }
 
+// Resolves predictions in the browser from the static shards written by export_shards.py.
+// resolve() returns null whenever the server should answer instead (no shards for the
+// current data, unknown bucket, or a place that needs fuzzy matching).
+class ShardResolver {
+    static fetchJson(url) {
+        return fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+    }
+
+    static loadManifest() {
+        if (!this.manifestPromise) {
+            this.manifestPromise = this.fetchJson('/static/shards/manifest.json');
+        }
+        return this.manifestPromise;
+    }
+
+    static loadShard(path) {
+        this.shardPromises = this.shardPromises || {};
+        if (!this.shardPromises[path]) {
+            this.shardPromises[path] = this.fetchJson(`/static/shards/${path}`);
+        }
+        return this.shardPromises[path];
+    }
+
+    static resolvePlace(manifest, place) {
+        const key = (place || '').trim().split(/\s+/).join(' ').toLowerCase();
+        if (key === '' || key === 'all' || key === 'all locations') return 'All';
+        return manifest.places[key] || null;
+    }
+
+    static bisectRight(values, target) {
+        let lo = 0, hi = values.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (values[mid] <= target) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    static async resolve(input) {
+        if (input.cutoffs === 'projected' || !Number.isInteger(input.rank) || input.rank < 1) return null;
+        const manifest = await this.loadManifest();
+        if (!manifest) return null;
+
+        const key = [`${String(input.college_type).toLowerCase()}_colleges`, input.state, input.exam_type, input.category].join('|');
+        const place = this.resolvePlace(manifest, input.place);
+        if (!manifest.shards[key] || !place) return null;
+        const shard = await this.loadShard(manifest.shards[key]);
+        if (!shard || shard.format !== manifest.format) return null;
+
+        // Matches are constant between breakpoints, so a rank is a binary search away
+        const segment = shard.segments[this.bisectRight(shard.breakpoints, input.rank)];
+        const fields = Object.keys(shard.columns).filter(field => field !== 'college');
+        const matches = [];
+        segment.forEach(i => {
+            const row = { ...shard.colleges[shard.columns.college[i]] };
+            fields.forEach(field => { row[field] = shard.columns[field][i]; });
+            if (place === 'All' || row.place === place) matches.push(row);
+        });
+        return { exact_matches: matches, near_matches: [], weak_matches: [] };
+    }
+}
+
+class RankSweep {
+    static async load(input, rankFrom, rankTo) {
+        const { rank, ...query } = input;
+        const params = new URLSearchParams({ ...query, rank_from: rankFrom, rank_to: rankTo });
+        try {
+            const response = await fetch(`/predict_sweep?${params}`, { headers: { 'Accept': 'application/json' } });
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            return null;
+        }
+    }
+
+    static matchesAt(sweep, rank) {
+        // Replay the enter/leave steps up to the rank; no request per slider position
+        const active = new Set(sweep.initial);
+        for (const step of sweep.steps) {
+            if (step.rank > rank) break;
+            step.enter.forEach(i => active.add(i));
+            step.leave.forEach(i => active.delete(i));
+        }
+        const rows = sweep.rows;
+        const fields = Object.keys(rows.columns).filter(field => field !== 'college');
+        return [...active].sort((a, b) => a - b).map(i => {
+            const row = { ...rows.colleges[rows.columns.college[i]] };
+            fields.forEach(field => { row[field] = rows.columns[field][i]; });
+            return row;
+        });
+    }
+}
+
 // Initialize particles and other effects
 document.addEventListener('DOMContentLoaded', function() {
     Utils.createParticles();
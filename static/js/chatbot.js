@@ -91,6 +91,7 @@ class CollegeChatbot {
                 break;
             case 'college_type':
                 this.conversationState.data.college_type = cleanOption;
+                this.warmContext();
                 this.conversationState.step = 'exam_type';
                 this.addMessage('user', cleanOption);
                 this.showTypingIndicator();
@@ -102,6 +103,7 @@ class CollegeChatbot {
                 break;
             case 'exam_type':
                 this.conversationState.data.exam_type = cleanOption;
+                this.warmContext();
                 this.conversationState.step = 'category';
                 this.addMessage('user', cleanOption);
                 this.showTypingIndicator();
@@ -113,6 +115,7 @@ class CollegeChatbot {
                 break;
             case 'category':
                 this.conversationState.data.category = cleanOption;
+                this.warmContext();
                 this.conversationState.step = 'place';
                 this.addMessage('user', cleanOption);
                 this.showTypingIndicator();
@@ -125,6 +128,7 @@ class CollegeChatbot {
             case 'place':
                 this.conversationState.data.place = cleanOption === 'All Locations' ? 'All' : cleanOption;
                 this.conversationState.data.state = 'Karnataka';
+                this.warmContext();
                 this.conversationState.step = 'rank';
                 this.addMessage('user', cleanOption);
                 this.showTypingIndicator();
@@ -150,6 +154,16 @@ class CollegeChatbot {
         }
     }
 
+    warmContext() {
+        // Lets the server prefetch cutoffs while the user answers the next question
+        const params = new URLSearchParams(this.conversationState.data);
+        fetch(`/chatbot_context?${params}`, {
+            headers: {
+                'Accept': 'application/json',
+            }
+        }).catch(() => {});
+    }
+
     showInputField() {
         const optionsContainer = document.getElementById('chatbotOptions');
         optionsContainer.innerHTML = `
@@ -179,15 +193,16 @@ class CollegeChatbot {
         this.showTypingIndicator();
 
         try {
-            const response = await fetch('/chatbot_predict', {
-                method: 'POST',
+            const requestStart = performance.now();
+            const params = new URLSearchParams({ ...this.conversationState.data, format: CONFIG.RESPONSE_FORMAT });
+            const response = await fetch(`/chatbot_predict?${params}`, {
                 headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(this.conversationState.data)
+                    'Accept': 'application/json',
+                }
             });
 
-            const results = await response.json();
+            const results = Utils.decodePredictionResults(await response.json());
+            Utils.logServerTiming('Chatbot prediction', response, performance.now() - requestStart);
             this.removeTypingIndicator();
             this.displayPredictionResults(results);
         } catch (error) {
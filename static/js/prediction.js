@@ -16,13 +16,41 @@ class PredictionManager {
             predictionForm.addEventListener('submit', (e) => this.handlePrediction(e));
         }
 
-        // Populate dropdowns with correct place names
-        this.populateDropdown('place', CONFIG.PLACES);
+        // Place is a typeahead over the places in the database
+        this.bindPlaceAutocomplete();
         this.populateDropdown('category', CONFIG.CATEGORIES);
         this.populateDropdown('college_type', CONFIG.COLLEGE_TYPES);
         this.populateDropdown('exam_type', CONFIG.EXAM_TYPES);
     }
 
+    bindPlaceAutocomplete() {
+        const input = document.getElementById('place');
+        const list = document.getElementById('placeSuggestions');
+        if (!input || !list) return;
+
+        const fill = (labels) => {
+            list.innerHTML = '';
+            labels.forEach(label => {
+                const option = document.createElement('option');
+                option.value = label;
+                list.appendChild(option);
+            });
+        };
+        const suggest = async () => {
+            const query = input.value.trim();
+            const labels = await Utils.autocomplete(query, 'place');
+            if (labels !== null && input.value.trim() === query) {
+                fill(query ? labels : ['All', ...labels]);
+            }
+        };
+
+        fill(CONFIG.PLACES);
+        input.addEventListener('input', Utils.debounce(suggest, CONFIG.AUTOCOMPLETE_DEBOUNCE_MS));
+        input.addEventListener('focus', () => {
+            if (!input.value.trim() || input.value.trim() === 'All') suggest();
+        });
+    }
+
     populateDropdown(elementId, options) {
         const select = document.getElementById(elementId);
         if (select) {
@@ -62,10 +90,10 @@ class PredictionManager {
             this.displayResults(cached.results);
             // Scroll to results
             this.scrollToResults();
-            return;
+        } else {
+            await this.makePrediction(this.currentInput);
         }
-
-        await this.makePrediction(this.currentInput);
+        this.showRankSweep(this.currentInput);
     }
 
     async makePrediction(input) {
@@ -75,12 +103,26 @@ class PredictionManager {
         try {
             console.log('Making prediction request with data:', input);
 
-            const response = await fetch('/predict', {
-                method: 'POST',
+            // Most predictions resolve from a static shard without reaching the server
+            const shardStart = performance.now();
+            const shardResults = await ShardResolver.resolve(input);
+            if (shardResults) {
+                console.log('Prediction resolved from static shard', {
+                    clientMs: Math.round((performance.now() - shardStart) * 1000) / 1000
+                });
+                StorageManager.cachePrediction(input, shardResults);
+                this.displayResults(shardResults);
+                setTimeout(() => this.scrollToResults(), 100);
+                return;
+            }
+
+            const requestStart = performance.now();
+            // GET so the browser HTTP cache can revalidate the result with its ETag
+            const params = new URLSearchParams({ ...input, format: CONFIG.RESPONSE_FORMAT });
+            const response = await fetch(`/predict?${params}`, {
                 headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(input)
+                    'Accept': 'application/json',
+                }
             });
 
             if (!response.ok) {
@@ -88,8 +130,9 @@ class PredictionManager {
                 throw new Error(`HTTP error! status: ${response.status}, message: ${errorText}`);
             }
 
-            const results = await response.json();
+            const results = Utils.decodePredictionResults(await response.json());
             console.log('Prediction results:', results);
+            Utils.logServerTiming('Prediction', response, performance.now() - requestStart);
 
             // Cache the results
             StorageManager.cachePrediction(input, results);
@@ -112,6 +155,38 @@ class PredictionManager {
         }
     }
 
+    async showRankSweep(input) {
+        const container = document.getElementById('rankSweep');
+        if (!container || !Number.isInteger(input.rank) || input.rank < 1) return;
+
+        const span = Math.max(CONFIG.SWEEP_MIN_SPAN, Math.round(input.rank * CONFIG.SWEEP_SPAN));
+        const rankFrom = Math.max(1, input.rank - span);
+        const rankTo = input.rank + span;
+        const sweep = await RankSweep.load(input, rankFrom, rankTo);
+        if (!sweep || sweep.error || this.currentInput !== input) {
+            container.hidden = true;
+            return;
+        }
+
+        container.innerHTML = `
+            <label for="sweepRank">
+                <i class="fas fa-sliders-h"></i>
+                What if my rank were <strong id="sweepRankValue">${input.rank}</strong>?
+            </label>
+            <input type="range" id="sweepRank" min="${rankFrom}" max="${rankTo}" value="${input.rank}">
+            <small>Your options change at ${sweep.steps.length} ranks between ${rankFrom} and ${rankTo}</small>
+        `;
+        container.hidden = false;
+
+        const slider = container.querySelector('#sweepRank');
+        slider.addEventListener('input', () => {
+            const rank = parseInt(slider.value);
+            container.querySelector('#sweepRankValue').textContent = rank;
+            this.currentInput = { ...input, rank };
+            this.displayResults({ exact_matches: RankSweep.matchesAt(sweep, rank), near_matches: [], weak_matches: [] });
+        });
+    }
+
     scrollToResults() {
         const resultsSection = document.getElementById('predictionResults');
         if (resultsSection) {
@@ -0,0 +1,99 @@
+# tracing.py - Per-request trace spans, Server-Timing headers and a JSONL trace log
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+TRACE_LOG = os.environ.get('TRACE_LOG', '/tmp/college_predictor_traces.jsonl')
+TRACE_LOG_MAX_BYTES = int(os.environ.get('TRACE_LOG_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# Server-Timing metric names and their descriptions
+TIMINGS = {
+    'db': 'DB access',
+    'rank': 'Rank filtering',
+    'model': 'Model scoring',
+    'serialize': 'JSON serialization',
+}
+
+_log_lock = threading.Lock()
+
+
+@contextmanager
+def span(name, timing=None, histogram=None, **labels):
+    """Time a block as a trace span.
+
+    The span is attached to the current request's trace (if any), counted
+    under the `timing` Server-Timing metric and observed in `histogram`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        duration = end - start
+        if histogram is not None:
+            histogram.observe(duration, **labels)
+        if has_request_context() and 'trace' in g:
+            g.trace.append({
+                'name': name,
+                'timing': timing,
+                'start_ms': round((start - g.trace_start) * 1000, 3),
+                'duration_ms': round(duration * 1000, 3),
+            })
+
+
+def server_timing_header(spans, total_seconds):
+    totals = {}
+    for record in spans:
+        if record['timing']:
+            totals[record['timing']] = totals.get(record['timing'], 0.0) + record['duration_ms']
+
+    entries = [f'{name};dur={totals[name]:.3f};desc="{desc}"' for name, desc in TIMINGS.items() if name in totals]
+    entries.append(f'total;dur={total_seconds * 1000:.3f}')
+    return ', '.join(entries)
+
+
+def write_trace(record, path=TRACE_LOG, max_bytes=TRACE_LOG_MAX_BYTES):
+    if not path:
+        return
+    line = json.dumps(record) + '\n'
+    with _log_lock:
+        try:
+            if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+                os.replace(path, f"{path}.1")
+            with open(path, 'a') as f:
+                f.write(line)
+        except OSError as e:
+            print(f"Trace log error: {e}")
+
+
+def init_tracing(app, traced_endpoints):
+    """Trace every request to `traced_endpoints` and add its Server-Timing header."""
+
+    @app.before_request
+    def start_trace():
+        if request.endpoint in traced_endpoints:
+            g.trace = []
+            g.trace_start = time.perf_counter()
+
+    @app.after_request
+    def finish_trace(response):
+        if 'trace' not in g:
+            return response
+
+        total = time.perf_counter() - g.trace_start
+        response.headers['Server-Timing'] = server_timing_header(g.trace, total)
+        write_trace({
+            'trace_id': g.get('request_id'),
+            'timestamp': time.time(),
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 3),
+            'spans': g.trace,
+        })
+        return response
@@ -0,0 +1,90 @@
+# validation.py - Ingest-time validation of cutoff rows (used by database/init_db.py)
+import json
+import time
+
+QUARANTINE_TABLE = 'quarantine'
+
+RANK_COLUMNS = ['opening_cutoff_rank', 'closing_cutoff_rank']
+INTEGER_COLUMNS = RANK_COLUMNS + ['seats', 'year']
+KEY_COLUMNS = ['college_id', 'category', 'year']
+
+
+def _blank(series):
+    return series.isna() | (series.astype(str).str.strip() == '')
+
+
+def rule_masks(df):
+    """Reason -> boolean mask of the rows breaking that rule, each computed over whole columns."""
+    import pandas as pd
+
+    missing = pd.Series(float('nan'), index=df.index)
+    numeric = {column: pd.to_numeric(df[column], errors='coerce') if column in df else missing
+               for column in INTEGER_COLUMNS}
+    opening, closing = numeric['opening_cutoff_rank'], numeric['closing_cutoff_rank']
+
+    masks = {
+        'missing_rank': opening.isna() | closing.isna(),
+        'fractional_rank': ((opening % 1 != 0) & opening.notna()) | ((closing % 1 != 0) & closing.notna()),
+        'non_positive_rank': (opening < 1) | (closing < 1),
+        'inverted_range': opening > closing,
+        'zero_seats': numeric['seats'].isna() | (numeric['seats'] <= 0),
+        'missing_year': numeric['year'].isna(),
+        'empty_place': _blank(df['place']) if 'place' in df else pd.Series(True, index=df.index),
+    }
+    for column in ('college_id', 'category'):
+        masks[f'missing_{column}'] = _blank(df[column]) if column in df else pd.Series(True, index=df.index)
+    return masks, numeric
+
+
+def validate_cutoffs(df):
+    """Split a cutoff dataset into (clean rows, rejected rows).
+
+    Clean rows have integer ranks, seats and year; rejected rows carry a
+    comma-separated `reasons` column naming every rule they broke.
+    """
+    import numpy as np
+
+    masks, numeric = rule_masks(df)
+    names = list(masks)
+    failures = np.column_stack([masks[name].to_numpy(dtype=bool) for name in names])
+    rejected = failures.any(axis=1)
+
+    clean = df.loc[~rejected].copy()
+    for column in INTEGER_COLUMNS:
+        clean[column] = numeric[column][~rejected].astype('int64')
+
+    bad = df.loc[rejected].copy()
+    reason_names = np.array(names, dtype=object)
+    bad['reasons'] = [','.join(reason_names[row]) for row in failures[rejected]]
+    return clean, bad
+
+
+def write_quarantine(conn, source_table, rejected):
+    """Replace source_table's quarantined rows with `rejected` (raw values kept as JSON)."""
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} (
+            source_table TEXT,
+            reasons TEXT,
+            row_data TEXT,
+            quarantined_at TEXT
+        )
+    ''')
+    conn.execute(f'DELETE FROM {QUARANTINE_TABLE} WHERE source_table = ?', (source_table,))
+    if rejected.empty:
+        return 0
+
+    stamped_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    rows = rejected.drop(columns=['reasons'])
+    raw = rows.astype(object).where(rows.notna(), None).to_dict('records')
+    records = [(source_table, reasons, json.dumps(record, default=str), stamped_at)
+               for reasons, record in zip(rejected['reasons'], raw)]
+    conn.executemany(f'INSERT INTO {QUARANTINE_TABLE} VALUES (?, ?, ?, ?)', records)
+    return len(records)
+
+
+def reason_counts(rejected):
+    counts = {}
+    for reasons in rejected.get('reasons', []):
+        for reason in reasons.split(','):
+            counts[reason] = counts.get(reason, 0) + 1
+    return counts